@@ -0,0 +1,75 @@
+"""Cost of the newline lookahead while a background save is in progress, against how much has changed since the save began.
+
+    python benchmarks/bench_background_save.py [--changes N,N,...] [--lines N] [--repeat N]
+
+The story has a global per change and prints N lines. A background save is
+started and that many globals are changed, as the story would have changed them
+since. The lines are then played through, each of them looked ahead past; the
+time is per line. Starting the save, and completing it, which applies the
+changes, are timed too.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+
+def build_story_text(global_count: int, line_count: int) -> str:
+    global_decl = ["ev"]
+    for i in range(global_count):
+        global_decl += [0, {"VAR=": f"v{i}"}]
+    global_decl += ["/ev", "end", None]
+    lines = []
+    for i in range(line_count):
+        lines += [f"^line {i}", "\n"]
+    root = [[*lines, "done", None], "done", {"global decl": global_decl}]
+    return json.dumps({"inkVersion": 21, "root": root, "listDefs": {}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--changes", default="10,1000,10000")
+    parser.add_argument("--lines", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'changes':>7}  {'us/line':>8}  {'us/start':>8}  {'us/done':>8}")
+    for change_count in (int(n) for n in args.changes.split(",")):
+        story = Story(build_story_text(change_count, args.lines))
+        line_timings = []
+        start_timings = []
+        complete_timings = []
+        for _ in range(args.repeat):
+            story.ResetState()
+            start = time.perf_counter()
+            story.CopyStateForBackgroundThreadSave()
+            start_timings.append(time.perf_counter() - start)
+            for i in range(change_count):
+                story.variablesState[f"v{i}"] = 1
+
+            start = time.perf_counter()
+            story.ContinueMaximally()
+            line_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            story.BackgroundSaveComplete()
+            complete_timings.append(time.perf_counter() - start)
+        line = min(line_timings) / args.lines
+        print(
+            f"{change_count:>7}  {line * 1e6:>8.1f}  {min(start_timings) * 1e6:>8.1f}"
+            f"  {min(complete_timings) * 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Turns per second of a story that offers many choices at once, from deep in a tunnel stack.
+
+    python benchmarks/bench_choices.py [--choices N,N,...] [--depth N] [--turns N] [--repeat N]
+
+Each turn outputs a line, offers N sticky choices and takes the first, which
+leads back to the same line. The choices are offered from N tunnels deep.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+
+def build_story_text(choice_count: int, depth: int) -> str:
+    weave = ["^Pick one.", "\n"]
+    named = {}
+    for i in range(choice_count):
+        k = len(weave)
+        weave.append(
+            [
+                "ev",
+                {"^->": f"turn.0.{k}.$r1"},
+                {"temp=": "$r"},
+                "str",
+                {"->": ".^.s"},
+                [{"#n": "$r1"}],
+                "/str",
+                "/ev",
+                {"*": f".^.^.c-{i}", "flg": 2},
+                {"s": [f"^Choice {i}", {"->": "$r", "var": True}, None]},
+            ]
+        )
+        named[f"c-{i}"] = [
+            "ev",
+            {"^->": f"turn.0.c-{i}.$r2"},
+            "/ev",
+            {"temp=": "$r"},
+            {"->": f".^.^.{k}.s"},
+            [{"#n": "$r2"}],
+            "\n",
+            {"->": ".^.^.g-0"},
+            None,
+        ]
+    named["g-0"] = [{"->": "turn"}, None]
+    weave.append(named)
+
+    knots = {"turn": [weave, None]}
+    for d in range(depth):
+        knots[f"tunnel{d}"] = [{"->t->": f"tunnel{d + 1}" if d + 1 < depth else "turn"}, None]
+    start = {"->t->": "tunnel0"} if depth else {"->": "turn"}
+    root = [[start, ["done", {"#n": "g-0"}], None], "done", knots]
+    return json.dumps({"inkVersion": 21, "root": root, "listDefs": {}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--choices", default="2,10,50")
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'choices':>7}  {'us/turn':>8}")
+    for choice_count in (int(n) for n in args.choices.split(",")):
+        story = Story(build_story_text(choice_count, args.depth))
+        story.ContinueMaximally()
+        assert len(story.currentChoices) == choice_count
+        timings = []
+        for _ in range(args.repeat):
+            story.ResetState()
+            start = time.perf_counter()
+            for _ in range(args.turns):
+                story.ContinueMaximally()
+                story.ChooseChoiceIndex(0)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{choice_count:>7}  {best / args.turns * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
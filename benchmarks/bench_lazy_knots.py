@@ -0,0 +1,69 @@
+"""Memory and load time of eager vs lazy knot loading on a large synthetic story.
+
+    python benchmarks/bench_lazy_knots.py [--copies N] [--touch FRACTION]
+
+The story is inkjs/tests.ink.json with its knots copied N times under new names.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+SOURCE = ROOT / "tests" / "inkfiles" / "compiled" / "inkjs" / "tests.ink.json"
+
+
+def build_story_text(copies: int) -> str:
+    story = json.loads(SOURCE.read_text(encoding="utf-8-sig"))
+    named = story["root"][-1]
+    for i in range(copies):
+        for name, knot in list(named.items()):
+            if not name.startswith("#") and name != "global decl" and "_copy" not in name:
+                named[name + "_copy" + str(i)] = knot
+    return json.dumps(story)
+
+
+def measure(text: str, lazy: bool, touch: float):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    story = Story(text, lazy_knots=lazy)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    knot_names = [name for name in json.loads(text)["root"][-1] if not name.startswith("#")]
+    for name in knot_names[: int(len(knot_names) * touch)]:
+        story.KnotContainerWithName(name)
+
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return load_ms, retained / 2**20, peak / 2**20, len(knot_names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=50)
+    parser.add_argument("--touch", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    text = build_story_text(args.copies)
+    print(f"story: {len(text) / 2**20:.1f} MiB of JSON, touching {args.touch:.0%} of knots")
+    print(f"{'mode':<6}  {'knots':>6}  {'load ms':>8}  {'retained MiB':>12}  {'peak MiB':>8}")
+    for lazy in (False, True):
+        load_ms, retained, peak, knots = measure(text, lazy, args.touch)
+        mode = "lazy" if lazy else "eager"
+        print(f"{mode:<6}  {knots:>6}  {load_ms:>8.1f}  {retained:>12.1f}  {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Story load time for every compiled story in the test corpus.
+
+    python benchmarks/bench_load.py [--repeat N] [--filter SUBSTRING]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+INKFILES_DIR = ROOT / "tests" / "inkfiles" / "compiled"
+
+
+def time_load(text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Story(text)
+        timings.append(time.perf_counter() - start)
+    # Best of N, like timeit: slower runs measure the machine, not the loader.
+    return min(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--filter", default="")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for path in sorted(INKFILES_DIR.rglob("*.ink.json")):
+        rel_path = path.relative_to(INKFILES_DIR).as_posix()
+        if args.filter not in rel_path:
+            continue
+        text = path.read_text(encoding="utf-8-sig")
+        rows.append((rel_path, len(text), time_load(text, args.repeat)))
+
+    width = max(len(rel_path) for rel_path, _, _ in rows)
+    print(f"{'story':<{width}}  {'bytes':>8}  {'load ms':>8}")
+    for rel_path, size, load_ms in rows:
+        print(f"{rel_path:<{width}}  {size:>8}  {load_ms:>8.3f}")
+    print(f"{'total':<{width}}  {sum(r[1] for r in rows):>8}  {sum(r[2] for r in rows):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Play time of a single line of output built from many pieces of text.
+
+    python benchmarks/bench_long_paragraphs.py [--lengths N,N,...] [--repeat N]
+
+Each story outputs N words, one text object each, before the line ends, so
+the output stream grows to N objects within one Continue.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+
+def build_story_text(length: int) -> str:
+    root = [*(f"^word{i} " for i in range(length)), "\n", "done", None]
+    return json.dumps({"inkVersion": 21, "root": root, "listDefs": {}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", default="100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'words':>6}  {'best ms':>8}  {'us/word':>8}")
+    for length in (int(n) for n in args.lengths.split(",")):
+        story = Story(build_story_text(length))
+        timings = []
+        for _ in range(args.repeat):
+            story.ResetState()
+            start = time.perf_counter()
+            story.ContinueMaximally()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{length:>6}  {best * 1000:>8.1f}  {best / length * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
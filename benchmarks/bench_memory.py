@@ -0,0 +1,84 @@
+"""Memory retained by a loaded story, for the test corpus and a large synthetic story.
+
+    python benchmarks/bench_memory.py [--copies N] [--filter SUBSTRING]
+
+The synthetic story is the one bench_lazy_knots.py builds, loaded eagerly.
+Each story is loaded as-is and with intern_leaves=True; "objects" counts the
+distinct runtime objects in its content tree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench_lazy_knots import build_story_text  # noqa: E402
+from inkpython import Story  # noqa: E402
+from inkpython.engine.container import Container  # noqa: E402
+
+INKFILES_DIR = ROOT / "tests" / "inkfiles" / "compiled"
+
+
+def count_objects(container, seen):
+    seen.add(id(container))
+    for obj in container.content:
+        if isinstance(obj, Container):
+            count_objects(obj, seen)
+        else:
+            seen.add(id(obj))
+    for named in container.namedContent.values():
+        if id(named) not in seen:
+            count_objects(named, seen)
+    return len(seen)
+
+
+def measure(text: str, intern_leaves: bool):
+    gc.collect()
+    tracemalloc.start()
+    story = Story(text, intern_leaves=intern_leaves)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count_objects(story.mainContentContainer, set()), retained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=50)
+    parser.add_argument("--filter", default="")
+    args = parser.parse_args(argv)
+
+    # Warm up the one-off tables (native functions, token decoders) so they
+    # aren't charged to the first story.
+    Story((INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig"))
+
+    texts = [
+        path.read_text(encoding="utf-8-sig")
+        for path in sorted(INKFILES_DIR.rglob("*.ink.json"))
+        if args.filter in path.relative_to(INKFILES_DIR).as_posix()
+    ]
+    synthetic_text = build_story_text(args.copies)
+
+    print(f"{'story':<28}  {'interned':>8}  {'objects':>9}  {'retained KiB':>12}")
+    for intern_leaves in (False, True):
+        corpus = [measure(text, intern_leaves) for text in texts]
+        corpus_objects = sum(objects for objects, _ in corpus)
+        corpus_bytes = sum(retained for _, retained in corpus)
+        rows = [
+            ("corpus, per story", corpus_objects / len(texts), corpus_bytes / len(texts)),
+            ("corpus, total", corpus_objects, corpus_bytes),
+            (f"synthetic, {args.copies} copies", *measure(synthetic_text, intern_leaves)),
+        ]
+        for name, objects, retained in rows:
+            print(f"{name:<28}  {str(intern_leaves):>8}  {objects:>9.0f}  {retained / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
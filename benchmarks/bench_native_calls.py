@@ -0,0 +1,53 @@
+"""Cost of one native function call (an operator in an ink expression), per operator and operand types.
+
+    python benchmarks/bench_native_calls.py [--rounds N] [--repeat N]
+
+Each row calls the operator from a single call site over and over with the same
+two operands, as an expression in a loop would.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython.engine.native_function_call import NativeFunctionCall  # noqa: E402
+from inkpython.engine.value import BoolValue, FloatValue, IntValue, StringValue  # noqa: E402
+
+CASES = [
+    ("int", IntValue(7), IntValue(3), ["+", "-", "*", "/", "%", "==", "<", ">=", "&&", "MIN", "POW"]),
+    ("float", FloatValue(7.5), FloatValue(2.5), ["+", "-", "*", "/", "==", "<"]),
+    ("int, float", IntValue(7), FloatValue(2.5), ["+", "*", "<"]),
+    ("string", StringValue("left"), StringValue("right"), ["+", "==", "!=", "?"]),
+    ("bool", BoolValue(True), BoolValue(False), ["==", "!=", "&&", "||"]),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'operands':>10}  {'op':>4}  {'us/call':>8}")
+    for label, left, right, names in CASES:
+        for name in names:
+            call = NativeFunctionCall.CallWithName(name)
+            parameters = [left, right]
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for _ in range(args.rounds):
+                    call.Call(parameters)
+                timings.append(time.perf_counter() - start)
+            print(f"{label:>10}  {name:>4}  {min(timings) / args.rounds * 1e6:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Cost of the state snapshot taken at each newline, against the size of the state.
+
+    python benchmarks/bench_snapshots.py [--lengths N,N,...] [--repeat N]
+
+Each story outputs a line of N words and stops, which leaves N objects in the
+output stream. The snapshot the story takes to look ahead past a newline is
+then taken, extended by one word and restored, over and over.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+from inkpython.engine.value import StringValue  # noqa: E402
+
+ROUNDS = 1000
+
+
+def build_story_text(length: int) -> str:
+    root = [*(f"^word{i} " for i in range(length)), "\n", "done", None]
+    return json.dumps({"inkVersion": 21, "root": root, "listDefs": {}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", default="10,1000,10000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    word = StringValue("more")
+    print(f"{'words':>6}  {'us/snapshot':>11}")
+    for length in (int(n) for n in args.lengths.split(",")):
+        story = Story(build_story_text(length))
+        story.ContinueMaximally()
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for _ in range(ROUNDS):
+                story.StateSnapshot()
+                story.state.PushToOutputStream(word)
+                story.RestoreStateSnapshot()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{length:>6}  {best / ROUNDS * 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Pointer allocations per story step, playing every compiled story in the test corpus.
+
+    python benchmarks/bench_step_allocations.py [--filter SUBSTRING] [--choices N]
+
+Pointers are freed as soon as a step is done with them, so tracemalloc alone
+can't see them. While measuring, every Pointer made is also kept in a list;
+the memory tracemalloc sees on top of a plain run, less the list, is what
+they took.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench_steps import CountingStory, play  # noqa: E402
+from inkpython import Story  # noqa: E402
+from inkpython.engine.pointer import Pointer  # noqa: E402
+
+INKFILES_DIR = ROOT / "tests" / "inkfiles" / "compiled"
+
+
+def traced_bytes(stories, max_choices: int):
+    for story in stories:
+        story.ResetState()
+    gc.collect()
+    tracemalloc.start()
+    for story in stories:
+        play(story, max_choices)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return traced
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--choices", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    stories = []
+    for path in sorted(INKFILES_DIR.rglob("*.ink.json")):
+        if args.filter not in path.relative_to(INKFILES_DIR).as_posix():
+            continue
+        text = path.read_text(encoding="utf-8-sig")
+        try:
+            play(CountingStory(text), args.choices)
+        except Exception:
+            continue
+        stories.append(Story(text))
+    steps = CountingStory.steps
+
+    plain = traced_bytes(stories, args.choices)
+
+    kept = []
+    original_init = Pointer.__init__
+
+    def keeping_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        kept.append(self)
+
+    Pointer.__init__ = keeping_init
+    try:
+        with_pointers = traced_bytes(stories, args.choices)
+    finally:
+        Pointer.__init__ = original_init
+    # The list itself grew while tracing too, and isn't pointers.
+    pointer_bytes = with_pointers - plain - (sys.getsizeof(kept) - sys.getsizeof([]))
+
+    print(f"{len(stories)} stories, {steps} steps per run")
+    print(f"pointers per step: {len(kept) / steps:.2f}")
+    print(f"pointer bytes per step (tracemalloc): {pointer_bytes / steps:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Story steps per second, playing every compiled story in the test corpus.
+
+    python benchmarks/bench_steps.py [--repeat N] [--filter SUBSTRING] [--choices N] [--flatten-knots]
+
+Each story is played from the start, always taking the first choice. Stories
+that raise while playing are left out, so every run covers the same steps.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+INKFILES_DIR = ROOT / "tests" / "inkfiles" / "compiled"
+
+
+class CountingStory(Story):
+    steps = 0
+
+    def Step(self):
+        CountingStory.steps += 1
+        super().Step()
+
+
+def play(story: Story, max_choices: int):
+    story.allowExternalFunctionFallbacks = True
+    story.onError = lambda message, error_type: None
+    story.state.storySeed = 7
+    for _ in range(max_choices + 1):
+        story.ContinueMaximally()
+        if not story.currentChoices:
+            break
+        story.ChooseChoiceIndex(0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--choices", type=int, default=20)
+    parser.add_argument("--flatten-knots", action="store_true")
+    args = parser.parse_args(argv)
+
+    stories = []
+    for path in sorted(INKFILES_DIR.rglob("*.ink.json")):
+        if args.filter not in path.relative_to(INKFILES_DIR).as_posix():
+            continue
+        text = path.read_text(encoding="utf-8-sig")
+        try:
+            play(CountingStory(text), args.choices)
+        except Exception:
+            continue
+        stories.append(Story(text, flatten_knots=args.flatten_knots))
+    steps = CountingStory.steps
+
+    timings = []
+    for _ in range(args.repeat):
+        elapsed = 0.0
+        for story in stories:
+            story.ResetState()
+            start = time.perf_counter()
+            play(story, args.choices)
+            elapsed += time.perf_counter() - start
+        timings.append(elapsed)
+
+    # Best of N, like timeit: slower runs measure the machine, not the engine.
+    best = min(timings)
+    print(f"{len(stories)} stories, {steps} steps per run")
+    print(f"best of {args.repeat}: {best * 1000:.1f} ms, {steps / best:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
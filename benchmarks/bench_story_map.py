@@ -0,0 +1,101 @@
+"""Per-process memory of workers that each load the same story, from JSON or from a story map.
+
+    python benchmarks/bench_story_map.py [--copies N] [--workers N] [--touch FRACTION]
+
+The story is the synthetic one bench_lazy_knots.py builds. Each worker loads it,
+looks up a fraction of its knots and reports its private memory (USS) and its
+proportional share of shared pages (PSS) from /proc/self/smaps_rollup, so this
+only runs on Linux.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench_lazy_knots import build_story_text  # noqa: E402
+from inkpython import Story  # noqa: E402
+from inkpython.engine.story_map import StoryMap  # noqa: E402
+
+MODES = ("json", "json lazy", "map", "map lazy")
+
+
+def memory_kib():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Private_Clean"] + fields["Private_Dirty"], fields["Pss"]
+
+
+def worker(mode, json_path, map_path, touch, barrier, results):
+    baseline_uss, baseline_pss = memory_kib()
+    start = time.perf_counter()
+    if mode.startswith("json"):
+        story = Story(Path(json_path).read_text(encoding="utf-8"), lazy_knots=mode == "json lazy")
+    else:
+        story = Story.from_mapped(map_path, lazy_knots=mode == "map lazy")
+    load_ms = (time.perf_counter() - start) * 1000
+
+    knot_names = [name for name in story.mainContentContainer.lazyNamedContent or story.mainContentContainer.namedContent]
+    for name in knot_names[: int(len(knot_names) * touch)]:
+        story.KnotContainerWithName(name)
+
+    # Measure while every worker is alive, so shared pages are split between them.
+    barrier.wait()
+    uss, pss = memory_kib()
+    results.put((load_ms, uss - baseline_uss, pss - baseline_pss))
+    barrier.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--touch", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    text = build_story_text(args.copies)
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_path = Path(temp_dir) / "story.ink.json"
+        map_path = Path(temp_dir) / "story.inkm"
+        json_path.write_text(text, encoding="utf-8")
+        StoryMap.Write(map_path, text)
+
+        print(
+            f"story: {len(text) / 2**20:.1f} MiB of JSON, {map_path.stat().st_size / 2**20:.1f} MiB story map, "
+            f"{args.workers} workers touching {args.touch:.0%} of knots"
+        )
+        print(f"{'mode':<10}  {'load ms':>8}  {'USS MiB':>8}  {'PSS MiB':>8}")
+        for mode in MODES:
+            barrier = context.Barrier(args.workers)
+            results = context.Queue()
+            workers = [
+                context.Process(target=worker, args=(mode, str(json_path), str(map_path), args.touch, barrier, results))
+                for _ in range(args.workers)
+            ]
+            for process in workers:
+                process.start()
+            rows = [results.get() for _ in workers]
+            for process in workers:
+                process.join()
+            load_ms = min(row[0] for row in rows)
+            uss = sum(row[1] for row in rows) / len(rows) / 1024
+            pss = sum(row[2] for row in rows) / len(rows) / 1024
+            print(f"{mode:<10}  {load_ms:>8.1f}  {uss:>8.1f}  {pss:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Cost of forking a call stack thread, as each generated choice does, against call stack depth.
+
+    python benchmarks/bench_thread_forks.py [--depths N,N,...] [--repeat N]
+
+The call stack is N tunnels deep, each frame with a few temporary variables.
+Each round forks the thread for one choice and then moves the pointer on, like
+the step after a choice point does. It's timed both with ForkThread, and with
+LazyForkThread, which is what choices use and which only records the fork.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+from inkpython.engine.call_stack import CallStack  # noqa: E402
+from inkpython.engine.push_pop import PushPopType  # noqa: E402
+from inkpython.engine.value import IntValue  # noqa: E402
+
+ROUNDS = 1000
+TEMPORARIES = 4
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depths", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    story = Story(json.dumps({"inkVersion": 21, "root": ["done", None], "listDefs": {}}))
+    print(f"{'depth':>6}  {'us/fork':>8}  {'us/lazy fork':>12}")
+    for depth in (int(n) for n in args.depths.split(",")):
+        call_stack = CallStack(story_context=story)
+        for _ in range(depth):
+            for t in range(TEMPORARIES):
+                call_stack.SetTemporaryVariable(f"temp{t}", IntValue(t), True)
+            call_stack.Push(PushPopType.Tunnel)
+        pointer = call_stack.currentElement.currentPointer
+
+        best = []
+        for fork in (call_stack.ForkThread, call_stack.LazyForkThread):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for _ in range(ROUNDS):
+                    fork()
+                    call_stack.currentElement.currentPointer = pointer
+                timings.append(time.perf_counter() - start)
+            best.append(min(timings))
+        print(f"{depth:>6}  {best[0] / ROUNDS * 1e6:>8.2f}  {best[1] / ROUNDS * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Values made per story step, and the garbage collections they cause, playing every compiled story in the test corpus.
+
+    python benchmarks/bench_value_allocations.py [--repeat N] [--filter SUBSTRING] [--choices N]
+
+Values are counted as they're made, including the ones the engine makes while
+running (counts, arithmetic results, text). Collections are the young
+generation's, over one play through of every story.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench_steps import CountingStory, play  # noqa: E402
+from inkpython import Story  # noqa: E402
+from inkpython.engine.value import Value  # noqa: E402
+
+INKFILES_DIR = ROOT / "tests" / "inkfiles" / "compiled"
+
+
+def play_all(stories, max_choices: int):
+    for story in stories:
+        story.ResetState()
+    elapsed = 0.0
+    for story in stories:
+        start = time.perf_counter()
+        play(story, max_choices)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--choices", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    stories = []
+    for path in sorted(INKFILES_DIR.rglob("*.ink.json")):
+        if args.filter not in path.relative_to(INKFILES_DIR).as_posix():
+            continue
+        text = path.read_text(encoding="utf-8-sig")
+        try:
+            play(CountingStory(text), args.choices)
+        except Exception:
+            continue
+        stories.append(Story(text))
+    steps = CountingStory.steps
+
+    made = 0
+    original_init = Value.__init__
+
+    def counting_init(self, val):
+        nonlocal made
+        made += 1
+        original_init(self, val)
+
+    Value.__init__ = counting_init
+    try:
+        play_all(stories, args.choices)
+    finally:
+        Value.__init__ = original_init
+
+    gc.collect()
+    collections = gc.get_stats()[0]["collections"]
+    play_all(stories, args.choices)
+    collections = gc.get_stats()[0]["collections"] - collections
+
+    best = min(play_all(stories, args.choices) for _ in range(args.repeat))
+    print(f"{len(stories)} stories, {steps} steps per run")
+    print(f"values per step: {made / steps:.2f}")
+    print(f"young collections per run: {collections}")
+    print(f"best of {args.repeat}: {best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Cost of counting visits, and of saving and loading the counts, against the number of counted knots.
+
+    python benchmarks/bench_visit_counts.py [--knots N,N,...] [--turns N] [--repeat N]
+
+The story is played through every knot for a few turns. Each knot reads its
+own visit count and the turns since it was last visited, and diverts to the
+next. Then, for each knot, the visit is counted and both counts read again
+straight from the state, as the story does, both as is and while the state is
+being patched, as it is while looking ahead past a newline. Last, the state is
+saved and loaded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+
+def build_story_text(knot_count: int) -> str:
+    knots = {}
+    for i in range(knot_count):
+        next_target = {"->": f"knot{i + 1}"} if i + 1 < knot_count else "done"
+        knots[f"knot{i}"] = [
+            "ev",
+            {"CNT?": ".^"},
+            "pop",
+            {"^->": f"knot{i}"},
+            "turns",
+            "pop",
+            "/ev",
+            next_target,
+            {"#f": 3},
+        ]
+    root = [["^turn", "\n", "done", None], "done", knots]
+    return json.dumps({"inkVersion": 21, "root": root, "listDefs": {}})
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--knots", default="10,100,1000")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'knots':>6}  {'us/visit':>8}  {'patched':>8}  {'ms/save':>8}  {'ms/load':>8}")
+    for knot_count in (int(n) for n in args.knots.split(",")):
+        story = Story(build_story_text(knot_count))
+        for _ in range(args.turns):
+            story.ChoosePathString("knot0")
+            story.ContinueMaximally()
+        state = story.state
+        knots = [story.KnotContainerWithName(f"knot{i}") for i in range(knot_count)]
+
+        def visit():
+            for knot in knots:
+                state.IncrementVisitCountForContainer(knot)
+                state.RecordTurnIndexVisitToContainer(knot)
+                state.VisitCountForContainer(knot)
+                state.TurnsSinceForContainer(knot)
+
+        def visit_patched():
+            state.SnapshotAndStartPatching()
+            visit()
+            state.ApplyAnyPatch()
+            state.DiscardSnapshot()
+
+        visits = best_of(args.repeat, visit) / knot_count
+        patched = best_of(args.repeat, visit_patched) / knot_count
+        saved = state.ToJson()
+        save = best_of(args.repeat, state.ToJson)
+        load = best_of(args.repeat, lambda: state.LoadJson(saved))
+        print(
+            f"{knot_count:>6}  {visits * 1e6:>8.2f}  {patched * 1e6:>8.2f}  {save * 1e3:>8.2f}  {load * 1e3:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Play time of stories whose containers have many children.
+
+    python benchmarks/bench_wide_containers.py [--widths N,N,...] [--repeat N]
+
+Each story is a root container holding N small unnamed containers, one after
+another, so the content pointer climbs out of a container once per child.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from inkpython import Story  # noqa: E402
+
+
+def build_story_text(width: int) -> str:
+    children = [["ev", i, "pop", "/ev", None] for i in range(width)]
+    root = [*children, "^done", "\n", "done", None]
+    return json.dumps({"inkVersion": 21, "root": root, "listDefs": {}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--widths", default="100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'width':>6}  {'steps':>7}  {'best ms':>8}  {'us/step':>8}")
+    for width in (int(w) for w in args.widths.split(",")):
+        story = Story(build_story_text(width))
+        steps = width * 4 + 3
+        timings = []
+        for _ in range(args.repeat):
+            story.ResetState()
+            start = time.perf_counter()
+            story.ContinueMaximally()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{width:>6}  {steps:>7}  {best * 1000:>8.1f}  {best / steps * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
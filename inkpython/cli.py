@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
 
 from .engine.story import Story
+from .engine.story_map import StoryMap
+
+
+def load_story(story_path: Path):
+    if story_path.suffix == ".inkc":
+        return Story.from_compiled(story_path)
+    if story_path.suffix == ".inkm":
+        return Story.from_mapped(story_path)
+    return Story(story_path.read_text(encoding="utf-8-sig"))
 
 
 def play_story(json_path: Path):
-    text = json_path.read_text(encoding="utf-8-sig")
-    story = Story(text)
+    story = load_story(json_path)
 
     print("--- Story start ---")
     while True:
@@ -38,10 +47,45 @@ def play_story(json_path: Path):
     print("\n--- The End ---")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Play a compiled Ink JSON story")
+def precompile_story(json_path: Path, output_path: Path | None = None, mapped: bool = False):
+    if output_path is None:
+        output_path = json_path.with_suffix("").with_suffix(".inkm" if mapped else ".inkc")
+    json_text = json_path.read_text(encoding="utf-8-sig")
+    if mapped:
+        StoryMap.Write(output_path, json_text)
+    else:
+        Story(json_text).save_compiled(output_path)
+    return output_path
+
+
+def precompile_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="inkpython precompile", description="Precompile an Ink JSON story into a binary .inkc cache"
+    )
     parser.add_argument("json_path", type=Path, help="Path to compiled .ink.json")
-    args = parser.parse_args()
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Output path (defaults to <story>.inkc)")
+    parser.add_argument(
+        "--mapped", action="store_true", help="Write a memory-mappable .inkm story map that processes can share"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.json_path.exists():
+        raise SystemExit(f"File not found: {args.json_path}")
+
+    output_path = precompile_story(args.json_path, args.output, args.mapped)
+    print(f"Wrote {output_path}")
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "precompile":
+        precompile_main(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(description="Play a compiled Ink JSON story")
+    parser.add_argument("json_path", type=Path, help="Path to compiled .ink.json, precompiled .inkc or .inkm")
+    args = parser.parse_args(argv)
 
     if not args.json_path.exists():
         raise SystemExit(f"File not found: {args.json_path}")
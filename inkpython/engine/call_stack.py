@@ -16,8 +16,17 @@ from .value import ListValue
 
 class CallStack:
     class Element:
+        __slots__ = (
+            "currentPointer",
+            "inExpressionEvaluation",
+            "temporaryVariables",
+            "type",
+            "evaluationStackHeightWhenPushed",
+            "functionStartInOutputStream",
+        )
+
         def __init__(self, stack_type: PushPopType, pointer: Pointer, in_expression_evaluation: bool = False):
-            self.currentPointer = pointer.copy()
+            self.currentPointer = pointer
             self.inExpressionEvaluation = in_expression_evaluation
             self.temporaryVariables = {}
             self.type = stack_type
@@ -32,10 +41,18 @@ class CallStack:
             return copy
 
     class Thread:
+        __slots__ = ("callstack", "threadIndex", "previousPointer", "isShared", "sharedDepth")
+
         def __init__(self, j_thread_obj=None, story_context=None):
             self.callstack: List[CallStack.Element] = []
             self.threadIndex = 0
             self.previousPointer = Pointer.Null()
+            # Set while a state snapshot holds this thread, see ShareThreads.
+            self.isShared = False
+            # Elements below this depth may be shared with copies of the
+            # thread, so they're copied before they change. Those above it
+            # belong to this thread alone.
+            self.sharedDepth = 0
 
             if j_thread_obj is not None and story_context is not None:
                 self.threadIndex = int(j_thread_obj.get("threadIndex", 0))
@@ -49,8 +66,7 @@ class CallStack:
                     if current_container_path_str_token is not None:
                         current_container_path_str = str(current_container_path_str_token)
                         thread_pointer_result = story_context.ContentAtPath(Path(current_container_path_str))
-                        pointer.container = thread_pointer_result.container
-                        pointer.index = int(j_element_obj.get("idx"))
+                        pointer = Pointer(thread_pointer_result.container, int(j_element_obj.get("idx")))
 
                         if thread_pointer_result.obj is None:
                             raise ValueError(
@@ -64,7 +80,7 @@ class CallStack:
                                     "When loading state, exact internal story location couldn't be found: '"
                                     + current_container_path_str
                                     + "', so it was approximated to '"
-                                    + pointer.container.path.componentsString
+                                    + pointer.container.pathString
                                     + "' to recover. Has the story changed since this save data was created?"
                                 )
                             else:
@@ -91,11 +107,19 @@ class CallStack:
         def Copy(self):
             copy = CallStack.Thread()
             copy.threadIndex = self.threadIndex
-            for element in self.callstack:
-                copy.callstack.append(element.Copy())
-            copy.previousPointer = self.previousPointer.copy()
+            copy.callstack = list(self.callstack)
+            copy.previousPointer = self.previousPointer
+            self.sharedDepth = copy.sharedDepth = len(self.callstack)
             return copy
 
+        def ElementToModify(self, index: int):
+            element = self.callstack[index]
+            if index < self.sharedDepth:
+                element = self.callstack[index] = element.Copy()
+                if index == self.sharedDepth - 1:
+                    self.sharedDepth = index
+            return element
+
         def WriteJson(self, writer: SimpleJson.Writer):
             writer.WriteObjectStart()
 
@@ -106,7 +130,7 @@ class CallStack:
                 if not el.currentPointer.isNull:
                     if el.currentPointer.container is None:
                         return throw_null_exception("el.currentPointer.container")
-                    writer.WriteProperty("cPath", el.currentPointer.container.path.componentsString)
+                    writer.WriteProperty("cPath", el.currentPointer.container.pathString)
                     writer.WriteIntProperty("idx", el.currentPointer.index)
                 writer.WriteProperty("exp", el.inExpressionEvaluation)
                 writer.WriteIntProperty("type", el.type)
@@ -124,18 +148,46 @@ class CallStack:
                 resolved_pointer = self.previousPointer.Resolve()
                 if resolved_pointer is None:
                     return throw_null_exception("this.previousPointer.Resolve()")
-                writer.WriteProperty("previousContentObject", resolved_pointer.path.toString())
+                # Interned leaves don't know their own path, so take it from the pointer.
+                if resolved_pointer is not self.previousPointer.container:
+                    resolved_path = self.previousPointer.path
+                else:
+                    resolved_path = resolved_pointer.path
+                writer.WriteProperty("previousContentObject", resolved_path.toString())
             writer.WriteObjectEnd()
 
+    class LazyFork:
+        # What ForkThread would have made, without making it: the elements it
+        # would share with the thread it came from, which stay as they are
+        # since that thread copies them before changing them. Forks made while
+        # the elements below the top one don't change share one list of them.
+        # Choices hold one of these until their thread is needed.
+        __slots__ = ("frames", "top", "previousPointer", "threadIndex")
+
+        def __init__(self, frames: List, top, previous_pointer: Pointer, thread_index: int):
+            self.frames = frames
+            self.top = top
+            self.previousPointer = previous_pointer
+            self.threadIndex = thread_index
+
+        def Materialise(self):
+            thread = CallStack.Thread()
+            thread.callstack = self.frames + [self.top]
+            thread.sharedDepth = len(thread.callstack)
+            thread.threadIndex = self.threadIndex
+            thread.previousPointer = self.previousPointer
+            return thread
+
     def __init__(self, story_context=None, to_copy=None):
         self._threadCounter = 0
+        self._lazyForkFrames: List[CallStack.Element] = []
         if story_context is not None:
             self._startOfRoot = Pointer.StartOf(story_context.rootContentContainer)
             self.Reset()
         elif to_copy is not None:
             self._threads = [thread.Copy() for thread in to_copy._threads]
             self._threadCounter = to_copy._threadCounter
-            self._startOfRoot = to_copy._startOfRoot.copy()
+            self._startOfRoot = to_copy._startOfRoot
         else:
             self._startOfRoot = Pointer.Null()
             self._threads = []
@@ -152,8 +204,12 @@ class CallStack:
     @property
     def currentElement(self):
         thread = self._threads[-1]
-        cs = thread.callstack
-        return cs[-1]
+        if thread.isShared:
+            thread = self.currentThread
+        depth = len(thread.callstack)
+        if depth > thread.sharedDepth:
+            return thread.callstack[-1]
+        return thread.ElementToModify(depth - 1)
 
     @property
     def currentElementIndex(self):
@@ -161,7 +217,10 @@ class CallStack:
 
     @property
     def currentThread(self):
-        return self._threads[-1]
+        thread = self._threads[-1]
+        if thread.isShared:
+            thread = self._threads[-1] = thread.Copy()
+        return thread
 
     @currentThread.setter
     def currentThread(self, value):
@@ -200,18 +259,49 @@ class CallStack:
         writer.WriteInt(self._threadCounter)
         writer.WritePropertyEnd()
 
+    def ShareThreads(self):
+        # Hands the threads as they are now to a state snapshot. Each one is
+        # copied the first time it's current again, before anything can change
+        # it, so only the threads that are actually used get copied.
+        for thread in self._threads:
+            thread.isShared = True
+        shared = (self._threads, self._threadCounter)
+        self._threads = list(self._threads)
+        return shared
+
+    def RestoreSharedThreads(self, shared):
+        threads, self._threadCounter = shared
+        for thread in threads:
+            thread.isShared = False
+        self._threads = threads
+
+    def StopSharingThreads(self):
+        for thread in self._threads:
+            thread.isShared = False
+
     def PushThread(self):
-        new_thread = self.currentThread.Copy()
+        new_thread = self._threads[-1].Copy()
         self._threadCounter += 1
         new_thread.threadIndex = self._threadCounter
         self._threads.append(new_thread)
 
     def ForkThread(self):
-        forked_thread = self.currentThread.Copy()
+        forked_thread = self._threads[-1].Copy()
         self._threadCounter += 1
         forked_thread.threadIndex = self._threadCounter
         return forked_thread
 
+    def LazyForkThread(self):
+        thread = self._threads[-1]
+        thread.sharedDepth = len(thread.callstack)
+        frames = thread.callstack[:-1]
+        if frames == self._lazyForkFrames:
+            frames = self._lazyForkFrames
+        else:
+            self._lazyForkFrames = frames
+        self._threadCounter += 1
+        return CallStack.LazyFork(frames, thread.callstack[-1], thread.previousPointer, self._threadCounter)
+
     def PopThread(self):
         if self.canPopThread:
             self._threads.pop()
@@ -227,7 +317,7 @@ class CallStack:
         return self.currentElement.type == PushPopType.FunctionEvaluationFromGame
 
     def Push(self, stack_type: PushPopType, external_evaluation_stack_height: int = 0, output_stream_length_with_pushed: int = 0):
-        element = CallStack.Element(stack_type, self.currentElement.currentPointer, False)
+        element = CallStack.Element(stack_type, self.callStack[-1].currentPointer, False)
         element.evaluationStackHeightWhenPushed = external_evaluation_stack_height
         element.functionStartInOutputStream = output_stream_length_with_pushed
         self.callStack.append(element)
@@ -241,7 +331,9 @@ class CallStack:
 
     def Pop(self, stack_type: PushPopType | None = None):
         if self.CanPop(stack_type):
-            self.callStack.pop()
+            thread = self.currentThread
+            thread.callstack.pop()
+            thread.sharedDepth = min(thread.sharedDepth, len(thread.callstack))
         else:
             raise ValueError("Mismatched push/pop in Callstack")
 
@@ -255,7 +347,7 @@ class CallStack:
     def SetTemporaryVariable(self, name: str, value, declare_new: bool, context_index: int = -1):
         if context_index == -1:
             context_index = self.currentElementIndex + 1
-        context_element = self.callStack[context_index - 1]
+        context_element = self.currentThread.ElementToModify(context_index - 1)
         if not declare_new and name not in context_element.temporaryVariables:
             raise ValueError("Could not find temporary variable to set: " + name)
         old_value = try_get_value_from_map(context_element.temporaryVariables, name, None)
@@ -296,6 +388,6 @@ class CallStack:
                     sb.Append("<SOMEWHERE IN ")
                     if pointer.container is None:
                         return throw_null_exception("pointer.container")
-                    sb.Append(pointer.container.path.componentsString)
+                    sb.Append(pointer.container.pathString)
                     sb.AppendLine(">")
         return str(sb)
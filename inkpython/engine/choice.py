@@ -11,17 +11,66 @@ if TYPE_CHECKING:
 
 
 class Choice(InkObject):
+    __slots__ = (
+        "text",
+        "index",
+        "_threadAtGeneration",
+        "_lazyThread",
+        "_sourcePath",
+        "_sourceChoicePoint",
+        "targetPath",
+        "isInvisibleDefault",
+        "tags",
+        "originalThreadIndex",
+    )
+
     def __init__(self):
         super().__init__()
         self.text = ""
         self.index = 0
-        self.threadAtGeneration: Optional["CallStack.Thread"] = None
-        self.sourcePath = ""
+        self._threadAtGeneration: Optional["CallStack.Thread"] = None
+        self._lazyThread: Optional["CallStack.LazyFork"] = None
+        self._sourcePath = ""
+        self._sourceChoicePoint = None
         self.targetPath: Optional[Path] = None
         self.isInvisibleDefault = False
         self.tags: Optional[list[str]] = None
         self.originalThreadIndex = 0
 
+    @staticmethod
+    def Generated(choice_point, lazy_thread: "CallStack.LazyFork"):
+        # The thread and source path are only worked out if they're asked
+        # for, since usually just one of the choices is taken.
+        choice = Choice()
+        choice._sourceChoicePoint = choice_point
+        choice._sourcePath = None
+        choice._lazyThread = lazy_thread
+        return choice
+
+    @property
+    def threadAtGeneration(self) -> Optional["CallStack.Thread"]:
+        if self._lazyThread is not None:
+            self._threadAtGeneration = self._lazyThread.Materialise()
+            self._lazyThread = None
+        return self._threadAtGeneration
+
+    @threadAtGeneration.setter
+    def threadAtGeneration(self, value: Optional["CallStack.Thread"]):
+        self._threadAtGeneration = value
+        self._lazyThread = None
+
+    @property
+    def sourcePath(self) -> str:
+        if self._sourcePath is None:
+            self._sourcePath = self._sourceChoicePoint.path.toString()
+            self._sourceChoicePoint = None
+        return self._sourcePath
+
+    @sourcePath.setter
+    def sourcePath(self, value: str):
+        self._sourcePath = value
+        self._sourceChoicePoint = None
+
     @property
     def pathStringOnChoice(self) -> str:
         if self.targetPath is None:
@@ -35,11 +84,13 @@ class Choice(InkObject):
     def Clone(self):
         copy = Choice()
         copy.text = self.text
-        copy.sourcePath = self.sourcePath
+        copy._sourcePath = self._sourcePath
+        copy._sourceChoicePoint = self._sourceChoicePoint
         copy.index = self.index
         copy.targetPath = self.targetPath
         copy.originalThreadIndex = self.originalThreadIndex
         copy.isInvisibleDefault = self.isInvisibleDefault
-        if self.threadAtGeneration is not None:
-            copy.threadAtGeneration = self.threadAtGeneration.Copy()
+        copy._lazyThread = self._lazyThread
+        if self._threadAtGeneration is not None:
+            copy._threadAtGeneration = self._threadAtGeneration.Copy()
         return copy
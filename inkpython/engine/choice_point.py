@@ -9,9 +9,20 @@ from .path import Path
 
 
 class ChoicePoint(InkObject):
+    __slots__ = (
+        "_pathOnChoice",
+        "_choiceTarget",
+        "hasCondition",
+        "hasStartContent",
+        "hasChoiceOnlyContent",
+        "isInvisibleDefault",
+        "onceOnly",
+    )
+
     def __init__(self, once_only: bool = True):
         super().__init__()
         self._pathOnChoice: Optional[Path] = None
+        self._choiceTarget: Optional[Container] = None
         self.hasCondition = False
         self.hasStartContent = False
         self.hasChoiceOnlyContent = False
@@ -29,12 +40,27 @@ class ChoicePoint(InkObject):
     @pathOnChoice.setter
     def pathOnChoice(self, value: Optional[Path]):
         self._pathOnChoice = value
+        self._choiceTarget = None
 
     @property
     def choiceTarget(self) -> Optional[Container]:
+        if self._choiceTarget is None:
+            if self._pathOnChoice is None:
+                return throw_null_exception("ChoicePoint._pathOnChoice")
+            self._choiceTarget = self.ResolvePath(self._pathOnChoice).container
+        return self._choiceTarget
+
+    def Link(self, dangling_targets: list):
         if self._pathOnChoice is None:
-            return throw_null_exception("ChoicePoint._pathOnChoice")
-        return self.ResolvePath(self._pathOnChoice).container
+            return
+        result = self.ResolvePath(self._pathOnChoice)
+        if result.container is None or result.approximate:
+            dangling_targets.append(
+                "Choice at '" + self.path.componentsString + "' has missing target '" + str(self._pathOnChoice) + "'"
+            )
+        self._choiceTarget = result.container
+        # Store the absolute path so saving a choice never resolves it again.
+        self.pathOnChoice
 
     @property
     def pathStringOnChoice(self) -> str:
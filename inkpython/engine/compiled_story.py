@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+from .container import Container
+from .list_definitions_origin import ListDefinitionsOrigin
+
+
+# Header (magic, format version, SHA-256 of the source .ink.json, payload length,
+# CRC32 of the payload) followed by a pickle of the linked content tree, list
+# definitions and dangling target report. Pickle is only safe for trusted input:
+# load caches you built yourself.
+class CompiledStory:
+    kMagic = b"INKPYC"
+    kFormatVersion = 7
+    kNoSourceHash = bytes(32)
+
+    _header = struct.Struct("<6sH32sQI")
+
+    @staticmethod
+    def SourceHash(json_text: str) -> bytes:
+        if json_text.startswith("\ufeff"):
+            json_text = json_text.lstrip("\ufeff")
+        return hashlib.sha256(json_text.encode("utf-8")).digest()
+
+    @staticmethod
+    def Write(
+        file_path,
+        container: Container,
+        list_definitions: Optional[ListDefinitionsOrigin],
+        dangling_targets: List[str],
+        source_hash: Optional[bytes] = None,
+    ):
+        # The container must be linked already, with dangling_targets what
+        # linking it reported.
+        payload = pickle.dumps((container, list_definitions, dangling_targets), protocol=pickle.HIGHEST_PROTOCOL)
+        header = CompiledStory._header.pack(
+            CompiledStory.kMagic,
+            CompiledStory.kFormatVersion,
+            source_hash or CompiledStory.kNoSourceHash,
+            len(payload),
+            zlib.crc32(payload),
+        )
+        # Other workers may be reading the cache while it's rebuilt, so it's
+        # written beside it and then swapped in, never truncated in place.
+        # Each writer gets its own temporary file, in case several rebuild it.
+        temp_path = str(file_path) + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def Read(
+        file_path, source_hash: Optional[bytes] = None
+    ) -> Tuple[Container, ListDefinitionsOrigin, List[str], bytes]:
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        header_size = CompiledStory._header.size
+        if len(data) < header_size:
+            raise ValueError("Compiled story file is truncated: " + str(file_path))
+        magic, format_version, stored_source_hash, payload_length, checksum = CompiledStory._header.unpack_from(data)
+        if magic != CompiledStory.kMagic:
+            raise ValueError("Not a compiled ink story: " + str(file_path))
+        if format_version != CompiledStory.kFormatVersion:
+            raise ValueError(
+                "Compiled story format version "
+                + str(format_version)
+                + " doesn't match the engine's version "
+                + str(CompiledStory.kFormatVersion)
+                + ", so it must be precompiled again."
+            )
+        if source_hash is not None and stored_source_hash != source_hash:
+            raise ValueError("Compiled story is out of date with its source .ink.json: " + str(file_path))
+
+        payload = memoryview(data)[header_size:]
+        if len(payload) != payload_length or zlib.crc32(payload) != checksum:
+            raise ValueError("Compiled story checksum mismatch, the file is corrupt: " + str(file_path))
+
+        # Unpickling allocates the whole tree in one go; cyclic GC passes over
+        # the half-built graph only slow that down.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            container, list_definitions, dangling_targets = pickle.loads(payload)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return container, list_definitions, dangling_targets, stored_source_hash
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+import threading
 from typing import Dict, List, Optional
 
 from .debug import Debug
@@ -8,12 +10,24 @@ from .object import InkObject
 from .path import Path
 from .search_result import SearchResult
 from .string_builder import StringBuilder
-from .try_get_result import try_get_value_from_map
 from .type_assertion import as_inamed_content_or_null, as_or_null, as_or_throws
 from .value import StringValue
 
 
 class Container(InkObject):
+    __slots__ = (
+        "name",
+        "_content",
+        "_namedContent",
+        "_lazyNamedContent",
+        "visitsShouldBeCounted",
+        "turnIndexShouldBeCounted",
+        "countingAtStartOnly",
+        "_pathToFirstLeafContent",
+        "_pathString",
+        "countIndex",
+    )
+
     class CountFlags:
         Start = 0
         Visits = 1
@@ -24,11 +38,15 @@ class Container(InkObject):
         super().__init__()
         self.name: Optional[str] = None
         self._content: List[InkObject] = []
-        self.namedContent: Dict[str, object] = {}
+        self._namedContent: Dict[str, object] = {}
+        self._lazyNamedContent: Optional[Dict[str, object]] = None
         self.visitsShouldBeCounted = False
         self.turnIndexShouldBeCounted = False
         self.countingAtStartOnly = False
         self._pathToFirstLeafContent: Optional[Path] = None
+        self._pathString: Optional[str] = None
+        # Where the story's states keep this container's visit count and turn index, once it has a slot.
+        self.countIndex = -1
 
     @property
     def hasValidName(self):
@@ -38,6 +56,104 @@ class Container(InkObject):
     def content(self):
         return self._content
 
+    @property
+    def namedContent(self):
+        if self._lazyNamedContent is not None:
+            self.LoadAllLazyNamedContent()
+        return self._namedContent
+
+    @property
+    def loadedNamedContent(self):
+        return self._namedContent
+
+    @property
+    def unloadedNamedContent(self):
+        lazy_named_content = self._lazyNamedContent
+        if lazy_named_content is None:
+            return []
+        return [unloaded for unloaded in lazy_named_content.values() if not isinstance(unloaded, InkObject)]
+
+    @property
+    def lazyNamedContent(self):
+        return self._lazyNamedContent
+
+    @lazyNamedContent.setter
+    def lazyNamedContent(self, value: Optional[Dict[str, object]]):
+        # Named-only containers kept as compact JSON text, or as a
+        # MappedContainer in a story map, until something looks them up by
+        # name. Loaded ones stay in this dict too, in place of what they were
+        # loaded from, so that loading the rest keeps the original order.
+        self._lazyNamedContent = dict(value) if value else None
+
+    def NamedContentWithName(self, name: str):
+        # The lazy dict first: once it's gone, the named content has everything.
+        lazy_named_content = self._lazyNamedContent
+        named_content = self._namedContent.get(name)
+        if named_content is None and lazy_named_content is not None:
+            unloaded = lazy_named_content.get(name)
+            if isinstance(unloaded, InkObject):
+                named_content = unloaded
+            elif unloaded is not None:
+                named_content = self.LoadLazyNamedContent(name, unloaded)
+        return named_content
+
+    # Sessions spawned from a lazy story share its tree and load knots into it
+    # as they reach them. Loading is one at a time, and a knot is published in
+    # a new named content dict rather than added to the one others may be
+    # iterating over.
+    _lazyLoadLock = threading.RLock()
+
+    def LoadLazyNamedContent(self, name: str, unloaded):
+        from .json_serialisation import JsonSerialisation
+        from .simple_json import SimpleJson
+
+        with Container._lazyLoadLock:
+            # Another session may have loaded it while this one waited.
+            loaded = self._namedContent.get(name)
+            if loaded is not None:
+                return loaded
+            if isinstance(unloaded, str):
+                j_array = SimpleJson.TextToArray(unloaded, JsonSerialisation.JObjectHook)
+                container = JsonSerialisation.JArrayToContainer(j_array, True)
+            else:
+                container = unloaded.Inflate()
+            container.name = name
+            container.parent = self
+            named_content = dict(self._namedContent)
+            named_content[name] = container
+            self._namedContent = named_content
+            self._lazyNamedContent[name] = container
+            return container
+
+    def LoadAllLazyNamedContent(self):
+        with Container._lazyLoadLock:
+            lazy_named_content = self._lazyNamedContent
+            if lazy_named_content is None:
+                return
+            for name, unloaded in lazy_named_content.items():
+                if not isinstance(unloaded, InkObject):
+                    self.LoadLazyNamedContent(name, unloaded)
+
+            named_content = {k: v for k, v in self._namedContent.items() if k not in lazy_named_content}
+            named_content.update(lazy_named_content)
+            self._namedContent = named_content
+            self._lazyNamedContent = None
+
+    def LoadAllLazyContent(self):
+        # Every lazy knot and stitch below this container too, e.g. before the
+        # whole tree is linked or saved.
+        if self._lazyNamedContent is not None:
+            self.LoadAllLazyNamedContent()
+        named_in_content = set()
+        for content in self._content:
+            if isinstance(content, Container):
+                content.LoadAllLazyContent()
+                if content.hasValidName:
+                    named_in_content.add(content.name)
+        for name, named_content in self._namedContent.items():
+            if name not in named_in_content and isinstance(named_content, Container):
+                named_content.LoadAllLazyContent()
+
     @content.setter
     def content(self, value: List[InkObject]):
         self.AddContent(value)
@@ -64,8 +180,8 @@ class Container(InkObject):
         existing_named_only = self.namedOnlyContent
         if existing_named_only:
             for key in list(existing_named_only.keys()):
-                if key in self.namedContent:
-                    del self.namedContent[key]
+                if key in self._namedContent:
+                    del self._namedContent[key]
         if value is None:
             return
         for val in value.values():
@@ -95,6 +211,14 @@ class Container(InkObject):
         if value & Container.CountFlags.CountStartOnly:
             self.countingAtStartOnly = True
 
+    @property
+    def pathString(self):
+        # Saved visit counts and turn indices are keyed by this, so it's
+        # interned to make every lookup an identity hit.
+        if self._pathString is None:
+            self._pathString = sys.intern(self.path.componentsString)
+        return self._pathString
+
     @property
     def pathToFirstLeafContent(self):
         if self._pathToFirstLeafContent is None:
@@ -119,6 +243,7 @@ class Container(InkObject):
                 self.AddContent(content)
         else:
             content_obj = content_obj_or_list
+            content_obj.indexInParent = len(self._content)
             self._content.append(content_obj)
             if content_obj.parent:
                 raise ValueError("content is already in " + str(content_obj.parent))
@@ -136,7 +261,7 @@ class Container(InkObject):
         runtime_obj.parent = self
         if named_content_obj.name is None:
             return throw_null_exception("namedContentObj.name")
-        self.namedContent[named_content_obj.name] = named_content_obj
+        self._namedContent[named_content_obj.name] = named_content_obj
 
     def ContentAtPath(self, path: Path, partial_path_start: int = 0, partial_path_length: int = -1):
         if partial_path_length == -1:
@@ -170,16 +295,59 @@ class Container(InkObject):
         result.obj = current_obj
         return result
 
+    def Link(self, dangling_targets: list):
+        self.pathString
+        named_in_content = set()
+        for content in self._content:
+            content.Link(dangling_targets)
+            if isinstance(content, Container) and content.hasValidName:
+                named_in_content.add(content.name)
+        # Knots still waiting to be lazily loaded are resolved on first use instead.
+        # A snapshot, since a divert can load a lazy knot into this container.
+        for name, named_content in list(self._namedContent.items()):
+            if name not in named_in_content:
+                named_content.Link(dangling_targets)
+
+    def InternLeaves(self, interned: dict):
+        # Swaps each leaf for the first equal one seen, which is detached from
+        # any parent. Where a shared leaf sits is then only known from the
+        # (container, index) pointers the engine already works with.
+        named_in_content = set()
+        content = self._content
+        for i, obj in enumerate(content):
+            if isinstance(obj, Container):
+                obj.InternLeaves(interned)
+                if obj.hasValidName:
+                    named_in_content.add(obj.name)
+                continue
+            key = obj.internKey
+            if key is None or obj.ownDebugMetadata is not None:
+                continue
+            shared = interned.get(key)
+            if shared is None:
+                shared = interned[key] = obj
+                shared.parent = None
+                shared.indexInParent = -1
+                shared._path = None
+            content[i] = shared
+        for name, named_content in self._namedContent.items():
+            if name not in named_in_content:
+                named_content.InternLeaves(interned)
+
     def InsertContent(self, content_obj: InkObject, index: int):
         self.content.insert(index, content_obj)
+        for i in range(index, len(self.content)):
+            self.content[i].indexInParent = i
         if content_obj.parent:
             raise ValueError("content is already in " + str(content_obj.parent))
         content_obj.parent = self
         self.TryAddNamedContent(content_obj)
 
     def AddContentsOfContainer(self, other_container: "Container"):
+        start_index = len(self.content)
         self.content.extend(other_container.content)
-        for obj in other_container.content:
+        for i, obj in enumerate(other_container.content, start_index):
+            obj.indexInParent = i
             obj.parent = self
             self.TryAddNamedContent(obj)
 
@@ -192,9 +360,9 @@ class Container(InkObject):
             return self.parent
         if component.name is None:
             return throw_null_exception("component.name")
-        found_content = try_get_value_from_map(self.namedContent, component.name, None)
-        if found_content.exists:
-            return as_or_throws(found_content.result, InkObject)
+        found_content = self.NamedContentWithName(component.name)
+        if found_content is not None:
+            return as_or_throws(found_content, InkObject)
         return None
 
     def BuildStringOfHierarchy(self, sb: StringBuilder | None = None, indentation: int = 0, pointed_obj=None):
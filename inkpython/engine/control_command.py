@@ -4,6 +4,8 @@ from .object import InkObject
 
 
 class ControlCommand(InkObject):
+    __slots__ = ("_commandType",)
+
     class CommandType(IntEnum):
         NotSet = -1
         EvalStart = 0
@@ -42,6 +44,10 @@ class ControlCommand(InkObject):
     def commandType(self):
         return self._commandType
 
+    @property
+    def internKey(self):
+        return (ControlCommand, self._commandType)
+
     def Copy(self):
         return ControlCommand(self.commandType)
 
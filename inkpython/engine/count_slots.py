@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List
+
+from .container import Container
+
+
+class CountSlots:
+    # Gives each counted container of a story a dense index into the visit
+    # count and turn index arrays of its states. The containers loaded when
+    # the story is get theirs up front, in content order; knots loaded later
+    # get theirs the first time they're counted. Saves are keyed by path, so
+    # a path can also get a slot before its container is loaded, or when the
+    # story no longer has it, which keeps its count around to save again.
+    # Sessions spawned from a story share its content, and so its slots, which
+    # they may give out from several threads at once.
+    __slots__ = ("paths", "_slotsByPath", "_allocateLock")
+
+    def __init__(self, root: Container):
+        self.paths: List[str] = []
+        self._slotsByPath: Dict[str, int] = {}
+        self._allocateLock = threading.Lock()
+        containers = [root]
+        while containers:
+            container = containers.pop()
+            if container.visitsShouldBeCounted or container.turnIndexShouldBeCounted:
+                container.countIndex = self.SlotForPath(container.pathString)
+            else:
+                # In case the content was pickled along with another story's slots.
+                container.countIndex = -1
+            in_content = [c for c in container._content if isinstance(c, Container)]
+            if container._namedContent:
+                names_in_content = {c.name for c in in_content if c.hasValidName}
+                containers.extend(
+                    c
+                    for name, c in reversed(container._namedContent.items())
+                    if name not in names_in_content and isinstance(c, Container)
+                )
+            containers.extend(reversed(in_content))
+
+    def SlotForContainer(self, container: Container) -> int:
+        slot = container.countIndex
+        if slot < 0:
+            slot = self.SlotForPath(container.pathString)
+            container.countIndex = slot
+        return slot
+
+    def SlotForPath(self, path_string: str) -> int:
+        slot = self._slotsByPath.get(path_string)
+        if slot is None:
+            with self._allocateLock:
+                slot = self._slotsByPath.get(path_string)
+                if slot is None:
+                    # The path goes in first, so a slot that can be seen is
+                    # always within the paths.
+                    slot = len(self.paths)
+                    self.paths.append(path_string)
+                    self._slotsByPath[path_string] = slot
+        return slot
+
+    def SlotsForPaths(self, path_strings) -> List[int]:
+        slots_by_path = self._slotsByPath
+        slots = [slots_by_path.get(path_string, -1) for path_string in path_strings]
+        if -1 in slots:
+            slots = [self.SlotForPath(p) if slot < 0 else slot for p, slot in zip(path_strings, slots)]
+        return slots
+
+    def SlotAtPath(self, path_string: str) -> int:
+        return self._slotsByPath.get(path_string, -1)
@@ -1,4 +1,13 @@
 class DebugMetadata:
+    __slots__ = (
+        "startLineNumber",
+        "endLineNumber",
+        "startCharacterNumber",
+        "endCharacterNumber",
+        "fileName",
+        "sourceName",
+    )
+
     def __init__(self):
         self.startLineNumber = 0
         self.endLineNumber = 0
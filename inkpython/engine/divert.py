@@ -12,6 +12,17 @@ from .string_builder import StringBuilder
 
 
 class Divert(InkObject):
+    __slots__ = (
+        "_targetPath",
+        "_targetPointer",
+        "variableDivertName",
+        "pushesToStack",
+        "stackPushType",
+        "isExternal",
+        "externalArgs",
+        "isConditional",
+    )
+
     def __init__(self, stack_push_type: Optional[PushPopType] = None):
         super().__init__()
         self._targetPath: Optional[Path] = None
@@ -29,9 +40,11 @@ class Divert(InkObject):
     @property
     def targetPath(self):
         if self._targetPath is not None and self._targetPath.isRelative:
-            target_obj = self.targetPointer.Resolve()
+            target_pointer = self.targetPointer
+            target_obj = target_pointer.Resolve()
             if target_obj:
-                self._targetPath = target_obj.path
+                # An interned leaf has no parent, so only its pointer knows its path.
+                self._targetPath = target_obj.path if target_obj is target_pointer.container else target_pointer.path
         return self._targetPath
 
     @targetPath.setter
@@ -42,19 +55,39 @@ class Divert(InkObject):
     @property
     def targetPointer(self):
         if self._targetPointer.isNull:
-            target_obj = self.ResolvePath(self._targetPath).obj
-            if self._targetPath is None:
-                return throw_null_exception("this._targetPath")
-            if self._targetPath.lastComponent is None:
-                return throw_null_exception("this._targetPath.lastComponent")
-            if self._targetPath.lastComponent.isIndex:
-                if target_obj is None:
-                    return throw_null_exception("targetObj")
-                self._targetPointer.container = target_obj.parent if isinstance(target_obj.parent, Container) else None
-                self._targetPointer.index = self._targetPath.lastComponent.index
-            else:
-                self._targetPointer = Pointer.StartOf(target_obj if isinstance(target_obj, Container) else None)
-        return self._targetPointer.copy()
+            self.SetTargetPointerFromObj(self.ResolvePath(self._targetPath).obj)
+        return self._targetPointer
+
+    def SetTargetPointerFromObj(self, target_obj):
+        if self._targetPath is None:
+            return throw_null_exception("this._targetPath")
+        if self._targetPath.lastComponent is None:
+            return throw_null_exception("this._targetPath.lastComponent")
+        if self._targetPath.lastComponent.isIndex:
+            if target_obj is None:
+                return throw_null_exception("targetObj")
+            container = target_obj.parent
+            if not isinstance(container, Container):
+                # An interned leaf has no parent, so its container is found by
+                # the path up to the index instead.
+                path = self._targetPath
+                container_path = Path([path.GetComponent(i) for i in range(path.length - 1)], path.isRelative)
+                container = self.ResolvePath(container_path).container
+            self._targetPointer = Pointer(container, self._targetPath.lastComponent.index)
+        else:
+            self._targetPointer = Pointer.StartOf(target_obj if isinstance(target_obj, Container) else None)
+
+    def Link(self, dangling_targets: list):
+        if self.hasVariableTarget or self.isExternal or self._targetPath is None:
+            return
+        result = self.ResolvePath(self._targetPath)
+        if result.obj is None or result.approximate:
+            dangling_targets.append(
+                "Divert at '" + self.path.componentsString + "' has missing target '" + str(self._targetPath) + "'"
+            )
+            if result.obj is None:
+                return
+        self.SetTargetPointerFromObj(result.obj)
 
     @property
     def targetPathString(self):
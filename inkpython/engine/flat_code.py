@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional
+
+from .container import Container
+from .pointer import Pointer
+
+
+# Knots compiled to one flat instruction list, for Story(flatten_knots=True).
+#
+# A knot here is a named-only container together with the containers nested in
+# its content: the pointer only ever leaves those through a divert, so every
+# move inside one can be worked out ahead of time. Each pointer position
+# (container, index) gets one instruction, at bases[container] + index, holding
+#   enterVisits: the containers Step counts a visit to on its way in
+#   pointer:     the position Step ends up at, on the first leaf inside
+#   obj:         the content object at that position
+#   nextPointer: the position IncrementContentPointer moves this one on to,
+#                or None if it runs out of content
+#
+# Sessions spawned from a story share its flat code. Knots are compiled one at
+# a time, and a knot's bases are only published once its instructions are in
+# place, so a session that finds a base can always read what it points at.
+class FlatCode:
+    __slots__ = ("rootContainer", "bases", "instructions", "_compileLock")
+
+    def __init__(self, root_container: Container):
+        self.rootContainer = root_container
+        self.bases: Dict[Container, int] = {}
+        self.instructions: List[tuple] = []
+        self._compileLock = threading.Lock()
+
+    def InstructionAt(self, container: Optional[Container], index: int) -> Optional[tuple]:
+        base = self.bases.get(container)
+        if base is None:
+            base = self.AddKnotContaining(container)
+            if base is None:
+                return None
+        if 0 <= index < len(container._content):
+            return self.instructions[base + index]
+        return None
+
+    def AddKnotContaining(self, container: Optional[Container]) -> Optional[int]:
+        if not isinstance(container, Container):
+            return None
+        knot = container
+        while knot.indexInParent >= 0 and isinstance(knot.parent, Container):
+            knot = knot.parent
+        # Only content that belongs to the story. A temporary evaluation
+        # container would otherwise be kept alive here for good.
+        if knot is not self.rootContainer and not isinstance(knot.parent, Container):
+            return None
+
+        with self._compileLock:
+            # Another session may have compiled it while this one waited.
+            base = self.bases.get(container)
+            if base is not None:
+                return base
+
+            containers = []
+            stack = [knot]
+            while stack:
+                c = stack.pop()
+                containers.append(c)
+                stack.extend(reversed([obj for obj in c._content if isinstance(obj, Container)]))
+
+            bases = {}
+            instructions = []
+            base = len(self.instructions)
+            for c in containers:
+                bases[c] = base + len(instructions)
+                for index in range(len(c._content)):
+                    instructions.append(FlatCode.CompileInstruction(c, index))
+            self.instructions.extend(instructions)
+            self.bases.update(bases)
+            return bases.get(container)
+
+    @staticmethod
+    def CompileInstruction(container: Container, index: int) -> tuple:
+        # Mirrors the descent at the start of Story.Step.
+        enter_visits = []
+        pointer = Pointer(container, index)
+        obj = container._content[index]
+        while isinstance(obj, Container):
+            if obj.visitsShouldBeCounted or obj.turnIndexShouldBeCounted:
+                enter_visits.append(obj)
+            if len(obj._content) == 0:
+                break
+            pointer = Pointer.StartOf(obj)
+            obj = obj._content[0]
+
+        # Mirrors Story.IncrementContentPointer.
+        next_pointer = Pointer(container, index + 1)
+        while next_pointer.index >= len(next_pointer.container._content):
+            ancestor = next_pointer.container.parent
+            if not isinstance(ancestor, Container) or next_pointer.container.indexInParent < 0:
+                next_pointer = None
+                break
+            next_pointer = Pointer(ancestor, next_pointer.container.indexInParent + 1)
+
+        return tuple(enter_visits), pointer, obj, next_pointer
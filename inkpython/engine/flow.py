@@ -4,6 +4,7 @@ from .call_stack import CallStack
 from .choice import Choice
 from .json_serialisation import JsonSerialisation
 from .null_exception import throw_null_exception
+from .output_stream_marks import OutputStreamMarks
 from .simple_json import SimpleJson
 
 
@@ -11,9 +12,11 @@ class Flow:
     def __init__(self, name: str, story, j_object=None):
         self.name = name
         self.callStack = CallStack(story_context=story)
+        self.outputStreamMarks = OutputStreamMarks()
         if j_object is not None:
             self.callStack.SetJsonToken(j_object["callstack"], story)
             self.outputStream = JsonSerialisation.JArrayToRuntimeObjList(j_object["outputStream"])
+            self.outputStreamMarks.Update(self.outputStream)
             self.currentChoices = JsonSerialisation.JArrayToRuntimeObjList(j_object["currentChoices"])
             j_choice_threads_obj = j_object.get("choiceThreads")
             if j_choice_threads_obj is not None:
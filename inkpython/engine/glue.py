@@ -2,5 +2,11 @@ from .object import InkObject
 
 
 class Glue(InkObject):
+    __slots__ = ()
+
+    @property
+    def internKey(self):
+        return (Glue,)
+
     def __str__(self):
         return "Glue"
@@ -15,6 +15,8 @@ class KeyValuePair:
 
 
 class InkListItem:
+    __slots__ = ("originName", "itemName")
+
     def __init__(self, origin_name: Optional[str] = None, item_name: Optional[str] = None):
         self.originName = None
         self.itemName = None
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import json
-import re
-from typing import Dict, List
+from functools import partial
+from typing import Callable, Dict, List, Optional
 
 from .choice import Choice
 from .choice_point import ChoicePoint
@@ -28,7 +28,6 @@ from .value import (
     IntValue,
     ListValue,
     StringValue,
-    Value,
     VariablePointerValue,
 )
 from .variable_assignment import VariableAssignment
@@ -66,15 +65,22 @@ class JsonSerialisation:
         "/#",
     ]
 
+    _tokenDecoders: Optional[Dict[type, Callable]] = None
+    _stringDecoders: Optional[Dict[str, Callable]] = None
+    _objectDecoders: Optional[Dict[str, Callable]] = None
+
     @staticmethod
-    def JArrayToRuntimeObjList(j_array: List, skip_last: bool = False):
+    def JArrayToRuntimeObjList(j_array: List, skip_last: bool = False, consume: bool = False):
         count = len(j_array)
         if skip_last:
             count -= 1
         result_list: List[InkObject] = []
         for i in range(count):
             j_tok = j_array[i]
-            runtime_obj = JsonSerialisation.JTokenToRuntimeObject(j_tok)
+            if consume and isinstance(j_tok, list):
+                runtime_obj = JsonSerialisation.JArrayToContainer(j_tok, True)
+            else:
+                runtime_obj = JsonSerialisation.JTokenToRuntimeObject(j_tok)
             if runtime_obj is None:
                 return throw_null_exception("runtimeObj")
             result_list.append(runtime_obj)
@@ -303,149 +309,170 @@ class JsonSerialisation:
             writer.WritePropertyEnd()
         writer.WriteObjectEnd()
 
+    @staticmethod
+    def GenerateDecodersIfNecessary():
+        if JsonSerialisation._tokenDecoders is not None:
+            return
+
+        # Bare string tokens: a factory per command, operator and keyword, so
+        # decoding is a single lookup. "^text" is handled before the lookup.
+        NativeFunctionCall.GenerateNativeFunctionsIfNecessary()
+        string_decoders = {}
+        for name in NativeFunctionCall._nativeFunctions:
+            if name != NativeFunctionCall.Intersect:
+                string_decoders[name] = partial(NativeFunctionCall.CallWithName, name)
+        string_decoders["L^"] = partial(NativeFunctionCall.CallWithName, NativeFunctionCall.Intersect)
+        for i, cmd_name in enumerate(JsonSerialisation._controlCommandNames):
+            string_decoders[cmd_name] = partial(ControlCommand, ControlCommand.CommandType(i))
+        string_decoders["\n"] = partial(StringValue, "\n")
+        string_decoders["<>"] = Glue
+        string_decoders["void"] = Void
+        JsonSerialisation._stringDecoders = string_decoders
+
+        # Objects are identified by a key only they carry. The ink compiler
+        # writes it first, so the scan normally stops at the first key.
+        JsonSerialisation._objectDecoders = {
+            "^->": JsonSerialisation.JObjectToDivertTargetValue,
+            "^var": JsonSerialisation.JObjectToVariablePointerValue,
+            "->": partial(JsonSerialisation.JObjectToDivert, "->", False, PushPopType.Function, False),
+            "f()": partial(JsonSerialisation.JObjectToDivert, "f()", True, PushPopType.Function, False),
+            "->t->": partial(JsonSerialisation.JObjectToDivert, "->t->", True, PushPopType.Tunnel, False),
+            "x()": partial(JsonSerialisation.JObjectToDivert, "x()", False, PushPopType.Function, True),
+            "*": JsonSerialisation.JObjectToChoicePoint,
+            "VAR?": JsonSerialisation.JObjectToVariableReference,
+            "CNT?": JsonSerialisation.JObjectToReadCountReference,
+            "VAR=": partial(JsonSerialisation.JObjectToVariableAssignment, "VAR=", True),
+            "temp=": partial(JsonSerialisation.JObjectToVariableAssignment, "temp=", False),
+            "#": JsonSerialisation.JObjectToTag,
+            "list": JsonSerialisation.JObjectToListValue,
+            "originalChoicePath": JsonSerialisation.JObjectToChoice,
+        }
+
+        JsonSerialisation._tokenDecoders = {
+            str: JsonSerialisation.JStringToRuntimeObject,
+            dict: JsonSerialisation.JObjectToRuntimeObject,
+            list: JsonSerialisation.JArrayToContainer,
+            # Decimal literals are always ink floats, even when integral ("2.0").
+            float: FloatValue,
+            int: IntValue,
+            bool: BoolValue,
+        }
+
     @staticmethod
     def JTokenToRuntimeObject(token):
-        if isinstance(token, (int, float, bool)):
-            return Value.Create(token)
-
-        if isinstance(token, str):
-            str_value = str(token)
-            float_repr = re.match(r"^([0-9]+\.[0-9]+)f$", str_value)
-            if float_repr:
-                return FloatValue(float(float_repr.group(1)))
-
-            first_char = str_value[0] if str_value else ""
-            if first_char == "^":
-                return StringValue(str_value[1:])
-            if first_char == "\n" and len(str_value) == 1:
-                return StringValue("\n")
-
-            if str_value == "<>":
-                return Glue()
-
-            for i, cmd_name in enumerate(JsonSerialisation._controlCommandNames):
-                if str_value == cmd_name:
-                    return ControlCommand(ControlCommand.CommandType(i))
-
-            if str_value == "L^":
-                str_value = "^"
-            if NativeFunctionCall.CallExistsWithName(str_value):
-                return NativeFunctionCall.CallWithName(str_value)
-
-            if str_value == "->->":
-                return ControlCommand.PopTunnel()
-            if str_value == "~ret":
-                return ControlCommand.PopFunction()
-            if str_value == "void":
-                return Void()
-
-        if isinstance(token, dict):
-            obj = token
-            if "^->" in obj:
-                prop_value = obj["^->"]
-                return DivertTargetValue(Path(str(prop_value)))
-
-            if "^var" in obj:
-                prop_value = obj["^var"]
-                var_ptr = VariablePointerValue(str(prop_value))
-                if "ci" in obj:
-                    var_ptr.contextIndex = int(obj["ci"])
-                return var_ptr
-
-            is_divert = False
-            pushes_to_stack = False
-            div_push_type = PushPopType.Function
-            external = False
-            prop_value = None
-            if "->" in obj:
-                prop_value = obj["->"]
-                is_divert = True
-            elif "f()" in obj:
-                prop_value = obj["f()"]
-                is_divert = True
-                pushes_to_stack = True
-                div_push_type = PushPopType.Function
-            elif "->t->" in obj:
-                prop_value = obj["->t->"]
-                is_divert = True
-                pushes_to_stack = True
-                div_push_type = PushPopType.Tunnel
-            elif "x()" in obj:
-                prop_value = obj["x()"]
-                is_divert = True
-                external = True
-
-            if is_divert:
-                divert = Divert()
-                divert.pushesToStack = pushes_to_stack
-                divert.stackPushType = div_push_type
-                divert.isExternal = external
-                target = str(prop_value)
-                if "var" in obj:
-                    divert.variableDivertName = target
-                else:
-                    divert.targetPathString = target
-                divert.isConditional = bool(obj.get("c"))
-                if external and "exArgs" in obj:
-                    divert.externalArgs = int(obj["exArgs"])
-                return divert
-
-            if "*" in obj:
-                choice = ChoicePoint()
-                choice.pathStringOnChoice = str(obj["*"])
-                if "flg" in obj:
-                    choice.flags = int(obj["flg"])
-                return choice
-
-            if "VAR?" in obj:
-                return VariableReference(str(obj["VAR?"]))
-            if "CNT?" in obj:
-                read_count_var_ref = VariableReference()
-                read_count_var_ref.pathStringForCount = str(obj["CNT?"])
-                return read_count_var_ref
-
-            is_var_ass = False
-            is_global_var = False
-            if "VAR=" in obj:
-                prop_value = obj["VAR="]
-                is_var_ass = True
-                is_global_var = True
-            elif "temp=" in obj:
-                prop_value = obj["temp="]
-                is_var_ass = True
-                is_global_var = False
-            if is_var_ass:
-                var_name = str(prop_value)
-                is_new_decl = not obj.get("re")
-                var_ass = VariableAssignment(var_name, is_new_decl)
-                var_ass.isGlobal = is_global_var
-                return var_ass
-
-            if "#" in obj:
-                return Tag(str(obj["#"]))
-
-            if "list" in obj:
-                list_content = obj["list"]
-                raw_list = InkList()
-                if "origins" in obj:
-                    raw_list.SetInitialOriginNames(obj["origins"])
-                for key, name_to_val in list_content.items():
-                    item = InkListItem(str(key))
-                    val = int(name_to_val)
-                    raw_list.Add(item, val)
-                return ListValue(raw_list)
-
-            if obj.get("originalChoicePath") is not None:
-                return JsonSerialisation.JObjectToChoice(obj)
-
-        if isinstance(token, list):
-            return JsonSerialisation.JArrayToContainer(token)
+        JsonSerialisation.GenerateDecodersIfNecessary()
+        decoder = JsonSerialisation._tokenDecoders.get(token.__class__)
+        if decoder is not None:
+            runtime_obj = decoder(token)
+            if runtime_obj is not None:
+                return runtime_obj
+        elif isinstance(token, InkObject):
+            # Already decoded by JObjectHook while the text was being parsed.
+            return token
 
         if token is None:
             return None
 
         raise ValueError("Failed to convert token to runtime object: " + json.dumps(token))
 
+    @staticmethod
+    def JStringToRuntimeObject(token: str):
+        if token[:1] == "^":
+            return StringValue(token[1:])
+        decoder = JsonSerialisation._stringDecoders.get(token)
+        return decoder() if decoder is not None else None
+
+    @staticmethod
+    def JObjectToRuntimeObject(obj: Dict):
+        JsonSerialisation.GenerateDecodersIfNecessary()
+        object_decoders = JsonSerialisation._objectDecoders
+        for key in obj:
+            decoder = object_decoders.get(key)
+            if decoder is not None:
+                return decoder(obj)
+        return None
+
+    @staticmethod
+    def JObjectToDivertTargetValue(obj: Dict):
+        return DivertTargetValue(Path(str(obj["^->"])))
+
+    @staticmethod
+    def JObjectToVariablePointerValue(obj: Dict):
+        var_ptr = VariablePointerValue(str(obj["^var"]))
+        if "ci" in obj:
+            var_ptr.contextIndex = int(obj["ci"])
+        return var_ptr
+
+    @staticmethod
+    def JObjectToDivert(key: str, pushes_to_stack: bool, div_push_type: PushPopType, external: bool, obj: Dict):
+        divert = Divert()
+        divert.pushesToStack = pushes_to_stack
+        divert.stackPushType = div_push_type
+        divert.isExternal = external
+        target = str(obj[key])
+        if "var" in obj:
+            divert.variableDivertName = target
+        else:
+            divert.targetPathString = target
+        divert.isConditional = bool(obj.get("c"))
+        if external and "exArgs" in obj:
+            divert.externalArgs = int(obj["exArgs"])
+        return divert
+
+    @staticmethod
+    def JObjectToChoicePoint(obj: Dict):
+        choice = ChoicePoint()
+        choice.pathStringOnChoice = str(obj["*"])
+        if "flg" in obj:
+            choice.flags = int(obj["flg"])
+        return choice
+
+    @staticmethod
+    def JObjectToVariableReference(obj: Dict):
+        return VariableReference(str(obj["VAR?"]))
+
+    @staticmethod
+    def JObjectToReadCountReference(obj: Dict):
+        read_count_var_ref = VariableReference()
+        read_count_var_ref.pathStringForCount = str(obj["CNT?"])
+        return read_count_var_ref
+
+    @staticmethod
+    def JObjectToVariableAssignment(key: str, is_global_var: bool, obj: Dict):
+        is_new_decl = not obj.get("re")
+        var_ass = VariableAssignment(str(obj[key]), is_new_decl)
+        var_ass.isGlobal = is_global_var
+        return var_ass
+
+    @staticmethod
+    def JObjectToTag(obj: Dict):
+        return Tag(str(obj["#"]))
+
+    @staticmethod
+    def JObjectToListValue(obj: Dict):
+        list_content = obj["list"]
+        raw_list = InkList()
+        if "origins" in obj:
+            raw_list.SetInitialOriginNames(obj["origins"])
+        for key, name_to_val in list_content.items():
+            item = InkListItem(str(key))
+            val = int(name_to_val)
+            raw_list.Add(item, val)
+        return ListValue(raw_list)
+
+    @staticmethod
+    def JObjectHook(obj: Dict):
+        # json.loads object_hook: decodes leaf objects (diverts, variable
+        # references, tags...) as soon as they are parsed, so their dicts are
+        # dropped straight away instead of living alongside the runtime tree.
+        # Container terminators, list definitions and list literals stay as
+        # dicts, since a knot or list may legitimately be named "list" or
+        # "originalChoicePath".
+        if "list" in obj or "originalChoicePath" in obj:
+            return obj
+        runtime_obj = JsonSerialisation.JObjectToRuntimeObject(obj)
+        return obj if runtime_obj is None else runtime_obj
+
     @staticmethod
     def JObjectToDictionaryRuntimeObjs(j_object: Dict):
         result = {}
@@ -476,24 +503,37 @@ class JsonSerialisation:
         return choice
 
     @staticmethod
-    def JArrayToContainer(j_array: List):
+    def JArrayToContainer(j_array: List, consume: bool = False, lazy: bool = False):
+        # consume empties each array once it's decoded, so a token tree that was
+        # parsed only to build this container is freed while the container grows.
+        # lazy keeps this container's named-only subcontainers (the knots, for
+        # the root) as JSON text until they're first looked up by name.
         container = Container()
-        container.content = JsonSerialisation.JArrayToRuntimeObjList(j_array, True)
+        container.content = JsonSerialisation.JArrayToRuntimeObjList(j_array, True, consume)
         terminating_obj = j_array[-1] if j_array else None
         if terminating_obj is not None and isinstance(terminating_obj, dict):
             named_only_content = {}
+            lazy_named_content = {}
             for key, value in terminating_obj.items():
                 if key == "#f":
                     container.countFlags = int(value)
                 elif key == "#n":
                     container.name = str(value)
+                elif lazy and isinstance(value, list):
+                    lazy_named_content[key] = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
                 else:
-                    named_content_item = JsonSerialisation.JTokenToRuntimeObject(value)
+                    if consume and isinstance(value, list):
+                        named_content_item = JsonSerialisation.JArrayToContainer(value, True)
+                    else:
+                        named_content_item = JsonSerialisation.JTokenToRuntimeObject(value)
                     named_sub_container = as_or_null(named_content_item, Container)
                     if named_sub_container:
                         named_sub_container.name = key
                     named_only_content[key] = named_content_item
             container.namedOnlyContent = named_only_content
+            container.lazyNamedContent = lazy_named_content
+        if consume:
+            j_array.clear()
         return container
 
     @staticmethod
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 from .ink_list import InkList, InkListItem
 from .null_exception import throw_null_exception
@@ -8,14 +8,24 @@ from .object import InkObject
 from .path import Path
 from .story_exception import StoryException
 from .type_assertion import as_boolean_or_throws, as_or_null, as_or_throws
-from .value import BoolValue, IntValue, ListValue, Value, ValueType
+from .value import BoolValue, FloatValue, IntValue, ListValue, StringValue, Value, ValueType
 from .void import Void
 
 BinaryOp = Callable[[object, object], object]
 UnaryOp = Callable[[object], object]
+BinaryCall = Callable[[Value, Value], Value]
 
 
 class NativeFunctionCall(InkObject):
+    __slots__ = (
+        "_name",
+        "_numberOfParameters",
+        "_prototype",
+        "_isPrototype",
+        "_operationFuncs",
+        "_cachedCall",
+    )
+
     Add = "+"
     Subtract = "-"
     Divide = "/"
@@ -49,6 +59,8 @@ class NativeFunctionCall(InkObject):
     Invert = "LIST_INVERT"
 
     _nativeFunctions: Dict[str, "NativeFunctionCall"] | None = None
+    _binaryCalls: Dict[Tuple[str, type, type], Optional[BinaryCall]] = {}
+    kNoCachedCall: Tuple[Optional[type], Optional[type], Optional[BinaryCall]] = (None, None, None)
 
     @staticmethod
     def CallWithName(function_name: str):
@@ -66,6 +78,11 @@ class NativeFunctionCall(InkObject):
         self._prototype: NativeFunctionCall | None = None
         self._isPrototype = False
         self._operationFuncs: Dict[int, BinaryOp | UnaryOp] | None = None
+        # The value classes of the operands this call was last made with, and
+        # the call for them that skips the checks and coercion (see
+        # BinaryCallForTypes). One tuple, read and replaced whole, since
+        # sessions sharing the content may call it from several threads.
+        self._cachedCall = NativeFunctionCall.kNoCachedCall
 
         if name is None and number_of_parameters is None:
             NativeFunctionCall.GenerateNativeFunctionsIfNecessary()
@@ -77,6 +94,21 @@ class NativeFunctionCall(InkObject):
             self.name = name
             self.numberOfParameters = number_of_parameters
 
+    def __getstate__(self):
+        # Prototypes hold the operator lambdas; instances re-link to theirs by name.
+        state = {slot: getattr(self, slot) for slot in InkObject.__slots__ + NativeFunctionCall.__slots__}
+        state["_prototype"] = None
+        del state["_cachedCall"]
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._cachedCall = NativeFunctionCall.kNoCachedCall
+        if not self._isPrototype and self._name is not None:
+            NativeFunctionCall.GenerateNativeFunctionsIfNecessary()
+            self.name = self._name
+
     @property
     def name(self):
         if self._name is None:
@@ -101,8 +133,23 @@ class NativeFunctionCall(InkObject):
     def numberOfParameters(self, value: int):
         self._numberOfParameters = value
 
+    @property
+    def internKey(self):
+        # Not shared: each call site caches the call for the operand types it
+        # sees, which sharing would turn into one cache per operator.
+        return None
+
     def Call(self, parameters: List[InkObject]):
         if self._prototype:
+            if len(parameters) == 2:
+                param1, param2 = parameters
+                type1, type2, binary_call = self._cachedCall
+                if param1.__class__ is type1 and param2.__class__ is type2:
+                    return binary_call(param1, param2)
+                binary_call = self._prototype.BinaryCallForTypes(param1.__class__, param2.__class__)
+                if binary_call is not None:
+                    self._cachedCall = (param1.__class__, param2.__class__, binary_call)
+                    return binary_call(param1, param2)
             return self._prototype.Call(parameters)
 
         if self.numberOfParameters != len(parameters):
@@ -129,6 +176,48 @@ class NativeFunctionCall(InkObject):
             return self.CallType(coerced_params)
         return None
 
+    def BinaryCallForTypes(self, type1: type, type2: type) -> Optional[BinaryCall]:
+        # For the common operand types, a call that gives what Call would for
+        # them, straight from their values. None if they need the full Call.
+        key = (self._name, type1, type2)
+        if key not in NativeFunctionCall._binaryCalls:
+            NativeFunctionCall._binaryCalls[key] = self.MakeBinaryCall(type1, type2)
+        return NativeFunctionCall._binaryCalls[key]
+
+    def MakeBinaryCall(self, type1: type, type2: type) -> Optional[BinaryCall]:
+        if self._numberOfParameters != 2 or self._operationFuncs is None:
+            return None
+        result_value = NativeFunctionCall.ResultValue
+        types = {type1, type2}
+        if types == {IntValue}:
+            op = self._operationFuncs.get(ValueType.Int)
+            if op is not None:
+                return lambda v1, v2: result_value(op(v1.value, v2.value))
+        elif types <= {IntValue, FloatValue}:
+            # Coercing an int to a float keeps its value as it was.
+            op = self._operationFuncs.get(ValueType.Float)
+            if op is not None:
+                return lambda v1, v2: result_value(op(v1.value, v2.value))
+        elif types <= {IntValue, BoolValue}:
+            # Booleans are coerced to ints.
+            op = self._operationFuncs.get(ValueType.Int)
+            if op is not None:
+                return lambda v1, v2: result_value(op(int(v1.value), int(v2.value)))
+        elif types == {StringValue}:
+            op = self._operationFuncs.get(ValueType.String)
+            if op is not None:
+                return lambda v1, v2: result_value(op(v1.value, v2.value))
+        return None
+
+    @staticmethod
+    def ResultValue(result):
+        result_type = result.__class__
+        if result_type is int:
+            return IntValue.Of(result)
+        if result_type is bool:
+            return BoolValue.Of(result)
+        return Value.Create(result)
+
     def CallType(self, parameters_of_single_type: List[Value]):
         param1 = as_or_throws(parameters_of_single_type[0], Value)
         val_type = param1.valueType
@@ -182,7 +271,7 @@ class NativeFunctionCall(InkObject):
             if op is None:
                 return throw_null_exception("NativeFunctionCall.CallBinaryListOperation op")
             result = as_boolean_or_throws(op(1 if v1.isTruthy else 0, 1 if v2.isTruthy else 0))
-            return BoolValue(result)
+            return BoolValue.Of(result)
 
         if v1.valueType == ValueType.List and v2.valueType == ValueType.List:
             return self.CallType([v1, v2])
@@ -14,10 +14,13 @@ if TYPE_CHECKING:
 
 
 class InkObject:
+    __slots__ = ("parent", "_debug_metadata", "_path", "indexInParent")
+
     def __init__(self):
         self.parent: Optional["InkObject"] = None
         self._debug_metadata: Optional["DebugMetadata"] = None
         self._path: Optional["Path"] = None
+        self.indexInParent = -1
 
     @property
     def debugMetadata(self) -> Optional["DebugMetadata"]:
@@ -63,11 +66,12 @@ class InkObject:
                     if named_child is not None and named_child.hasValidName:
                         if named_child.name is None:
                             return throw_null_exception("namedChild.name")
-                        comps.insert(0, Path.Component(named_child.name))
+                        comps.append(Path.Component(named_child.name))
                     else:
-                        comps.insert(0, Path.Component(container.content.index(child)))
+                        comps.append(Path.Component(child.indexInParent))
                     child = container
                     container = as_or_null(container.parent, Container)
+                comps.reverse()
                 self._path = Path(comps)
         return self._path
 
@@ -144,6 +148,18 @@ class InkObject:
     def Copy(self):
         raise NotImplementedError("Doesn't support copying")
 
+    @property
+    def internKey(self):
+        # Leaves that don't depend on where they sit return a key here, so
+        # equal ones can share a single instance (see Container.InternLeaves).
+        return None
+
+    def Link(self, dangling_targets: list):
+        # Resolves static path targets to direct references, appending a
+        # description of any target that doesn't exist. Overridden by the
+        # objects that have one.
+        pass
+
     def SetChild(self, obj, prop: str, value):
         if getattr(obj, prop, None) is not None:
             setattr(obj, prop, None)
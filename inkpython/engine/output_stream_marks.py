@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import List
+
+from .control_command import ControlCommand
+from .glue import Glue
+from .value import StringValue
+
+
+class OutputStreamMarks:
+    # Indexes into a flow's output stream of the objects StoryState looks back
+    # for, so it can answer questions about the end of the stream without
+    # scanning it. Each list is in stream order; after the stream changes
+    # from some index on, Update drops the marks from there and rescans.
+    #   beginStrings:       BeginString commands
+    #   glueOrBeginStrings: glue and BeginString commands
+    #   texts:              string values
+    #   lineEnds:           control commands, newlines and non-whitespace
+    #                       text, i.e. whatever decides if the stream ends
+    #                       in a newline
+    __slots__ = ("beginStrings", "glueOrBeginStrings", "texts", "lineEnds")
+
+    def __init__(self):
+        self.beginStrings: List[int] = []
+        self.glueOrBeginStrings: List[int] = []
+        self.texts: List[int] = []
+        self.lineEnds: List[int] = []
+
+    def Copy(self):
+        copy = OutputStreamMarks()
+        copy.beginStrings = list(self.beginStrings)
+        copy.glueOrBeginStrings = list(self.glueOrBeginStrings)
+        copy.texts = list(self.texts)
+        copy.lineEnds = list(self.lineEnds)
+        return copy
+
+    def Add(self, obj, index: int):
+        if isinstance(obj, StringValue):
+            self.texts.append(index)
+            if obj.isNewline or obj.isNonWhitespace:
+                self.lineEnds.append(index)
+        elif isinstance(obj, ControlCommand):
+            self.lineEnds.append(index)
+            if obj.commandType == ControlCommand.CommandType.BeginString:
+                self.beginStrings.append(index)
+                self.glueOrBeginStrings.append(index)
+        elif isinstance(obj, Glue):
+            self.glueOrBeginStrings.append(index)
+
+    def Update(self, output_stream: List, start: int = 0):
+        for marks in (self.beginStrings, self.glueOrBeginStrings, self.texts, self.lineEnds):
+            while marks and marks[-1] >= start:
+                marks.pop()
+        for i in range(start, len(output_stream)):
+            self.Add(output_stream[i], i)
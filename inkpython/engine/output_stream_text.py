@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+from .control_command import ControlCommand
+from .tag import Tag
+from .value import StringValue
+
+
+class OutputStreamText:
+    # The text and tags of an output stream, as StoryState.currentText and
+    # currentTags report them, built up as objects are appended so that
+    # neither is rebuilt from the whole stream after every push. Anything
+    # else that changes the stream resets it, and the next read rebuilds it.
+    __slots__ = (
+        "isValid",
+        "_textParts",
+        "_rawTextLength",
+        "_whitespaceStart",
+        "_startOfLine",
+        "_inTag",
+        "_tags",
+        "_tagParts",
+    )
+
+    _whitespacePieces = re.compile(r"[ \t]+|\n|[^ \t\n]+")
+
+    def __init__(self):
+        self.Reset()
+
+    def Reset(self):
+        self.isValid = False
+        self._textParts: List[str] = []
+        self._rawTextLength = 0
+        self._whitespaceStart = -1
+        self._startOfLine = 0
+        self._inTag = False
+        self._tags: List[str] = []
+        self._tagParts: List[str] = []
+
+    def Rebuild(self, output_stream: List):
+        self.Reset()
+        self.isValid = True
+        for obj in output_stream:
+            self.Add(obj)
+
+    def Add(self, obj):
+        if isinstance(obj, StringValue):
+            if obj.value is None:
+                return
+            if self._inTag:
+                self._tagParts.append(obj.value)
+            else:
+                self._whitespaceStart, self._startOfLine = OutputStreamText.CleanWhitespace(
+                    obj.value, self._textParts, self._rawTextLength, self._whitespaceStart, self._startOfLine
+                )
+                self._rawTextLength += len(obj.value)
+        elif isinstance(obj, ControlCommand):
+            if obj.commandType == ControlCommand.CommandType.BeginTag:
+                if self._inTag:
+                    self.EndTagText()
+                self._inTag = True
+            elif obj.commandType == ControlCommand.CommandType.EndTag:
+                self.EndTagText()
+                self._inTag = False
+        elif not self._inTag and isinstance(obj, Tag):
+            if obj.text is not None and len(obj.text) > 0:
+                self._tags.append(obj.text)
+
+    def EndTagText(self):
+        tag_text = "".join(self._tagParts)
+        if tag_text:
+            self._tags.append(OutputStreamText.CleanText(tag_text))
+        self._tagParts = []
+
+    @property
+    def text(self) -> str:
+        if len(self._textParts) > 1:
+            self._textParts = ["".join(self._textParts)]
+        return self._textParts[0] if self._textParts else ""
+
+    @property
+    def tags(self) -> List[str]:
+        tags = list(self._tags)
+        tag_text = "".join(self._tagParts)
+        if tag_text:
+            tags.append(OutputStreamText.CleanText(tag_text))
+        return tags
+
+    @staticmethod
+    def CleanText(text: str) -> str:
+        parts: List[str] = []
+        OutputStreamText.CleanWhitespace(text, parts)
+        return "".join(parts)
+
+    @staticmethod
+    def CleanWhitespace(text: str, parts: List[str], offset: int = 0, whitespace_start: int = -1, start_of_line: int = 0):
+        # Runs of spaces and tabs become one space, and go altogether at the
+        # start and end of a line. offset is where text starts in the whole
+        # output, so that it can be cleaned a piece at a time; the returned
+        # state carries on into the next piece.
+        for match in OutputStreamText._whitespacePieces.finditer(text):
+            piece = match.group()
+            if piece[0] == " " or piece[0] == "\t":
+                if whitespace_start == -1:
+                    whitespace_start = offset + match.start()
+                continue
+            if piece == "\n":
+                start_of_line = offset + match.start() + 1
+            elif whitespace_start > 0 and whitespace_start != start_of_line:
+                parts.append(" ")
+            whitespace_start = -1
+            parts.append(piece)
+        return whitespace_start, start_of_line
@@ -5,9 +5,13 @@ from typing import List, Optional
 
 
 class Path:
+    __slots__ = ("_components", "_componentsString", "_isRelative")
+
     parentId = "^"
 
     class Component:
+        __slots__ = ("index", "name")
+
         def __init__(self, index_or_name):
             self.index = -1
             self.name = None
@@ -126,13 +130,13 @@ class Path:
     def componentsString(self, value: str):
         self._components = []
         self._componentsString = value
-        if not self._componentsString:
+        if not value:
             return
-        if self._componentsString[0] == ".":
+        if value[0] == ".":
             self._isRelative = True
-            self._componentsString = self._componentsString[1:]
+            value = value[1:]
 
-        component_strings = self._componentsString.split(".")
+        component_strings = value.split(".")
         for comp_str in component_strings:
             if re.match(r"^(\-|\+)?([0-9]+|Infinity)$", comp_str):
                 self._components.append(Path.Component(int(comp_str)))
@@ -6,6 +6,10 @@ from .path import Path
 
 
 class Pointer:
+    # Pointers are never changed once made, so they can be shared freely:
+    # copy() hands back the same one, and moving a pointer makes a new one.
+    __slots__ = ("container", "index")
+
     def __init__(self, container=None, index: int = -1):
         self.container = container
         self.index = index
@@ -39,7 +43,7 @@ class Pointer:
         return f"Ink Pointer -> {self.container.path} -- index {self.index}"
 
     def copy(self):
-        return Pointer(self.container, self.index)
+        return self
 
     @staticmethod
     def StartOf(container):
@@ -47,4 +51,7 @@ class Pointer:
 
     @staticmethod
     def Null():
-        return Pointer(None, -1)
+        return Pointer._null
+
+
+Pointer._null = Pointer(None, -1)
@@ -8,6 +8,8 @@ if TYPE_CHECKING:
 
 
 class SearchResult:
+    __slots__ = ("obj", "approximate")
+
     def __init__(self):
         self.obj: Optional["InkObject"] = None
         self.approximate = False
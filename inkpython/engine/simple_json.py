@@ -1,29 +1,24 @@
 from __future__ import annotations
 
 import json
-import re
 
 
 class SimpleJson:
     @staticmethod
-    def TextToDictionary(text: str):
-        return SimpleJson.Reader(text).ToDictionary()
+    def TextToDictionary(text: str, object_hook=None):
+        return SimpleJson.Reader(text, object_hook).ToDictionary()
 
     @staticmethod
-    def TextToArray(text: str):
-        return SimpleJson.Reader(text).ToArray()
+    def TextToArray(text: str, object_hook=None):
+        return SimpleJson.Reader(text, object_hook).ToArray()
 
     class Reader:
-        def __init__(self, text: str):
+        def __init__(self, text: str, object_hook=None):
             if text.startswith("\ufeff"):
                 text = text.lstrip("\ufeff")
-            # Preserve "123.0" float intent by tagging as "123.0f" before parsing.
-            json_with_explicit_float = re.sub(
-                r'([,\[\s:])([0-9]+\.[0]+)([,\]\s}])',
-                r'\1"\2f"\3',
-                text,
-            )
-            self._root_object = json.loads(json_with_explicit_float)
+            # json decodes every literal with a fraction or exponent ("123.0" included)
+            # to float and the rest to int, so float intent survives as the token type.
+            self._root_object = json.loads(text, object_hook=object_hook)
 
         def ToDictionary(self):
             return self._root_object
@@ -1,22 +1,23 @@
 from __future__ import annotations
 
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set
 
 from .try_get_result import TryGetResult
 
 
 class StatePatch:
-    def __init__(self, to_copy=None):
-        if to_copy is not None:
-            self._globals = dict(to_copy._globals)
-            self._changedVariables = set(to_copy._changedVariables)
-            self._visitCounts = dict(to_copy._visitCounts)
-            self._turnIndices = dict(to_copy._turnIndices)
-        else:
-            self._globals = {}
-            self._changedVariables = set()
-            self._visitCounts = {}
-            self._turnIndices = {}
+    # Changes to globals, visit counts and turn indices made while the state
+    # they belong to has to stay as it was, for a background save or for
+    # looking ahead past a newline. A patch started while another is still in
+    # place goes on top of it rather than copying it, and lookups fall through
+    # to the patch below. There are never more than two: one for a background
+    # save and one for the lookahead during it.
+    def __init__(self, parent: Optional[StatePatch] = None):
+        self.parent = parent
+        self._globals: Dict[str, object] = {}
+        self._changedVariables: Set[str] = set()
+        self._visitCounts: Dict[int, int] = {}
+        self._turnIndices: Dict[int, int] = {}
 
     @property
     def globals(self):
@@ -24,7 +25,9 @@ class StatePatch:
 
     @property
     def changedVariables(self):
-        return self._changedVariables
+        if self.parent is None:
+            return self._changedVariables
+        return self.parent.changedVariables | self._changedVariables
 
     @property
     def visitCounts(self):
@@ -34,9 +37,31 @@ class StatePatch:
     def turnIndices(self):
         return self._turnIndices
 
+    def Layers(self) -> List[StatePatch]:
+        # From the bottom up, i.e. in the order to apply them.
+        layers = [self]
+        while layers[-1].parent is not None:
+            layers.append(layers[-1].parent)
+        layers.reverse()
+        return layers
+
+    def MergeIntoParent(self) -> StatePatch:
+        # Once nothing else needs the parent as it was, e.g. when a lookahead
+        # during a background save is kept.
+        parent = self.parent
+        parent._globals.update(self._globals)
+        parent._changedVariables.update(self._changedVariables)
+        parent._visitCounts.update(self._visitCounts)
+        parent._turnIndices.update(self._turnIndices)
+        return parent
+
     def TryGetGlobal(self, name: str | None, value):
-        if name is not None and name in self._globals:
-            return TryGetResult(self._globals.get(name), True)
+        if name is not None:
+            patch = self
+            while patch is not None:
+                if name in patch._globals:
+                    return TryGetResult(patch._globals[name], True)
+                patch = patch.parent
         return TryGetResult(value, False)
 
     def SetGlobal(self, name: str, value):
@@ -45,18 +70,25 @@ class StatePatch:
     def AddChangedVariable(self, name: str):
         self._changedVariables.add(name)
 
-    def TryGetVisitCount(self, container, count: int):
-        if container in self._visitCounts:
-            return TryGetResult(self._visitCounts.get(container), True)
+    # Visit counts and turn indices are keyed by the container's count slot.
+    def TryGetVisitCount(self, slot: int, count: int):
+        patch = self
+        while patch is not None:
+            if slot in patch._visitCounts:
+                return TryGetResult(patch._visitCounts[slot], True)
+            patch = patch.parent
         return TryGetResult(count, False)
 
-    def SetVisitCount(self, container, count: int):
-        self._visitCounts[container] = count
+    def SetVisitCount(self, slot: int, count: int):
+        self._visitCounts[slot] = count
 
-    def SetTurnIndex(self, container, index: int):
-        self._turnIndices[container] = index
+    def SetTurnIndex(self, slot: int, index: int):
+        self._turnIndices[slot] = index
 
-    def TryGetTurnIndex(self, container, index: int):
-        if container in self._turnIndices:
-            return TryGetResult(self._turnIndices.get(container), True)
+    def TryGetTurnIndex(self, slot: int, index: int):
+        patch = self
+        while patch is not None:
+            if slot in patch._turnIndices:
+                return TryGetResult(patch._turnIndices[slot], True)
+            patch = patch.parent
         return TryGetResult(index, False)
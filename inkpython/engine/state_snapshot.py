@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+
+class StateSnapshot:
+    # A StoryState as it was at the last newline, for Story to go back to if
+    # looking ahead past it shows the line is finished. Only what lookahead
+    # can change is kept. Lookahead mostly appends to the output stream,
+    # evaluation stack and choices, so those are kept as the lists in use and
+    # their lengths; StoryState copies one of them before taking anything off
+    # it while the snapshot still holds it. The call stack's threads are
+    # shared the same way (see CallStack.ShareThreads), and variable and visit
+    # count changes go into a StatePatch until the snapshot is discarded.
+    __slots__ = (
+        "currentText",
+        "currentTags",
+        "callStackThreads",
+        "outputStream",
+        "outputStreamLength",
+        "evaluationStack",
+        "evaluationStackHeight",
+        "currentChoices",
+        "currentChoiceCount",
+        "currentErrors",
+        "currentErrorCount",
+        "currentWarnings",
+        "currentWarningCount",
+        "patch",
+        "divertedPointer",
+        "storySeed",
+        "previousRandom",
+        "didSafeExit",
+    )
+
+    def __init__(self, state):
+        self.currentText = state.currentText
+        self.currentTags = state.currentTags
+
+        self.callStackThreads = state.callStack.ShareThreads()
+
+        self.outputStream = state.outputStream
+        self.outputStreamLength = len(self.outputStream)
+        self.evaluationStack = state.evaluationStack
+        self.evaluationStackHeight = len(self.evaluationStack)
+        self.currentChoices = state.generatedChoices
+        self.currentChoiceCount = len(self.currentChoices)
+        self.currentErrors = state.currentErrors
+        self.currentErrorCount = len(self.currentErrors or [])
+        self.currentWarnings = state.currentWarnings
+        self.currentWarningCount = len(self.currentWarnings or [])
+
+        self.patch = None
+        self.divertedPointer = state.divertedPointer
+        self.storySeed = state.storySeed
+        self.previousRandom = state.previousRandom
+        self.didSafeExit = state.didSafeExit
+
+    @staticmethod
+    def Rewind(items: Optional[List], kept: Optional[List], length: int) -> Optional[List]:
+        # The list kept by the snapshot as it was, given the one in use now.
+        if kept is None:
+            return None
+        if items is kept:
+            del items[length:]
+            return items
+        return kept[:length]
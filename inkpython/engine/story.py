@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from .choice import Choice
 from .choice_point import ChoicePoint
+from .compiled_story import CompiledStory
 from .container import Container
 from .control_command import ControlCommand
+from .count_slots import CountSlots
 from .debug_metadata import DebugMetadata
 from .divert import Divert
 from .error import ErrorHandler, ErrorType
+from .flat_code import FlatCode
 from .ink_list import InkList, InkListItem
 from .json_serialisation import JsonSerialisation
 from .list_definition import ListDefinition
@@ -20,7 +23,9 @@ from .path import Path
 from .pointer import Pointer
 from .prng import PRNG
 from .push_pop import PushPopType
+from .search_result import SearchResult
 from .simple_json import SimpleJson
+from .state_snapshot import StateSnapshot
 from .stop_watch import Stopwatch
 from .story_exception import StoryException
 from .story_state import StoryState
@@ -49,7 +54,14 @@ class Story(InkObject):
         ExtendedBeyondNewline = 1
         NewlineRemoved = 2
 
-    def __init__(self, content_container_or_json, lists: Optional[List[ListDefinition]] = None):
+    def __init__(
+        self,
+        content_container_or_json,
+        lists: Optional[List[ListDefinition]] = None,
+        lazy_knots: bool = False,
+        intern_leaves: bool = False,
+        flatten_knots: bool = False,
+    ):
         super().__init__()
         self.inkVersionMinimumCompatible = 18
 
@@ -61,11 +73,19 @@ class Story(InkObject):
         self._temporaryEvaluationContainer: Optional[Container] = None
         self._state: StoryState = None
         self._asyncContinueActive = False
-        self._stateSnapshotAtLastNewline: Optional[StoryState] = None
+        self._stateSnapshotAtLastNewline: Optional[StateSnapshot] = None
         self._sawLookaheadUnsafeFunctionAfterNewline = False
         self._recursiveContinueCount = 0
         self._asyncSaving = False
         self._profiler = None
+        self._sourceHash: Optional[bytes] = None
+        self.danglingTargets: List[str] = []
+        self._pathIndex: Optional[Dict[str, Container]] = None
+        self._countSlots: Optional[CountSlots] = None
+        self._flatCode: Optional[FlatCode] = None
+        # Whether static targets in the content point at what they divert to,
+        # with danglingTargets what linking reported.
+        self._contentIsLinked = False
 
         self.onError: Optional[ErrorHandler] = None
         self.onDidContinue = None
@@ -86,7 +106,10 @@ class Story(InkObject):
                 self._listDefinitions = ListDefinitionsOrigin([])
         else:
             if isinstance(content_container_or_json, str):
-                json_obj = SimpleJson.TextToDictionary(content_container_or_json)
+                # Lazy knots are stored as JSON text, so decoding their leaves up front would be wasted.
+                object_hook = None if lazy_knots else JsonSerialisation.JObjectHook
+                json_obj = SimpleJson.TextToDictionary(content_container_or_json, object_hook)
+                self._sourceHash = CompiledStory.SourceHash(content_container_or_json)
             else:
                 json_obj = content_container_or_json
 
@@ -116,7 +139,25 @@ class Story(InkObject):
             else:
                 self._listDefinitions = ListDefinitionsOrigin([])
 
-            self._mainContentContainer = as_or_throws(JsonSerialisation.JTokenToRuntimeObject(root_token), Container)
+            if isinstance(root_token, list):
+                # Nothing else holds on to tokens parsed from our own text.
+                self._mainContentContainer = JsonSerialisation.JArrayToContainer(
+                    root_token, isinstance(content_container_or_json, str), lazy_knots
+                )
+            else:
+                self._mainContentContainer = as_or_throws(
+                    JsonSerialisation.JTokenToRuntimeObject(root_token), Container
+                )
+            if not lazy_knots:
+                # Lazy knots are resolved on first use instead, since linking them would load them.
+                self._mainContentContainer.Link(self.danglingTargets)
+                self._contentIsLinked = True
+                if intern_leaves:
+                    # After linking, so static targets already point at (container, index).
+                    self._mainContentContainer.InternLeaves({})
+            if flatten_knots:
+                # Each knot is compiled the first time the story steps into it.
+                self._flatCode = FlatCode(self._mainContentContainer)
             self.ResetState()
 
     @property
@@ -214,6 +255,86 @@ class Story(InkObject):
         if should_return:
             return writer.toString()
 
+    def save_compiled(self, file_path):
+        if not self._contentIsLinked:
+            # The cache holds the whole tree, linked, so lazy knots are loaded
+            # first rather than while linking walks over them. A tree that's
+            # linked already is saved as it is.
+            self._mainContentContainer.LoadAllLazyContent()
+            dangling_targets = []
+            self._mainContentContainer.Link(dangling_targets)
+            self.danglingTargets = dangling_targets
+            self._contentIsLinked = True
+        CompiledStory.Write(
+            file_path, self._mainContentContainer, self._listDefinitions, self.danglingTargets, self._sourceHash
+        )
+
+    @staticmethod
+    def from_compiled(file_path, source_path=None):
+        if source_path is None:
+            container, list_definitions, dangling_targets, source_hash = CompiledStory.Read(file_path)
+        else:
+            with open(source_path, encoding="utf-8-sig") as f:
+                source_text = f.read()
+            source_hash = CompiledStory.SourceHash(source_text)
+            try:
+                container, list_definitions, dangling_targets, _ = CompiledStory.Read(file_path, source_hash)
+            except (OSError, ValueError):
+                story = Story(source_text)
+                story.save_compiled(file_path)
+                return story
+
+        story = Story(container)
+        story._listDefinitions = list_definitions
+        story._sourceHash = source_hash
+        story.danglingTargets = dangling_targets
+        story._contentIsLinked = True
+        story.ResetState()
+        return story
+
+    @staticmethod
+    def from_mapped(file_path, source_path=None, lazy_knots=True):
+        from .story_map import StoryMap
+
+        source_hash = None
+        if source_path is not None:
+            with open(source_path, encoding="utf-8-sig") as f:
+                source_text = f.read()
+            source_hash = CompiledStory.SourceHash(source_text)
+            try:
+                story_map = StoryMap(file_path, source_hash)
+            except (OSError, ValueError):
+                StoryMap.Write(file_path, source_text)
+                story_map = StoryMap(file_path, source_hash)
+        else:
+            story_map = StoryMap(file_path)
+
+        story = Story(story_map.RootContainer(lazy_knots))
+        story._listDefinitions = story_map.listDefinitions
+        story._sourceHash = story_map.sourceHash
+        if not lazy_knots:
+            story._mainContentContainer.Link(story.danglingTargets)
+            story._contentIsLinked = True
+        story.ResetState()
+        return story
+
+    def spawn(self):
+        # The content tree, list definitions and external bindings are read-only
+        # once loaded, so sessions share them and only get their own state.
+        session = Story(self._mainContentContainer)
+        session._listDefinitions = self._listDefinitions
+        session._externals = self._externals
+        session._hasValidatedExternals = self._hasValidatedExternals
+        session._sourceHash = self._sourceHash
+        session.danglingTargets = self.danglingTargets
+        session._contentIsLinked = self._contentIsLinked
+        session._pathIndex = self.pathIndex
+        session._countSlots = self.countSlots
+        session._flatCode = self._flatCode
+        session.allowExternalFunctionFallbacks = self.allowExternalFunctionFallbacks
+        session.ResetState()
+        return session
+
     def ResetState(self):
         self.IfAsyncWeCant("ResetState")
         self._state = StoryState(self)
@@ -232,8 +353,8 @@ class Story(InkObject):
         self._state.ForceEnd()
 
     def ResetGlobals(self):
-        if self._mainContentContainer.namedContent.get("global decl"):
-            original_pointer = self.state.currentPointer.copy()
+        if self.KnotContainerWithName("global decl"):
+            original_pointer = self.state.currentPointer
             self.ChoosePath(Path("global decl"), False)
             self.ContinueInternal()
             self.state.currentPointer = original_pointer
@@ -452,18 +573,56 @@ class Story(InkObject):
             sb.Append(self.Continue())
         return str(sb)
 
+    @property
+    def pathIndex(self) -> Dict[str, Container]:
+        if self._pathIndex is None:
+            self.GeneratePathIndex()
+        return self._pathIndex
+
+    @property
+    def countSlots(self) -> CountSlots:
+        if self._countSlots is None:
+            self._countSlots = CountSlots(self.mainContentContainer)
+        return self._countSlots
+
+    def GeneratePathIndex(self):
+        # Knots that haven't been lazily loaded yet are added as the walker finds them.
+        path_index: Dict[str, Container] = {}
+        containers = [self.mainContentContainer]
+        while containers:
+            container = containers.pop()
+            path_index[container.pathString] = container
+            for content in container._content:
+                if isinstance(content, Container):
+                    containers.append(content)
+            containers.extend(container._namedContent.values())
+        self._pathIndex = path_index
+
     def ContentAtPath(self, path: Path):
-        return self.mainContentContainer.ContentAtPath(path)
+        if path.isRelative:
+            return self.mainContentContainer.ContentAtPath(path)
+
+        path_index = self.pathIndex
+        path_string = path.componentsString
+        container = path_index.get(path_string)
+        if container is not None:
+            result = SearchResult()
+            result.obj = container
+            return result
+
+        result = self.mainContentContainer.ContentAtPath(path)
+        if not result.approximate and isinstance(result.obj, Container):
+            path_index[path_string] = result.obj
+        return result
 
     def KnotContainerWithName(self, name: str):
-        named_container = self.mainContentContainer.namedContent.get(name)
+        named_container = self.mainContentContainer.NamedContentWithName(name)
         return named_container if isinstance(named_container, Container) else None
 
     def PointerAtPath(self, path: Path):
         if path.length == 0:
             return Pointer.Null()
 
-        p = Pointer()
         path_length_to_use = path.length
         result = None
 
@@ -471,14 +630,17 @@ class Story(InkObject):
             return throw_null_exception("path.lastComponent")
 
         if path.lastComponent.isIndex:
+            if not path.isRelative:
+                container = self.pathIndex.get(path.componentsString.rpartition(".")[0])
+                if container is not None:
+                    return Pointer(container, path.lastComponent.index)
+
             path_length_to_use = path.length - 1
             result = self.mainContentContainer.ContentAtPath(path, 0, path_length_to_use)
-            p.container = result.container
-            p.index = path.lastComponent.index
+            p = Pointer(result.container, path.lastComponent.index)
         else:
-            result = self.mainContentContainer.ContentAtPath(path)
-            p.container = result.container
-            p.index = -1
+            result = self.ContentAtPath(path)
+            p = Pointer(result.container, -1)
 
         if result.obj is None or (result.obj == self.mainContentContainer and path_length_to_use > 0):
             self.Error("Failed to find content at path '" + str(path) + "', and no approximation of it was possible.")
@@ -488,14 +650,12 @@ class Story(InkObject):
         return p
 
     def StateSnapshot(self):
-        self._stateSnapshotAtLastNewline = self._state
-        self._state = self._state.CopyAndStartPatching(False)
+        self._stateSnapshotAtLastNewline = self._state.SnapshotAndStartPatching()
 
     def RestoreStateSnapshot(self):
         if self._stateSnapshotAtLastNewline is None:
             return throw_null_exception("_stateSnapshotAtLastNewline")
-        self._stateSnapshotAtLastNewline.RestoreAfterPatch()
-        self._state = self._stateSnapshotAtLastNewline
+        self._state.RestoreSnapshot(self._stateSnapshotAtLastNewline)
         self._stateSnapshotAtLastNewline = None
         if not self._asyncSaving:
             self._state.ApplyAnyPatch()
@@ -503,6 +663,8 @@ class Story(InkObject):
     def DiscardSnapshot(self):
         if not self._asyncSaving:
             self._state.ApplyAnyPatch()
+        if self._stateSnapshotAtLastNewline is not None:
+            self._state.DiscardSnapshot()
         self._stateSnapshotAtLastNewline = None
 
     def CopyStateForBackgroundThreadSave(self):
@@ -521,45 +683,52 @@ class Story(InkObject):
 
     def Step(self):
         should_add_to_stream = True
-        pointer = self.state.currentPointer.copy()
-        if pointer.isNull:
+        element = self.state.callStack.currentElement
+        if element.currentPointer.isNull:
             return
 
-        container_to_enter = as_or_null(pointer.Resolve(), Container)
-        while container_to_enter:
-            self.VisitContainer(container_to_enter, True)
-            if len(container_to_enter.content) == 0:
-                break
-            pointer = Pointer.StartOf(container_to_enter)
+        instruction = None
+        if self._flatCode is not None:
+            instruction = self._flatCode.InstructionAt(element.currentPointer.container, element.currentPointer.index)
+        if instruction is not None:
+            enter_visits, pointer, current_content_obj, _ = instruction
+            for container in enter_visits:
+                self.VisitContainer(container, True)
+            element.currentPointer = pointer
+        else:
+            pointer = element.currentPointer
             container_to_enter = as_or_null(pointer.Resolve(), Container)
+            while container_to_enter:
+                self.VisitContainer(container_to_enter, True)
+                if len(container_to_enter.content) == 0:
+                    break
+                pointer = Pointer.StartOf(container_to_enter)
+                container_to_enter = as_or_null(pointer.Resolve(), Container)
+            element.currentPointer = pointer
+            current_content_obj = pointer.Resolve()
 
-        self.state.currentPointer = pointer.copy()
         if self._profiler is not None:
             self._profiler.Step(self.state.callStack)
 
-        current_content_obj = pointer.Resolve()
         is_logic_or_flow_control = self.PerformLogicAndFlowControl(current_content_obj)
         if self.state.currentPointer.isNull:
             return
         if is_logic_or_flow_control:
             should_add_to_stream = False
-
-        choice_point = as_or_null(current_content_obj, ChoicePoint)
-        if choice_point:
-            choice = self.ProcessChoice(choice_point)
+        elif isinstance(current_content_obj, ChoicePoint):
+            choice = self.ProcessChoice(current_content_obj)
             if choice:
                 self.state.generatedChoices.append(choice)
             current_content_obj = None
             should_add_to_stream = False
-
-        if isinstance(current_content_obj, Container):
+        elif isinstance(current_content_obj, Container):
             should_add_to_stream = False
 
         if should_add_to_stream:
-            var_pointer = as_or_null(current_content_obj, VariablePointerValue)
-            if var_pointer and var_pointer.contextIndex == -1:
-                context_idx = self.state.callStack.ContextForVariableNamed(var_pointer.variableName)
-                current_content_obj = VariablePointerValue(var_pointer.variableName, context_idx)
+            if current_content_obj.__class__ is VariablePointerValue and current_content_obj.contextIndex == -1:
+                var_name = current_content_obj.variableName
+                context_idx = self.state.callStack.ContextForVariableNamed(var_name)
+                current_content_obj = VariablePointerValue(var_name, context_idx)
 
             if self.state.inExpressionEvaluation:
                 self.state.PushEvaluationStack(current_content_obj)
@@ -568,8 +737,11 @@ class Story(InkObject):
 
         self.NextContent()
 
-        control_cmd = as_or_null(current_content_obj, ControlCommand)
-        if control_cmd and control_cmd.commandType == ControlCommand.CommandType.StartThread:
+        if (
+            is_logic_or_flow_control
+            and current_content_obj.__class__ is ControlCommand
+            and current_content_obj.commandType == ControlCommand.CommandType.StartThread
+        ):
             self.state.callStack.PushThread()
 
     def VisitContainer(self, container: Container, at_start: bool):
@@ -582,8 +754,8 @@ class Story(InkObject):
     _prevContainers: List[Container] = []
 
     def VisitChangedContainersDueToDivert(self):
-        previous_pointer = self.state.previousPointer.copy()
-        pointer = self.state.currentPointer.copy()
+        previous_pointer = self.state.previousPointer
+        pointer = self.state.currentPointer
         if pointer.isNull or pointer.index == -1:
             return
 
@@ -599,21 +771,24 @@ class Story(InkObject):
         if current_child_of_container is None:
             return
 
-        current_container_ancestor = as_or_null(current_child_of_container.parent, Container)
+        # Interned leaves are shared between containers, so the pointer rather
+        # than the leaf says which container we're in and where.
+        if current_child_of_container is pointer.container:
+            current_container_ancestor = as_or_null(pointer.container.parent, Container)
+            child_index = pointer.container.indexInParent
+        else:
+            current_container_ancestor = pointer.container
+            child_index = pointer.index
         all_children_entered_at_start = True
         while current_container_ancestor and (
             current_container_ancestor not in self._prevContainers or current_container_ancestor.countingAtStartOnly
         ):
-            entering_at_start = (
-                len(current_container_ancestor.content) > 0
-                and current_child_of_container == current_container_ancestor.content[0]
-                and all_children_entered_at_start
-            )
+            entering_at_start = child_index == 0 and all_children_entered_at_start
             if not entering_at_start:
                 all_children_entered_at_start = False
 
             self.VisitContainer(current_container_ancestor, entering_at_start)
-            current_child_of_container = current_container_ancestor
+            child_index = current_container_ancestor.indexInParent
             current_container_ancestor = as_or_null(current_container_ancestor.parent, Container)
 
     def PopChoiceStringAndTags(self, tags: List[str]):
@@ -648,11 +823,9 @@ class Story(InkObject):
         if not show_choice:
             return None
 
-        choice = Choice()
+        choice = Choice.Generated(choice_point, self.state.callStack.LazyForkThread())
         choice.targetPath = choice_point.pathOnChoice
-        choice.sourcePath = choice_point.path.toString()
         choice.isInvisibleDefault = choice_point.isInvisibleDefault
-        choice.threadAtGeneration = self.state.callStack.ForkThread()
         choice.tags = list(reversed(tags))
         choice.text = (start_text + choice_only_text).strip(" \t")
         return choice
@@ -669,325 +842,395 @@ class Story(InkObject):
             return obj.isTruthy
         return False
 
+    # Logic and flow control dispatches on the exact class of the content
+    # object, and control commands on their command type, so a step costs a
+    # table lookup instead of a chain of isinstance checks.
+    _logicHandlers: Optional[Dict[type, Callable]] = None
+    _controlCommandHandlers: Optional[Dict[int, Callable]] = None
+
+    @staticmethod
+    def GenerateLogicHandlersIfNecessary():
+        if Story._logicHandlers is not None:
+            return
+
+        command_type = ControlCommand.CommandType
+        Story._controlCommandHandlers = {
+            command_type.EvalStart: Story.PerformEvalStart,
+            command_type.EvalEnd: Story.PerformEvalEnd,
+            command_type.EvalOutput: Story.PerformEvalOutput,
+            command_type.NoOp: Story.PerformNoOp,
+            command_type.Duplicate: Story.PerformDuplicate,
+            command_type.PopEvaluatedValue: Story.PerformPopEvaluatedValue,
+            command_type.PopFunction: Story.PerformPopFunctionOrTunnel,
+            command_type.PopTunnel: Story.PerformPopFunctionOrTunnel,
+            command_type.BeginString: Story.PerformBeginString,
+            command_type.BeginTag: Story.PerformBeginTag,
+            command_type.EndTag: Story.PerformEndTag,
+            command_type.EndString: Story.PerformEndString,
+            command_type.ChoiceCount: Story.PerformChoiceCount,
+            command_type.Turns: Story.PerformTurns,
+            command_type.TurnsSince: Story.PerformTurnsSinceOrReadCount,
+            command_type.ReadCount: Story.PerformTurnsSinceOrReadCount,
+            command_type.Random: Story.PerformRandom,
+            command_type.SeedRandom: Story.PerformSeedRandom,
+            command_type.VisitIndex: Story.PerformVisitIndex,
+            command_type.SequenceShuffleIndex: Story.PerformSequenceShuffleIndex,
+            # Threads are started in Step, once the pointer has moved past this command.
+            command_type.StartThread: Story.PerformNoOp,
+            command_type.Done: Story.PerformDone,
+            command_type.End: Story.PerformEnd,
+            command_type.ListFromInt: Story.PerformListFromInt,
+            command_type.ListRange: Story.PerformListRange,
+            command_type.ListRandom: Story.PerformListRandom,
+        }
+        Story._logicHandlers = {
+            Divert: Story.PerformDivert,
+            ControlCommand: Story.PerformControlCommand,
+            VariableAssignment: Story.PerformVariableAssignment,
+            VariableReference: Story.PerformVariableReference,
+            NativeFunctionCall: Story.PerformNativeFunctionCall,
+        }
+
     def PerformLogicAndFlowControl(self, content_obj: Optional[InkObject]):
-        if content_obj is None:
+        if Story._logicHandlers is None:
+            Story.GenerateLogicHandlersIfNecessary()
+        handler = Story._logicHandlers.get(content_obj.__class__)
+        if handler is None:
             return False
+        return handler(self, content_obj)
 
-        if isinstance(content_obj, Divert):
-            current_divert = content_obj
-            if current_divert.isConditional:
-                condition_value = self.state.PopEvaluationStack()
-                if not self.IsTruthy(condition_value):
-                    return True
-
-            if current_divert.hasVariableTarget:
-                var_name = current_divert.variableDivertName
-                var_contents = self.state.variablesState.GetVariableWithName(var_name)
-                if var_contents is None:
-                    self.Error(
-                        "Tried to divert using a target from a variable that could not be found (" + var_name + ")"
-                    )
-                elif not isinstance(var_contents, DivertTargetValue):
-                    int_content = as_or_null(var_contents, IntValue)
-                    error_message = (
-                        "Tried to divert to a target from a variable, but the variable ("
-                        + var_name
-                        + ") didn't contain a divert target, it "
-                    )
-                    if isinstance(int_content, IntValue) and int_content.value == 0:
-                        error_message += "was empty/null (the value 0)."
-                    else:
-                        error_message += "contained '" + str(var_contents) + "'."
-                    self.Error(error_message)
-                target = as_or_throws(var_contents, DivertTargetValue)
-                self.state.divertedPointer = self.PointerAtPath(target.targetPath)
-            elif current_divert.isExternal:
-                self.CallExternalFunction(current_divert.targetPathString, current_divert.externalArgs)
+    def PerformDivert(self, current_divert: Divert):
+        if current_divert.isConditional:
+            condition_value = self.state.PopEvaluationStack()
+            if not self.IsTruthy(condition_value):
                 return True
-            else:
-                self.state.divertedPointer = current_divert.targetPointer.copy()
 
-            if current_divert.pushesToStack:
-                self.state.callStack.Push(
-                    current_divert.stackPushType, 0, len(self.state.outputStream)
+        if current_divert.hasVariableTarget:
+            var_name = current_divert.variableDivertName
+            var_contents = self.state.variablesState.GetVariableWithName(var_name)
+            if var_contents is None:
+                self.Error(
+                    "Tried to divert using a target from a variable that could not be found (" + var_name + ")"
                 )
-
-            if self.state.divertedPointer.isNull and not current_divert.isExternal:
-                if current_divert.debugMetadata and current_divert.debugMetadata.sourceName is not None:
-                    self.Error("Divert target doesn't exist: " + current_divert.debugMetadata.sourceName)
+            elif not isinstance(var_contents, DivertTargetValue):
+                int_content = as_or_null(var_contents, IntValue)
+                error_message = (
+                    "Tried to divert to a target from a variable, but the variable ("
+                    + var_name
+                    + ") didn't contain a divert target, it "
+                )
+                if isinstance(int_content, IntValue) and int_content.value == 0:
+                    error_message += "was empty/null (the value 0)."
                 else:
-                    self.Error("Divert resolution failed: " + str(current_divert))
+                    error_message += "contained '" + str(var_contents) + "'."
+                self.Error(error_message)
+            target = as_or_throws(var_contents, DivertTargetValue)
+            self.state.divertedPointer = self.PointerAtPath(target.targetPath)
+        elif current_divert.isExternal:
+            self.CallExternalFunction(current_divert.targetPathString, current_divert.externalArgs)
             return True
+        else:
+            self.state.divertedPointer = current_divert.targetPointer
 
-        if isinstance(content_obj, ControlCommand):
-            eval_command = content_obj
-            cmd = eval_command.commandType
-
-            if cmd == ControlCommand.CommandType.EvalStart:
-                self.Assert(self.state.inExpressionEvaluation is False, "Already in expression evaluation?")
-                self.state.inExpressionEvaluation = True
-            elif cmd == ControlCommand.CommandType.EvalEnd:
-                self.Assert(self.state.inExpressionEvaluation is True, "Not in expression evaluation mode")
-                self.state.inExpressionEvaluation = False
-            elif cmd == ControlCommand.CommandType.EvalOutput:
-                if len(self.state.evaluationStack) > 0:
-                    output = self.state.PopEvaluationStack()
-                    if not isinstance(output, Void):
-                        text = StringValue(str(output))
-                        self.state.PushToOutputStream(text)
-            elif cmd == ControlCommand.CommandType.NoOp:
-                pass
-            elif cmd == ControlCommand.CommandType.Duplicate:
-                self.state.PushEvaluationStack(self.state.PeekEvaluationStack())
-            elif cmd == ControlCommand.CommandType.PopEvaluatedValue:
-                self.state.PopEvaluationStack()
-            elif cmd in (ControlCommand.CommandType.PopFunction, ControlCommand.CommandType.PopTunnel):
-                pop_type = PushPopType.Function if cmd == ControlCommand.CommandType.PopFunction else PushPopType.Tunnel
-                override_tunnel_return_target = None
-                if pop_type == PushPopType.Tunnel:
-                    popped = self.state.PopEvaluationStack()
-                    override_tunnel_return_target = as_or_null(popped, DivertTargetValue)
-                    if override_tunnel_return_target is None:
-                        self.Assert(isinstance(popped, Void), "Expected void if ->-> doesn't override target")
-
-                if self.state.TryExitFunctionEvaluationFromGame():
-                    pass
-                elif self.state.callStack.currentElement.type != pop_type or not self.state.callStack.canPop:
-                    names = {
-                        PushPopType.Function: "function return statement (~ return)",
-                        PushPopType.Tunnel: "tunnel onwards statement (->->)",
-                    }
-                    expected = names.get(self.state.callStack.currentElement.type)
-                    if not self.state.callStack.canPop:
-                        expected = "end of flow (-> END or choice)"
-                    error_msg = "Found " + names.get(pop_type) + ", when expected " + str(expected)
-                    self.Error(error_msg)
-                else:
-                    self.state.PopCallStack()
-                    if override_tunnel_return_target:
-                        self.state.divertedPointer = self.PointerAtPath(override_tunnel_return_target.targetPath)
-            elif cmd == ControlCommand.CommandType.BeginString:
-                self.state.PushToOutputStream(eval_command)
-                self.Assert(self.state.inExpressionEvaluation is True, "Expected to be in an expression when evaluating a string")
-                self.state.inExpressionEvaluation = False
-            elif cmd == ControlCommand.CommandType.BeginTag:
-                self.state.PushToOutputStream(eval_command)
-            elif cmd == ControlCommand.CommandType.EndTag:
-                if self.state.inStringEvaluation:
-                    content_stack_for_tag = []
-                    output_count_consumed = 0
-                    for i in range(len(self.state.outputStream) - 1, -1, -1):
-                        obj = self.state.outputStream[i]
-                        output_count_consumed += 1
-                        command = as_or_null(obj, ControlCommand)
-                        if command is not None:
-                            if command.commandType == ControlCommand.CommandType.BeginTag:
-                                break
-                            self.Error("Unexpected ControlCommand while extracting tag from choice")
-                            break
-                        if isinstance(obj, StringValue):
-                            content_stack_for_tag.append(obj)
-                    self.state.PopFromOutputStream(output_count_consumed)
-                    sb = StringBuilder()
-                    for str_val in reversed(content_stack_for_tag):
-                        sb.Append(str_val.toString())
-                    choice_tag = Tag(self.state.CleanOutputWhitespace(str(sb)))
-                    self.state.PushEvaluationStack(choice_tag)
-                else:
-                    self.state.PushToOutputStream(eval_command)
-            elif cmd == ControlCommand.CommandType.EndString:
-                content_stack_for_string = []
-                content_to_retain = []
-                output_count_consumed = 0
-                for i in range(len(self.state.outputStream) - 1, -1, -1):
-                    obj = self.state.outputStream[i]
-                    output_count_consumed += 1
-                    command = as_or_null(obj, ControlCommand)
-                    if command and command.commandType == ControlCommand.CommandType.BeginString:
-                        break
-                    if isinstance(obj, Tag):
-                        content_to_retain.append(obj)
-                    if isinstance(obj, StringValue):
-                        content_stack_for_string.append(obj)
-                self.state.PopFromOutputStream(output_count_consumed)
-                for rescued_tag in content_to_retain:
-                    self.state.PushToOutputStream(rescued_tag)
-                content_stack_for_string = list(reversed(content_stack_for_string))
-                sb = StringBuilder()
-                for c in content_stack_for_string:
-                    sb.Append(c.toString())
-                self.state.inExpressionEvaluation = True
-                self.state.PushEvaluationStack(StringValue(str(sb)))
-            elif cmd == ControlCommand.CommandType.ChoiceCount:
-                choice_count = len(self.state.generatedChoices)
-                self.state.PushEvaluationStack(IntValue(choice_count))
-            elif cmd == ControlCommand.CommandType.Turns:
-                self.state.PushEvaluationStack(IntValue(self.state.currentTurnIndex + 1))
-            elif cmd in (ControlCommand.CommandType.TurnsSince, ControlCommand.CommandType.ReadCount):
-                target = self.state.PopEvaluationStack()
-                if not isinstance(target, DivertTargetValue):
-                    extra_note = ""
-                    if isinstance(target, IntValue):
-                        extra_note = ". Did you accidentally pass a read count ('knot_name') instead of a target ('-> knot_name')?"
-                    self.Error(
-                        "TURNS_SINCE / READ_COUNT expected a divert target (knot, stitch, label name), but saw "
-                        + str(target)
-                        + extra_note
-                    )
-                    return True
-                divert_target = as_or_throws(target, DivertTargetValue)
-                container = as_or_null(self.ContentAtPath(divert_target.targetPath).correctObj, Container)
-                if container is not None:
-                    if cmd == ControlCommand.CommandType.TurnsSince:
-                        either_count = self.state.TurnsSinceForContainer(container)
-                    else:
-                        either_count = self.state.VisitCountForContainer(container)
-                else:
-                    either_count = -1 if cmd == ControlCommand.CommandType.TurnsSince else 0
-                    self.Warning(
-                        "Failed to find container for " + str(eval_command) + " lookup at " + str(divert_target.targetPath)
-                    )
-                self.state.PushEvaluationStack(IntValue(either_count))
-            elif cmd == ControlCommand.CommandType.Random:
-                max_int = as_or_null(self.state.PopEvaluationStack(), IntValue)
-                min_int = as_or_null(self.state.PopEvaluationStack(), IntValue)
-                if not isinstance(min_int, IntValue):
-                    return self.Error("Invalid value for minimum parameter of RANDOM(min, max)")
-                if not isinstance(max_int, IntValue):
-                    return self.Error("Invalid value for maximum parameter of RANDOM(min, max)")
-                if max_int.value is None or min_int.value is None:
-                    return throw_null_exception("minInt.value")
-                random_range = max_int.value - min_int.value + 1
-                if random_range <= 0:
-                    self.Error(
-                        "RANDOM was called with minimum as "
-                        + str(min_int.value)
-                        + " and maximum as "
-                        + str(max_int.value)
-                        + ". The maximum must be larger"
-                    )
-                result_seed = self.state.storySeed + self.state.previousRandom
-                random = PRNG(result_seed)
-                next_random = random.next()
-                chosen_value = (next_random % random_range) + min_int.value
-                self.state.PushEvaluationStack(IntValue(chosen_value))
-                self.state.previousRandom = next_random
-            elif cmd == ControlCommand.CommandType.SeedRandom:
-                seed = as_or_null(self.state.PopEvaluationStack(), IntValue)
-                if not isinstance(seed, IntValue):
-                    return self.Error("Invalid value passed to SEED_RANDOM")
-                if seed.value is None:
-                    return throw_null_exception("minInt.value")
-                self.state.storySeed = seed.value
-                self.state.previousRandom = 0
-                self.state.PushEvaluationStack(Void())
-            elif cmd == ControlCommand.CommandType.VisitIndex:
-                count = self.state.VisitCountForContainer(self.state.currentPointer.container) - 1
-                self.state.PushEvaluationStack(IntValue(count))
-            elif cmd == ControlCommand.CommandType.SequenceShuffleIndex:
-                shuffle_index = self.NextSequenceShuffleIndex()
-                self.state.PushEvaluationStack(IntValue(shuffle_index))
-            elif cmd == ControlCommand.CommandType.StartThread:
-                pass
-            elif cmd == ControlCommand.CommandType.Done:
-                if self.state.callStack.canPopThread:
-                    self.state.callStack.PopThread()
-                else:
-                    self.state.didSafeExit = True
-                    self.state.currentPointer = Pointer.Null()
-            elif cmd == ControlCommand.CommandType.End:
-                self.state.ForceEnd()
-            elif cmd == ControlCommand.CommandType.ListFromInt:
-                int_val = as_or_null(self.state.PopEvaluationStack(), IntValue)
-                list_name_val = as_or_throws(self.state.PopEvaluationStack(), StringValue)
-                if int_val is None:
-                    raise StoryException("Passed non-integer when creating a list element from a numerical value.")
-                generated_list_value = None
-                if self.listDefinitions is None:
-                    return throw_null_exception("this.listDefinitions")
-                found_list_def = self.listDefinitions.TryListGetDefinition(list_name_val.value, None)
-                if found_list_def.exists:
-                    if int_val.value is None:
-                        return throw_null_exception("minInt.value")
-                    found_item = found_list_def.result.TryGetItemWithValue(int_val.value, InkListItem.Null())
-                    if found_item.exists:
-                        generated_list_value = ListValue(found_item.result, int_val.value)
-                else:
-                    raise StoryException("Failed to find LIST called " + str(list_name_val.value))
-                if generated_list_value is None:
-                    generated_list_value = ListValue()
-                self.state.PushEvaluationStack(generated_list_value)
-            elif cmd == ControlCommand.CommandType.ListRange:
-                max_val = as_or_null(self.state.PopEvaluationStack(), Value)
-                min_val = as_or_null(self.state.PopEvaluationStack(), Value)
-                target_list = as_or_null(self.state.PopEvaluationStack(), ListValue)
-                if target_list is None or min_val is None or max_val is None:
-                    raise StoryException("Expected list, minimum and maximum for LIST_RANGE")
-                if target_list.value is None:
-                    return throw_null_exception("targetList.value")
-                result = target_list.value.ListWithSubRange(min_val.valueObject, max_val.valueObject)
-                self.state.PushEvaluationStack(ListValue(result))
-            elif cmd == ControlCommand.CommandType.ListRandom:
-                list_val = self.state.PopEvaluationStack()
-                if not isinstance(list_val, ListValue):
-                    raise StoryException("Expected list for LIST_RANDOM")
-                list_obj = list_val.value
-                new_list = None
-                if list_obj is None:
-                    raise throw_null_exception("list")
-                if list_obj.Count == 0:
-                    new_list = InkList()
-                else:
-                    result_seed = self.state.storySeed + self.state.previousRandom
-                    random = PRNG(result_seed)
-                    next_random = random.next()
-                    list_item_index = next_random % list_obj.Count
-                    list_entries = list(list_obj.items())
-                    key, value = list_entries[list_item_index]
-                    random_item = {"Key": InkListItem.fromSerializedKey(key), "Value": value}
-                    if random_item["Key"].originName is None:
-                        return throw_null_exception("randomItem.Key.originName")
-                    new_list = InkList(random_item["Key"].originName, self)
-                    new_list.Add(random_item["Key"], random_item["Value"])
-                    self.state.previousRandom = next_random
-                self.state.PushEvaluationStack(ListValue(new_list))
+        if current_divert.pushesToStack:
+            self.state.callStack.Push(
+                current_divert.stackPushType, 0, len(self.state.outputStream)
+            )
+
+        if self.state.divertedPointer.isNull and not current_divert.isExternal:
+            if current_divert.debugMetadata and current_divert.debugMetadata.sourceName is not None:
+                self.Error("Divert target doesn't exist: " + current_divert.debugMetadata.sourceName)
             else:
-                self.Error("unhandled ControlCommand: " + str(eval_command))
-            return True
+                self.Error("Divert resolution failed: " + str(current_divert))
+        return True
 
-        if isinstance(content_obj, VariableAssignment):
-            var_ass = content_obj
-            assigned_val = self.state.PopEvaluationStack()
-            self.state.variablesState.Assign(var_ass, assigned_val)
+    def PerformControlCommand(self, eval_command: ControlCommand):
+        handler = Story._controlCommandHandlers.get(eval_command.commandType)
+        if handler is None:
+            self.Error("unhandled ControlCommand: " + str(eval_command))
             return True
+        handler(self, eval_command)
+        return True
+
+    def PerformEvalStart(self, eval_command: ControlCommand):
+        self.Assert(self.state.inExpressionEvaluation is False, "Already in expression evaluation?")
+        self.state.inExpressionEvaluation = True
 
-        if isinstance(content_obj, VariableReference):
-            var_ref = content_obj
-            found_value = None
-            if var_ref.pathForCount is not None:
-                container = var_ref.containerForCount
-                count = self.state.VisitCountForContainer(container)
-                found_value = IntValue(count)
+    def PerformEvalEnd(self, eval_command: ControlCommand):
+        self.Assert(self.state.inExpressionEvaluation is True, "Not in expression evaluation mode")
+        self.state.inExpressionEvaluation = False
+
+    def PerformEvalOutput(self, eval_command: ControlCommand):
+        if len(self.state.evaluationStack) > 0:
+            output = self.state.PopEvaluationStack()
+            if not isinstance(output, Void):
+                text = StringValue.Of(str(output))
+                self.state.PushToOutputStream(text)
+
+    def PerformNoOp(self, eval_command: ControlCommand):
+        pass
+
+    def PerformDuplicate(self, eval_command: ControlCommand):
+        self.state.PushEvaluationStack(self.state.PeekEvaluationStack())
+
+    def PerformPopEvaluatedValue(self, eval_command: ControlCommand):
+        self.state.PopEvaluationStack()
+
+    def PerformPopFunctionOrTunnel(self, eval_command: ControlCommand):
+        cmd = eval_command.commandType
+        pop_type = PushPopType.Function if cmd == ControlCommand.CommandType.PopFunction else PushPopType.Tunnel
+        override_tunnel_return_target = None
+        if pop_type == PushPopType.Tunnel:
+            popped = self.state.PopEvaluationStack()
+            override_tunnel_return_target = as_or_null(popped, DivertTargetValue)
+            if override_tunnel_return_target is None:
+                self.Assert(isinstance(popped, Void), "Expected void if ->-> doesn't override target")
+
+        if self.state.TryExitFunctionEvaluationFromGame():
+            pass
+        elif self.state.callStack.currentElement.type != pop_type or not self.state.callStack.canPop:
+            names = {
+                PushPopType.Function: "function return statement (~ return)",
+                PushPopType.Tunnel: "tunnel onwards statement (->->)",
+            }
+            expected = names.get(self.state.callStack.currentElement.type)
+            if not self.state.callStack.canPop:
+                expected = "end of flow (-> END or choice)"
+            error_msg = "Found " + names.get(pop_type) + ", when expected " + str(expected)
+            self.Error(error_msg)
+        else:
+            self.state.PopCallStack()
+            if override_tunnel_return_target:
+                self.state.divertedPointer = self.PointerAtPath(override_tunnel_return_target.targetPath)
+
+    def PerformBeginString(self, eval_command: ControlCommand):
+        self.state.PushToOutputStream(eval_command)
+        self.Assert(self.state.inExpressionEvaluation is True, "Expected to be in an expression when evaluating a string")
+        self.state.inExpressionEvaluation = False
+
+    def PerformBeginTag(self, eval_command: ControlCommand):
+        self.state.PushToOutputStream(eval_command)
+
+    def PerformEndTag(self, eval_command: ControlCommand):
+        if self.state.inStringEvaluation:
+            content_stack_for_tag = []
+            output_count_consumed = 0
+            for i in range(len(self.state.outputStream) - 1, -1, -1):
+                obj = self.state.outputStream[i]
+                output_count_consumed += 1
+                command = as_or_null(obj, ControlCommand)
+                if command is not None:
+                    if command.commandType == ControlCommand.CommandType.BeginTag:
+                        break
+                    self.Error("Unexpected ControlCommand while extracting tag from choice")
+                    break
+                if isinstance(obj, StringValue):
+                    content_stack_for_tag.append(obj)
+            self.state.PopFromOutputStream(output_count_consumed)
+            sb = StringBuilder()
+            for str_val in reversed(content_stack_for_tag):
+                sb.Append(str_val.toString())
+            choice_tag = Tag(self.state.CleanOutputWhitespace(str(sb)))
+            self.state.PushEvaluationStack(choice_tag)
+        else:
+            self.state.PushToOutputStream(eval_command)
+
+    def PerformEndString(self, eval_command: ControlCommand):
+        content_stack_for_string = []
+        content_to_retain = []
+        output_count_consumed = 0
+        for i in range(len(self.state.outputStream) - 1, -1, -1):
+            obj = self.state.outputStream[i]
+            output_count_consumed += 1
+            command = as_or_null(obj, ControlCommand)
+            if command and command.commandType == ControlCommand.CommandType.BeginString:
+                break
+            if isinstance(obj, Tag):
+                content_to_retain.append(obj)
+            if isinstance(obj, StringValue):
+                content_stack_for_string.append(obj)
+        self.state.PopFromOutputStream(output_count_consumed)
+        for rescued_tag in content_to_retain:
+            self.state.PushToOutputStream(rescued_tag)
+        content_stack_for_string = list(reversed(content_stack_for_string))
+        sb = StringBuilder()
+        for c in content_stack_for_string:
+            sb.Append(c.toString())
+        self.state.inExpressionEvaluation = True
+        self.state.PushEvaluationStack(StringValue.Of(str(sb)))
+
+    def PerformChoiceCount(self, eval_command: ControlCommand):
+        choice_count = len(self.state.generatedChoices)
+        self.state.PushEvaluationStack(IntValue.Of(choice_count))
+
+    def PerformTurns(self, eval_command: ControlCommand):
+        self.state.PushEvaluationStack(IntValue.Of(self.state.currentTurnIndex + 1))
+
+    def PerformTurnsSinceOrReadCount(self, eval_command: ControlCommand):
+        cmd = eval_command.commandType
+        target = self.state.PopEvaluationStack()
+        if not isinstance(target, DivertTargetValue):
+            extra_note = ""
+            if isinstance(target, IntValue):
+                extra_note = ". Did you accidentally pass a read count ('knot_name') instead of a target ('-> knot_name')?"
+            self.Error(
+                "TURNS_SINCE / READ_COUNT expected a divert target (knot, stitch, label name), but saw "
+                + str(target)
+                + extra_note
+            )
+            return
+        divert_target = as_or_throws(target, DivertTargetValue)
+        container = as_or_null(self.ContentAtPath(divert_target.targetPath).correctObj, Container)
+        if container is not None:
+            if cmd == ControlCommand.CommandType.TurnsSince:
+                either_count = self.state.TurnsSinceForContainer(container)
             else:
-                found_value = self.state.variablesState.GetVariableWithName(var_ref.name)
-                if found_value is None:
-                    self.Warning(
-                        "Variable not found: '"
-                        + str(var_ref.name)
-                        + "'. Using default value of 0 (false). This can happen with temporary variables if the declaration hasn't yet been hit. Globals are always given a default value on load if a value doesn't exist in the save state."
-                    )
-                    found_value = IntValue(0)
-            self.state.PushEvaluationStack(found_value)
-            return True
+                either_count = self.state.VisitCountForContainer(container)
+        else:
+            either_count = -1 if cmd == ControlCommand.CommandType.TurnsSince else 0
+            self.Warning(
+                "Failed to find container for " + str(eval_command) + " lookup at " + str(divert_target.targetPath)
+            )
+        self.state.PushEvaluationStack(IntValue.Of(either_count))
+
+    def PerformRandom(self, eval_command: ControlCommand):
+        max_int = as_or_null(self.state.PopEvaluationStack(), IntValue)
+        min_int = as_or_null(self.state.PopEvaluationStack(), IntValue)
+        if not isinstance(min_int, IntValue):
+            return self.Error("Invalid value for minimum parameter of RANDOM(min, max)")
+        if not isinstance(max_int, IntValue):
+            return self.Error("Invalid value for maximum parameter of RANDOM(min, max)")
+        if max_int.value is None or min_int.value is None:
+            return throw_null_exception("minInt.value")
+        random_range = max_int.value - min_int.value + 1
+        if random_range <= 0:
+            self.Error(
+                "RANDOM was called with minimum as "
+                + str(min_int.value)
+                + " and maximum as "
+                + str(max_int.value)
+                + ". The maximum must be larger"
+            )
+        result_seed = self.state.storySeed + self.state.previousRandom
+        random = PRNG(result_seed)
+        next_random = random.next()
+        chosen_value = (next_random % random_range) + min_int.value
+        self.state.PushEvaluationStack(IntValue.Of(chosen_value))
+        self.state.previousRandom = next_random
+
+    def PerformSeedRandom(self, eval_command: ControlCommand):
+        seed = as_or_null(self.state.PopEvaluationStack(), IntValue)
+        if not isinstance(seed, IntValue):
+            return self.Error("Invalid value passed to SEED_RANDOM")
+        if seed.value is None:
+            return throw_null_exception("minInt.value")
+        self.state.storySeed = seed.value
+        self.state.previousRandom = 0
+        self.state.PushEvaluationStack(Void())
+
+    def PerformVisitIndex(self, eval_command: ControlCommand):
+        count = self.state.VisitCountForContainer(self.state.currentPointer.container) - 1
+        self.state.PushEvaluationStack(IntValue.Of(count))
+
+    def PerformSequenceShuffleIndex(self, eval_command: ControlCommand):
+        shuffle_index = self.NextSequenceShuffleIndex()
+        self.state.PushEvaluationStack(IntValue.Of(shuffle_index))
+
+    def PerformDone(self, eval_command: ControlCommand):
+        if self.state.callStack.canPopThread:
+            self.state.callStack.PopThread()
+        else:
+            self.state.didSafeExit = True
+            self.state.currentPointer = Pointer.Null()
+
+    def PerformEnd(self, eval_command: ControlCommand):
+        self.state.ForceEnd()
+
+    def PerformListFromInt(self, eval_command: ControlCommand):
+        int_val = as_or_null(self.state.PopEvaluationStack(), IntValue)
+        list_name_val = as_or_throws(self.state.PopEvaluationStack(), StringValue)
+        if int_val is None:
+            raise StoryException("Passed non-integer when creating a list element from a numerical value.")
+        generated_list_value = None
+        if self.listDefinitions is None:
+            return throw_null_exception("this.listDefinitions")
+        found_list_def = self.listDefinitions.TryListGetDefinition(list_name_val.value, None)
+        if found_list_def.exists:
+            if int_val.value is None:
+                return throw_null_exception("minInt.value")
+            found_item = found_list_def.result.TryGetItemWithValue(int_val.value, InkListItem.Null())
+            if found_item.exists:
+                generated_list_value = ListValue(found_item.result, int_val.value)
+        else:
+            raise StoryException("Failed to find LIST called " + str(list_name_val.value))
+        if generated_list_value is None:
+            generated_list_value = ListValue()
+        self.state.PushEvaluationStack(generated_list_value)
+
+    def PerformListRange(self, eval_command: ControlCommand):
+        max_val = as_or_null(self.state.PopEvaluationStack(), Value)
+        min_val = as_or_null(self.state.PopEvaluationStack(), Value)
+        target_list = as_or_null(self.state.PopEvaluationStack(), ListValue)
+        if target_list is None or min_val is None or max_val is None:
+            raise StoryException("Expected list, minimum and maximum for LIST_RANGE")
+        if target_list.value is None:
+            return throw_null_exception("targetList.value")
+        result = target_list.value.ListWithSubRange(min_val.valueObject, max_val.valueObject)
+        self.state.PushEvaluationStack(ListValue(result))
+
+    def PerformListRandom(self, eval_command: ControlCommand):
+        list_val = self.state.PopEvaluationStack()
+        if not isinstance(list_val, ListValue):
+            raise StoryException("Expected list for LIST_RANDOM")
+        list_obj = list_val.value
+        new_list = None
+        if list_obj is None:
+            raise throw_null_exception("list")
+        if list_obj.Count == 0:
+            new_list = InkList()
+        else:
+            result_seed = self.state.storySeed + self.state.previousRandom
+            random = PRNG(result_seed)
+            next_random = random.next()
+            list_item_index = next_random % list_obj.Count
+            list_entries = list(list_obj.items())
+            key, value = list_entries[list_item_index]
+            random_item = {"Key": InkListItem.fromSerializedKey(key), "Value": value}
+            if random_item["Key"].originName is None:
+                return throw_null_exception("randomItem.Key.originName")
+            new_list = InkList(random_item["Key"].originName, self)
+            new_list.Add(random_item["Key"], random_item["Value"])
+            self.state.previousRandom = next_random
+        self.state.PushEvaluationStack(ListValue(new_list))
+
+    def PerformVariableAssignment(self, var_ass: VariableAssignment):
+        assigned_val = self.state.PopEvaluationStack()
+        self.state.variablesState.Assign(var_ass, assigned_val)
+        return True
 
-        if isinstance(content_obj, NativeFunctionCall):
-            func = content_obj
-            func_params = self.state.PopEvaluationStack(func.numberOfParameters)
-            result = func.Call(func_params)
-            self.state.PushEvaluationStack(result)
-            return True
+    def PerformVariableReference(self, var_ref: VariableReference):
+        found_value = None
+        if var_ref.pathForCount is not None:
+            container = var_ref.containerForCount
+            count = self.state.VisitCountForContainer(container)
+            found_value = IntValue.Of(count)
+        else:
+            found_value = self.state.variablesState.GetVariableWithName(var_ref.name)
+            if found_value is None:
+                self.Warning(
+                    "Variable not found: '"
+                    + str(var_ref.name)
+                    + "'. Using default value of 0 (false). This can happen with temporary variables if the declaration hasn't yet been hit. Globals are always given a default value on load if a value doesn't exist in the save state."
+                )
+                found_value = IntValue.Of(0)
+        self.state.PushEvaluationStack(found_value)
+        return True
 
-        return False
+    def PerformNativeFunctionCall(self, func: NativeFunctionCall):
+        func_params = self.state.PopEvaluationStack(func.numberOfParameters)
+        result = func.Call(func_params)
+        self.state.PushEvaluationStack(result)
+        return True
 
     def ChoosePathString(self, path: str, reset_callstack: bool = True, args: Optional[List] = None):
         self.IfAsyncWeCant("call ChoosePathString right now")
@@ -1204,18 +1447,44 @@ class Story(InkObject):
                 container = inner_content if isinstance(inner_content, Container) else None
                 if container is None or not container.hasValidName:
                     self.ValidateExternalBindings(inner_content, missing_externals)
-            for value in o.namedContent.values():
+            # Knots that haven't been loaded yet are checked in their JSON or
+            # story map form. Listed before the loaded ones, so that a knot
+            # another session loads meanwhile is in one list or both.
+            unloaded_named_content = o.unloadedNamedContent
+            for value in o.loadedNamedContent.values():
                 self.ValidateExternalBindings(as_or_null(value, InkObject), missing_externals)
+            for unloaded in unloaded_named_content:
+                if not isinstance(unloaded, str):
+                    for name in unloaded.externalNames:
+                        self.ValidateExternalBindings({"x()": name}, missing_externals)
+                elif '"x()"' in unloaded:
+                    self.ValidateExternalBindings(SimpleJson.TextToArray(unloaded), missing_externals)
             return
 
+        if isinstance(o, list):
+            for token in o:
+                if token is not None:
+                    self.ValidateExternalBindings(token, missing_externals)
+            return
+
+        name = None
         divert = as_or_null(o, Divert)
         if divert and divert.isExternal:
             name = divert.targetPathString
             if name is None:
                 return throw_null_exception("name")
+        elif isinstance(o, dict):
+            if "x()" not in o:
+                for value in o.values():
+                    if isinstance(value, list):
+                        self.ValidateExternalBindings(value, missing_externals)
+                return
+            name = str(o["x()"])
+
+        if name is not None:
             if name not in self._externals:
                 if self.allowExternalFunctionFallbacks:
-                    fallback_found = name in self.mainContentContainer.namedContent
+                    fallback_found = self.KnotContainerWithName(name) is not None
                     if not fallback_found:
                         missing_externals.add(name)
                 else:
@@ -1326,9 +1595,9 @@ class Story(InkObject):
         return str(sb)
 
     def NextContent(self):
-        self.state.previousPointer = self.state.currentPointer.copy()
+        self.state.previousPointer = self.state.currentPointer
         if not self.state.divertedPointer.isNull:
-            self.state.currentPointer = self.state.divertedPointer.copy()
+            self.state.currentPointer = self.state.divertedPointer
             self.state.divertedPointer = Pointer.Null()
             self.VisitChangedContainersDueToDivert()
             if not self.state.currentPointer.isNull:
@@ -1351,31 +1620,29 @@ class Story(InkObject):
                 self.NextContent()
 
     def IncrementContentPointer(self):
-        successful_increment = True
-        pointer = self.state.callStack.currentElement.currentPointer.copy()
-        pointer.index += 1
-        if pointer.container is None:
+        if self._flatCode is not None:
+            element = self.state.callStack.currentElement
+            instruction = self._flatCode.InstructionAt(element.currentPointer.container, element.currentPointer.index)
+            if instruction is not None:
+                next_pointer = instruction[3]
+                element.currentPointer = Pointer.Null() if next_pointer is None else next_pointer
+                return next_pointer is not None
+
+        element = self.state.callStack.currentElement
+        container = element.currentPointer.container
+        index = element.currentPointer.index + 1
+        if container is None:
             return throw_null_exception("pointer.container")
-        while pointer.index >= len(pointer.container.content):
-            successful_increment = False
-            next_ancestor = as_or_null(pointer.container.parent, Container)
-            if not isinstance(next_ancestor, Container):
-                break
-            try:
-                index_in_ancestor = next_ancestor.content.index(pointer.container)
-            except ValueError:
-                break
-            if index_in_ancestor == -1:
-                break
-            pointer = Pointer(next_ancestor, index_in_ancestor)
-            pointer.index += 1
-            successful_increment = True
-            if pointer.container is None:
-                return throw_null_exception("pointer.container")
-        if not successful_increment:
-            pointer = Pointer.Null()
-        self.state.callStack.currentElement.currentPointer = pointer.copy()
-        return successful_increment
+        while index >= len(container.content):
+            next_ancestor = container.parent
+            # Named-only containers have no index, so content runs out there.
+            if not isinstance(next_ancestor, Container) or container.indexInParent == -1:
+                element.currentPointer = Pointer.Null()
+                return False
+            index = container.indexInParent + 1
+            container = next_ancestor
+        element.currentPointer = Pointer(container, index)
+        return True
 
     def TryFollowDefaultInvisibleChoice(self):
         all_choices = self._state.currentChoices
@@ -1455,13 +1722,13 @@ class Story(InkObject):
     def currentDebugMetadata(self) -> Optional[DebugMetadata]:
         pointer = self.state.currentPointer
         if not pointer.isNull and pointer.Resolve() is not None:
-            dm = pointer.Resolve().debugMetadata
+            dm = pointer.Resolve().debugMetadata or pointer.container.debugMetadata
             if dm is not None:
                 return dm
         for element in reversed(self.state.callStack.elements):
             pointer = element.currentPointer
             if not pointer.isNull and pointer.Resolve() is not None:
-                dm = pointer.Resolve().debugMetadata
+                dm = pointer.Resolve().debugMetadata or pointer.container.debugMetadata
                 if dm is not None:
                     return dm
         for output_obj in reversed(self.state.outputStream):
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from .compiled_story import CompiledStory
+from .container import Container
+from .json_serialisation import JsonSerialisation
+from .list_definitions_origin import ListDefinitionsOrigin
+from .value import BoolValue, FloatValue, IntValue
+
+
+# A story laid out flat so that it can be mapped straight from disk and shared
+# between processes: a header, then a string table (offsets into a UTF-8 blob),
+# fixed size node records and a children array.
+#
+# Every node is four int32s: kind, then
+#   kContainer: name string (-1 for none), count flags, offset into children
+#   kToken:     string of a bare JSON string token ("ev", "^text", "+", ...)
+#   kObject:    string of a JSON object token, in compact form, or of an int
+#               literal too big for an int32
+#   kInt/kBool: the value
+#   kFloat:     string of the value
+# A container's children entry is its content count, its named-only count, the
+# index one past its last descendant, then the content and named-only nodes.
+# Nodes are written depth first, so a container's descendants follow it.
+class StoryMap:
+    kMagic = b"INKPYM"
+    kFormatVersion = 1
+
+    kContainer = 0
+    kToken = 1
+    kObject = 2
+    kInt = 3
+    kFloat = 4
+    kBool = 5
+
+    # What a kInt node's int32 holds.
+    kMinInt = -0x80000000
+    kMaxInt = 0x7FFFFFFF
+
+    _header = struct.Struct("<6sH32sIIIII")
+    _headerSize = 64
+
+    @staticmethod
+    def Write(file_path, json_text: str):
+        if sys.byteorder != "little":
+            raise ValueError("Story maps can only be written on little-endian machines")
+        root_object = json.loads(json_text.lstrip("\ufeff"))
+        root_token = root_object.get("root")
+        if not isinstance(root_token, list):
+            raise ValueError("Root node for ink not found. Are you sure it's a valid .ink.json file?")
+
+        strings: Dict[str, int] = {}
+        nodes = array("i")
+        children = array("i")
+
+        def string_index(value: str):
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+
+        def write_node(token):
+            node_index = len(nodes) // 4
+            if isinstance(token, list):
+                write_container(token, None)
+            elif isinstance(token, str):
+                nodes.extend((StoryMap.kToken, string_index(token), 0, 0))
+            elif isinstance(token, dict):
+                compact = json.dumps(token, ensure_ascii=False, separators=(",", ":"))
+                nodes.extend((StoryMap.kObject, string_index(compact), 0, 0))
+            elif isinstance(token, bool):
+                nodes.extend((StoryMap.kBool, int(token), 0, 0))
+            elif isinstance(token, int):
+                if StoryMap.kMinInt <= token <= StoryMap.kMaxInt:
+                    nodes.extend((StoryMap.kInt, token, 0, 0))
+                else:
+                    nodes.extend((StoryMap.kObject, string_index(json.dumps(token)), 0, 0))
+            elif isinstance(token, float):
+                nodes.extend((StoryMap.kFloat, string_index(repr(token)), 0, 0))
+            else:
+                raise ValueError("Failed to convert token to runtime object: " + json.dumps(token))
+            return node_index
+
+        def write_container(j_array: List, name: Optional[str]):
+            node_index = len(nodes) // 4
+            terminating_obj = j_array[-1] if j_array else None
+            count_flags = 0
+            named_only = []
+            if isinstance(terminating_obj, dict):
+                for key, value in terminating_obj.items():
+                    if key == "#f":
+                        count_flags = int(value)
+                    elif key == "#n":
+                        name = str(value)
+                    else:
+                        named_only.append((key, value))
+            content = j_array[:-1]
+
+            children_offset = len(children)
+            nodes.extend((StoryMap.kContainer, -1 if name is None else string_index(name), count_flags, children_offset))
+            children.extend([0] * (3 + len(content) + len(named_only)))
+            children[children_offset] = len(content)
+            children[children_offset + 1] = len(named_only)
+            slot = children_offset + 3
+            for token in content:
+                children[slot] = write_node(token)
+                slot += 1
+            for key, value in named_only:
+                if not isinstance(value, list):
+                    raise ValueError("Named content '" + key + "' isn't a container")
+                children[slot] = write_container(value, key)
+                slot += 1
+            children[children_offset + 2] = len(nodes) // 4
+            return node_index
+
+        write_container(root_token, None)
+        list_defs = root_object.get("listDefs") or {}
+        list_defs_index = string_index(json.dumps(list_defs, ensure_ascii=False, separators=(",", ":")))
+
+        blob = bytearray()
+        offsets = array("I", [0])
+        for value in strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+
+        header = StoryMap._header.pack(
+            StoryMap.kMagic,
+            StoryMap.kFormatVersion,
+            CompiledStory.SourceHash(json_text),
+            len(strings),
+            len(nodes) // 4,
+            len(children),
+            len(blob),
+            list_defs_index,
+        )
+        # Processes may have the old map open. Truncating it under them would
+        # crash them on their next read, so the new one replaces it instead.
+        # Each writer gets its own temporary file, in case several rebuild it.
+        temp_path = str(file_path) + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(header.ljust(StoryMap._headerSize, b"\0"))
+                f.write(offsets.tobytes())
+                f.write(nodes.tobytes())
+                f.write(children.tobytes())
+                f.write(blob)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def __init__(self, file_path, source_hash: Optional[bytes] = None):
+        if sys.byteorder != "little":
+            raise ValueError("Story maps can only be read on little-endian machines")
+        with open(file_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data = memoryview(self._mmap)
+        if len(data) < StoryMap._headerSize:
+            raise ValueError("Story map file is truncated: " + str(file_path))
+        (
+            magic,
+            format_version,
+            self.sourceHash,
+            string_count,
+            node_count,
+            child_count,
+            blob_size,
+            list_defs_index,
+        ) = StoryMap._header.unpack_from(data)
+        if magic != StoryMap.kMagic:
+            raise ValueError("Not an ink story map: " + str(file_path))
+        if format_version != StoryMap.kFormatVersion:
+            raise ValueError(
+                "Story map format version "
+                + str(format_version)
+                + " doesn't match the engine's version "
+                + str(StoryMap.kFormatVersion)
+                + ", so it must be written again."
+            )
+        if source_hash is not None and self.sourceHash != source_hash:
+            raise ValueError("Story map is out of date with its source .ink.json: " + str(file_path))
+
+        start = StoryMap._headerSize
+        sections = []
+        for item_size, count in ((4, string_count + 1), (16, node_count), (4, child_count), (1, blob_size)):
+            sections.append(data[start : start + item_size * count])
+            start += item_size * count
+        if start != len(data):
+            raise ValueError("Story map size doesn't match its header, the file is corrupt: " + str(file_path))
+
+        self._offsets = sections[0].cast("I")
+        self._nodes = sections[1].cast("i")
+        self._children = sections[2].cast("i")
+        self._blob = sections[3]
+        self._listDefsIndex = list_defs_index
+        JsonSerialisation.GenerateDecodersIfNecessary()
+
+    @property
+    def nodeCount(self):
+        return len(self._nodes) // 4
+
+    @property
+    def listDefinitions(self) -> ListDefinitionsOrigin:
+        list_defs = json.loads(self.String(self._listDefsIndex))
+        if not list_defs:
+            return ListDefinitionsOrigin([])
+        return JsonSerialisation.JTokenToListDefinitions(list_defs)
+
+    def String(self, index: int) -> str:
+        return str(self._blob[self._offsets[index] : self._offsets[index + 1]], "utf-8")
+
+    def RootContainer(self, lazy: bool = True) -> Container:
+        return self.InflateContainer(0, lazy)
+
+    def InflateContainer(self, node_index: int, lazy: bool = True) -> Container:
+        # lazy leaves named-only subcontainers as MappedContainers, which
+        # Container inflates the first time they're looked up by name.
+        nodes = self._nodes
+        children = self._children
+        kind, name_index, count_flags, offset = nodes[node_index * 4 : node_index * 4 + 4]
+        if kind != StoryMap.kContainer:
+            raise ValueError("Story map node " + str(node_index) + " isn't a container")
+
+        container = Container()
+        if name_index >= 0:
+            container.name = self.String(name_index)
+        container.countFlags = count_flags
+
+        content_count = children[offset]
+        named_count = children[offset + 1]
+        first_child = offset + 3
+        container.content = [
+            self.InflateNode(children[i], lazy) for i in range(first_child, first_child + content_count)
+        ]
+
+        named_only_content = {}
+        lazy_named_content = {}
+        for i in range(first_child + content_count, first_child + content_count + named_count):
+            child_index = children[i]
+            name = self.String(nodes[child_index * 4 + 1])
+            if lazy:
+                lazy_named_content[name] = MappedContainer(self, child_index)
+            else:
+                named_only_content[name] = self.InflateContainer(child_index, False)
+        if named_only_content:
+            container.namedOnlyContent = named_only_content
+        container.lazyNamedContent = lazy_named_content
+        return container
+
+    def InflateNode(self, node_index: int, lazy: bool = True):
+        kind = self._nodes[node_index * 4]
+        value = self._nodes[node_index * 4 + 1]
+        if kind == StoryMap.kToken:
+            runtime_obj = JsonSerialisation.JStringToRuntimeObject(self.String(value))
+        elif kind == StoryMap.kObject:
+            token = json.loads(self.String(value))
+            if isinstance(token, dict):
+                runtime_obj = JsonSerialisation.JObjectToRuntimeObject(token)
+            else:
+                runtime_obj = IntValue(token)
+        elif kind == StoryMap.kContainer:
+            runtime_obj = self.InflateContainer(node_index, lazy)
+        elif kind == StoryMap.kInt:
+            runtime_obj = IntValue(value)
+        elif kind == StoryMap.kFloat:
+            runtime_obj = FloatValue(float(self.String(value)))
+        elif kind == StoryMap.kBool:
+            runtime_obj = BoolValue(bool(value))
+        else:
+            raise ValueError("Unknown story map node kind " + str(kind))
+        if runtime_obj is None:
+            raise ValueError("Failed to convert story map node " + str(node_index))
+        return runtime_obj
+
+    def ExternalNamesUnder(self, node_index: int) -> List[str]:
+        nodes = self._nodes
+        subtree_end = self._children[nodes[node_index * 4 + 3] + 2]
+        names = []
+        for i in range(node_index, subtree_end):
+            if nodes[i * 4] == StoryMap.kObject:
+                text = self.String(nodes[i * 4 + 1])
+                if '"x()"' in text:
+                    names.append(str(json.loads(text)["x()"]))
+        return names
+
+
+class MappedContainer:
+    # A named-only container still in its story map.
+    __slots__ = ("storyMap", "nodeIndex")
+
+    def __init__(self, story_map: StoryMap, node_index: int):
+        self.storyMap = story_map
+        self.nodeIndex = node_index
+
+    def Inflate(self) -> Container:
+        return self.storyMap.InflateContainer(self.nodeIndex)
+
+    @property
+    def externalNames(self) -> List[str]:
+        return self.storyMap.ExternalNamesUnder(self.nodeIndex)
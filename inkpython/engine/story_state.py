@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from array import array
 from typing import Dict, List, Optional
 
 from .call_stack import CallStack
@@ -10,15 +11,14 @@ from .glue import Glue
 from .ink_list import InkList
 from .json_serialisation import JsonSerialisation
 from .null_exception import throw_null_exception
+from .output_stream_text import OutputStreamText
 from .path import Path
 from .pointer import Pointer
 from .prng import PRNG
 from .push_pop import PushPopType
 from .simple_json import SimpleJson
 from .state_patch import StatePatch
-from .string_builder import StringBuilder
-from .tag import Tag
-from .try_get_result import try_get_value_from_map
+from .state_snapshot import StateSnapshot
 from .type_assertion import as_or_null, as_or_throws, null_if_undefined
 from .value import ListValue, StringValue, Value, ValueType
 from .variables_state import VariablesState
@@ -29,12 +29,15 @@ from .flow import Flow
 class StoryState:
     kInkSaveStateVersion = 10
     kMinCompatibleLoadVersion = 8
+    # Turn index of a container that hasn't been visited.
+    kNoTurnIndex = -0x80000000
 
     def __init__(self, story):
         self.onDidLoadState = None
         self.story = story
 
         self._currentFlow = Flow(self.kDefaultFlowName, story)
+        self._outputStreamText = OutputStreamText()
         self.OutputStreamDirty()
 
         self._aliveFlowNamesDirty = True
@@ -42,8 +45,14 @@ class StoryState:
 
         self._variablesState = VariablesState(self.callStack, story.listDefinitions)
 
-        self._visitCounts: Dict[str, int] = {}
-        self._turnIndices: Dict[str, int] = {}
+        self._countSlots = story.countSlots
+        # Indexed by count slot, see CountSlots, and grown to fit on the first
+        # count recorded. Each list of slots is in the order their counts were
+        # first recorded.
+        self._visitCounts = array("i")
+        self._turnIndices = array("i")
+        self._visitedSlots: List[int] = []
+        self._turnIndexSlots: List[int] = []
         self._currentTurnIndex = -1
 
         time_seed = PRNG(int(__import__("time").time() * 1000)).next() % 100
@@ -59,6 +68,7 @@ class StoryState:
         self._outputStreamTextDirty = True
         self._outputStreamTagsDirty = True
         self._patch: Optional[StatePatch] = None
+        self._snapshot: Optional[StateSnapshot] = None
         self._aliveFlowNames = None
         self._namedFlows = None
 
@@ -83,13 +93,13 @@ class StoryState:
             container = self.story.ContentAtPath(Path(path_string)).container
             if container is None:
                 raise ValueError("Content at path not found: " + path_string)
-            visit_count_out = self._patch.TryGetVisitCount(container, 0)
+            visit_count_out = self._patch.TryGetVisitCount(self._countSlots.SlotForContainer(container), 0)
             if visit_count_out.exists:
                 return visit_count_out.result
 
-        visit_count_out = try_get_value_from_map(self._visitCounts, path_string, None)
-        if visit_count_out.exists:
-            return visit_count_out.result
+        slot = self._countSlots.SlotAtPath(path_string)
+        if 0 <= slot < len(self._visitCounts):
+            return self._visitCounts[slot]
         return 0
 
     def VisitCountForContainer(self, container: Container):
@@ -105,37 +115,39 @@ class StoryState:
             )
             return 0
 
+        slot = container.countIndex
+        if slot < 0:
+            slot = self._countSlots.SlotForContainer(container)
         if self._patch is not None:
-            count = self._patch.TryGetVisitCount(container, 0)
+            count = self._patch.TryGetVisitCount(slot, 0)
             if count.exists:
                 return count.result
 
-        container_path_str = container.path.toString()
-        count2 = try_get_value_from_map(self._visitCounts, container_path_str, None)
-        if count2.exists:
-            return count2.result
+        if slot < len(self._visitCounts):
+            return self._visitCounts[slot]
         return 0
 
     def IncrementVisitCountForContainer(self, container: Container):
+        slot = container.countIndex
+        if slot < 0:
+            slot = self._countSlots.SlotForContainer(container)
         if self._patch is not None:
             curr_count = self.VisitCountForContainer(container)
             curr_count += 1
-            self._patch.SetVisitCount(container, curr_count)
+            self._patch.SetVisitCount(slot, curr_count)
             return
 
-        container_path_str = container.path.toString()
-        count = try_get_value_from_map(self._visitCounts, container_path_str, None)
-        if count.exists:
-            self._visitCounts[container_path_str] = count.result + 1
-        else:
-            self._visitCounts[container_path_str] = 1
+        counts = self._visitCounts
+        self.SetCount(slot, (counts[slot] if slot < len(counts) else 0) + 1, True)
 
     def RecordTurnIndexVisitToContainer(self, container: Container):
+        slot = container.countIndex
+        if slot < 0:
+            slot = self._countSlots.SlotForContainer(container)
         if self._patch is not None:
-            self._patch.SetTurnIndex(container, self.currentTurnIndex)
+            self._patch.SetTurnIndex(slot, self.currentTurnIndex)
             return
-        container_path_str = container.path.toString()
-        self._turnIndices[container_path_str] = self.currentTurnIndex
+        self.SetCount(slot, self.currentTurnIndex, False)
 
     def TurnsSinceForContainer(self, container: Container):
         if not container.turnIndexShouldBeCounted:
@@ -146,16 +158,38 @@ class StoryState:
                 + str(container.debugMetadata)
                 + ") unknown. The story may need to be compiled with countAllVisits flag (-c)."
             )
+        slot = container.countIndex
+        if slot < 0:
+            slot = self._countSlots.SlotForContainer(container)
         if self._patch is not None:
-            index = self._patch.TryGetTurnIndex(container, 0)
+            index = self._patch.TryGetTurnIndex(slot, 0)
             if index.exists:
                 return self.currentTurnIndex - index.result
-        container_path_str = container.path.toString()
-        index2 = try_get_value_from_map(self._turnIndices, container_path_str, 0)
-        if index2.exists:
-            return self.currentTurnIndex - index2.result
+        if slot < len(self._turnIndices):
+            index2 = self._turnIndices[slot]
+            if index2 != self.kNoTurnIndex:
+                return self.currentTurnIndex - index2
         return -1
 
+    def SetCount(self, slot: int, value: int, is_visit: bool):
+        counts = self._visitCounts if is_visit else self._turnIndices
+        if slot >= len(counts):
+            self.GrowCounts()
+        # Saves list counts in the order they were first recorded.
+        if is_visit:
+            if self._visitCounts[slot] == 0:
+                self._visitedSlots.append(slot)
+        elif self._turnIndices[slot] == self.kNoTurnIndex:
+            self._turnIndexSlots.append(slot)
+        counts[slot] = value
+
+    def GrowCounts(self):
+        # For the slots given out since the arrays last grew.
+        # In place, as states copied for patching share them.
+        slot_count = len(self._countSlots.paths)
+        self._visitCounts.extend(array("i", [0]) * (slot_count - len(self._visitCounts)))
+        self._turnIndices.extend(array("i", [self.kNoTurnIndex]) * (slot_count - len(self._turnIndices)))
+
     @property
     def callstackDepth(self):
         return self.callStack.depth
@@ -164,6 +198,10 @@ class StoryState:
     def outputStream(self):
         return self._currentFlow.outputStream
 
+    @property
+    def outputStreamMarks(self):
+        return self._currentFlow.outputStreamMarks
+
     @property
     def currentChoices(self):
         if self.canContinue:
@@ -226,19 +264,19 @@ class StoryState:
 
     @property
     def currentPointer(self):
-        return self.callStack.currentElement.currentPointer.copy()
+        return self.callStack.currentElement.currentPointer
 
     @currentPointer.setter
     def currentPointer(self, value: Pointer):
-        self.callStack.currentElement.currentPointer = value.copy()
+        self.callStack.currentElement.currentPointer = value
 
     @property
     def previousPointer(self):
-        return self.callStack.currentThread.previousPointer.copy()
+        return self.callStack.currentThread.previousPointer
 
     @previousPointer.setter
     def previousPointer(self, value: Pointer):
-        self.callStack.currentThread.previousPointer = value.copy()
+        self.callStack.currentThread.previousPointer = value
 
     @property
     def canContinue(self):
@@ -255,76 +293,21 @@ class StoryState:
     @property
     def currentText(self):
         if self._outputStreamTextDirty:
-            sb = StringBuilder()
-            in_tag = False
-            for output_obj in self.outputStream:
-                text_content = as_or_null(output_obj, StringValue)
-                if not in_tag and text_content is not None:
-                    sb.Append(text_content.value)
-                else:
-                    control_command = as_or_null(output_obj, ControlCommand)
-                    if control_command is not None:
-                        if control_command.commandType == ControlCommand.CommandType.BeginTag:
-                            in_tag = True
-                        elif control_command.commandType == ControlCommand.CommandType.EndTag:
-                            in_tag = False
-            self._currentText = self.CleanOutputWhitespace(str(sb))
+            if not self._outputStreamText.isValid:
+                self._outputStreamText.Rebuild(self.outputStream)
+            self._currentText = self._outputStreamText.text
             self._outputStreamTextDirty = False
         return self._currentText
 
     def CleanOutputWhitespace(self, text: str):
-        sb = StringBuilder()
-        current_whitespace_start = -1
-        start_of_line = 0
-        for i, char in enumerate(text):
-            is_inline_whitespace = char in (" ", "\t")
-            if is_inline_whitespace and current_whitespace_start == -1:
-                current_whitespace_start = i
-            if not is_inline_whitespace:
-                if char != "\n" and current_whitespace_start > 0 and current_whitespace_start != start_of_line:
-                    sb.Append(" ")
-                current_whitespace_start = -1
-            if char == "\n":
-                start_of_line = i + 1
-            if not is_inline_whitespace:
-                sb.Append(char)
-        return str(sb)
+        return OutputStreamText.CleanText(text)
 
     @property
     def currentTags(self):
         if self._outputStreamTagsDirty:
-            self._currentTags = []
-            in_tag = False
-            sb = StringBuilder()
-            for output_obj in self.outputStream:
-                control_command = as_or_null(output_obj, ControlCommand)
-                if control_command is not None:
-                    if control_command.commandType == ControlCommand.CommandType.BeginTag:
-                        if in_tag and sb.Length > 0:
-                            txt = self.CleanOutputWhitespace(str(sb))
-                            self._currentTags.append(txt)
-                            sb.Clear()
-                        in_tag = True
-                    elif control_command.commandType == ControlCommand.CommandType.EndTag:
-                        if sb.Length > 0:
-                            txt = self.CleanOutputWhitespace(str(sb))
-                            self._currentTags.append(txt)
-                            sb.Clear()
-                        in_tag = False
-                elif in_tag:
-                    str_val = as_or_null(output_obj, StringValue)
-                    if str_val is not None:
-                        sb.Append(str_val.value)
-                else:
-                    tag = as_or_null(output_obj, Tag)
-                    if tag is not None and tag.text is not None and len(tag.text) > 0:
-                        self._currentTags.append(tag.text)
-
-            if sb.Length > 0:
-                txt = self.CleanOutputWhitespace(str(sb))
-                self._currentTags.append(txt)
-                sb.Clear()
-
+            if not self._outputStreamText.isValid:
+                self._outputStreamText.Rebuild(self.outputStream)
+            self._currentTags = self._outputStreamText.tags
             self._outputStreamTagsDirty = False
         return self._currentTags
 
@@ -399,6 +382,7 @@ class StoryState:
         copy._currentFlow.name = self._currentFlow.name
         copy._currentFlow.callStack = CallStack(to_copy=self._currentFlow.callStack)
         copy._currentFlow.outputStream.extend(self._currentFlow.outputStream)
+        copy._currentFlow.outputStreamMarks = self._currentFlow.outputStreamMarks.Copy()
         copy.OutputStreamDirty()
 
         if for_background_save:
@@ -429,35 +413,86 @@ class StoryState:
         copy.evaluationStack.extend(self.evaluationStack)
 
         if not self.divertedPointer.isNull:
-            copy.divertedPointer = self.divertedPointer.copy()
+            copy.divertedPointer = self.divertedPointer
 
-        copy.previousPointer = self.previousPointer.copy()
+        copy.previousPointer = self.previousPointer
 
         copy._visitCounts = self._visitCounts
         copy._turnIndices = self._turnIndices
+        copy._visitedSlots = self._visitedSlots
+        copy._turnIndexSlots = self._turnIndexSlots
         copy.currentTurnIndex = self.currentTurnIndex
         copy.storySeed = self.storySeed
         copy.previousRandom = self.previousRandom
         copy.didSafeExit = self.didSafeExit
         return copy
 
-    def RestoreAfterPatch(self):
+    def SnapshotAndStartPatching(self):
+        snapshot = StateSnapshot(self)
+        snapshot.patch = self._patch
+        self._snapshot = snapshot
+        self._patch = StatePatch(self._patch)
+        self.variablesState.patch = self._patch
+        return snapshot
+
+    def RestoreSnapshot(self, snapshot: StateSnapshot):
+        self.callStack.RestoreSharedThreads(snapshot.callStackThreads)
+
+        flow = self._currentFlow
+        stream_was_kept = flow.outputStream is snapshot.outputStream
+        flow.outputStream = StateSnapshot.Rewind(flow.outputStream, snapshot.outputStream, snapshot.outputStreamLength)
+        flow.outputStreamMarks.Update(flow.outputStream, snapshot.outputStreamLength if stream_was_kept else 0)
+        self._outputStreamText.Reset()
+        self._currentText = snapshot.currentText
+        self._currentTags = snapshot.currentTags
+        self._outputStreamTextDirty = False
+        self._outputStreamTagsDirty = False
+
+        self._evaluationStack = StateSnapshot.Rewind(
+            self._evaluationStack, snapshot.evaluationStack, snapshot.evaluationStackHeight
+        )
+        flow.currentChoices = StateSnapshot.Rewind(flow.currentChoices, snapshot.currentChoices, snapshot.currentChoiceCount)
+        self._currentErrors = StateSnapshot.Rewind(self._currentErrors, snapshot.currentErrors, snapshot.currentErrorCount)
+        self._currentWarnings = StateSnapshot.Rewind(
+            self._currentWarnings, snapshot.currentWarnings, snapshot.currentWarningCount
+        )
+
+        self._patch = snapshot.patch
         self.variablesState.callStack = self.callStack
         self.variablesState.patch = self._patch
 
+        self.divertedPointer = snapshot.divertedPointer
+        self.storySeed = snapshot.storySeed
+        self.previousRandom = snapshot.previousRandom
+        self.didSafeExit = snapshot.didSafeExit
+        self._snapshot = None
+
+    def DiscardSnapshot(self):
+        self.callStack.StopSharingThreads()
+        if self._patch is not None and self._patch is not self._snapshot.patch and self._patch.parent is not None:
+            # Saving in the background, so the lookahead's changes join those
+            # made since the save started instead of being applied.
+            self._patch = self._patch.MergeIntoParent()
+            self.variablesState.patch = self._patch
+        self._snapshot = None
+
+    def CopyOutputStreamIfShared(self):
+        if self._snapshot is not None and self._currentFlow.outputStream is self._snapshot.outputStream:
+            self._currentFlow.outputStream = list(self._currentFlow.outputStream)
+
     def ApplyAnyPatch(self):
         if self._patch is None:
             return
         self.variablesState.ApplyPatch()
-        for key, value in self._patch.visitCounts.items():
-            self.ApplyCountChanges(key, value, True)
-        for key, value in self._patch.turnIndices.items():
-            self.ApplyCountChanges(key, value, False)
+        for patch in self._patch.Layers():
+            for key, value in patch.visitCounts.items():
+                self.ApplyCountChanges(key, value, True)
+            for key, value in patch.turnIndices.items():
+                self.ApplyCountChanges(key, value, False)
         self._patch = None
 
-    def ApplyCountChanges(self, container: Container, new_count: int, is_visit: bool):
-        counts = self._visitCounts if is_visit else self._turnIndices
-        counts[container.path.toString()] = new_count
+    def ApplyCountChanges(self, slot: int, new_count: int, is_visit: bool):
+        self.SetCount(slot, new_count, is_visit)
 
     def WriteJson(self, writer: SimpleJson.Writer):
         writer.WriteObjectStart()
@@ -483,8 +518,8 @@ class StoryState:
                 return throw_null_exception("divertedPointer")
             writer.WriteProperty("currentDivertTarget", self.divertedPointer.path.componentsString)
 
-        writer.WriteProperty("visitCounts", lambda w: JsonSerialisation.WriteIntDictionary(w, self._visitCounts))
-        writer.WriteProperty("turnIndices", lambda w: JsonSerialisation.WriteIntDictionary(w, self._turnIndices))
+        writer.WriteProperty("visitCounts", lambda w: self.WriteCounts(w, self._visitCounts, self._visitedSlots))
+        writer.WriteProperty("turnIndices", lambda w: self.WriteCounts(w, self._turnIndices, self._turnIndexSlots))
 
         writer.WriteIntProperty("turnIdx", self.currentTurnIndex)
         writer.WriteIntProperty("storySeed", self.storySeed)
@@ -494,6 +529,24 @@ class StoryState:
         writer.WriteIntProperty("inkFormatVersion", self.story.inkVersionCurrent)
         writer.WriteObjectEnd()
 
+    def WriteCounts(self, writer: SimpleJson.Writer, counts: array, slots: List[int]):
+        paths = self._countSlots.paths
+        writer.WriteObjectStart()
+        for slot in slots:
+            writer.WriteIntProperty(paths[slot], counts[slot])
+        writer.WriteObjectEnd()
+
+    def LoadCounts(self, j_object: Dict, unrecorded: int):
+        count_slots = self._countSlots
+        slots = count_slots.SlotsForPaths(list(j_object))
+        counts = [unrecorded] * len(count_slots.paths)
+        for slot, value in zip(slots, j_object.values()):
+            counts[slot] = int(value)
+        if unrecorded in j_object.values():
+            # A zero visit count is the same as none, and isn't saved again.
+            slots = [slot for slot in slots if counts[slot] != unrecorded]
+        return array("i", counts), slots
+
     def LoadJsonObj(self, value: Dict):
         j_object = value
         j_save_version = j_object.get("inkSaveVersion")
@@ -535,6 +588,7 @@ class StoryState:
             self._currentFlow.name = self.kDefaultFlowName
             self._currentFlow.callStack.SetJsonToken(j_object.get("callstackThreads"), self.story)
             self._currentFlow.outputStream = JsonSerialisation.JArrayToRuntimeObjList(j_object.get("outputStream", []))
+            self._currentFlow.outputStreamMarks.Update(self._currentFlow.outputStream)
             self._currentFlow.currentChoices = JsonSerialisation.JArrayToRuntimeObjList(
                 j_object.get("currentChoices", [])
             )
@@ -554,8 +608,8 @@ class StoryState:
             divert_path = Path(str(current_divert_target_path))
             self.divertedPointer = self.story.PointerAtPath(divert_path)
 
-        self._visitCounts = JsonSerialisation.JObjectToIntDictionary(j_object.get("visitCounts"))
-        self._turnIndices = JsonSerialisation.JObjectToIntDictionary(j_object.get("turnIndices"))
+        self._visitCounts, self._visitedSlots = self.LoadCounts(j_object.get("visitCounts"), 0)
+        self._turnIndices, self._turnIndexSlots = self.LoadCounts(j_object.get("turnIndices"), self.kNoTurnIndex)
         self.currentTurnIndex = int(j_object.get("turnIdx"))
         self.storySeed = int(j_object.get("storySeed"))
         self.previousRandom = int(j_object.get("previousRandom"))
@@ -565,9 +619,11 @@ class StoryState:
         self._currentWarnings = None
 
     def ResetOutput(self, objs: Optional[List] = None):
+        self.CopyOutputStreamIfShared()
         self.outputStream.clear()
         if objs is not None:
             self.outputStream.extend(objs)
+        self.outputStreamMarks.Update(self.outputStream)
         self.OutputStreamDirty()
 
     def PushToOutputStream(self, obj):
@@ -577,13 +633,13 @@ class StoryState:
             if list_text is not None:
                 for text_obj in list_text:
                     self.PushToOutputStreamIndividual(text_obj)
-                self.OutputStreamDirty()
                 return
         self.PushToOutputStreamIndividual(obj)
-        self.OutputStreamDirty()
 
     def PopFromOutputStream(self, count: int):
+        self.CopyOutputStreamIfShared()
         del self.outputStream[-count:]
+        self.outputStreamMarks.Update(self.outputStream, len(self.outputStream))
         self.OutputStreamDirty()
 
     def TrySplittingHeadTailWhitespace(self, single: StringValue):
@@ -625,9 +681,9 @@ class StoryState:
 
         if head_first_newline_idx != -1:
             if head_first_newline_idx > 0:
-                leading_spaces = StringValue(str_val[:head_first_newline_idx])
+                leading_spaces = StringValue.Of(str_val[:head_first_newline_idx])
                 list_texts.append(leading_spaces)
-            list_texts.append(StringValue("\n"))
+            list_texts.append(StringValue.Of("\n"))
             inner_str_start = head_last_newline_idx + 1
 
         if tail_last_newline_idx != -1:
@@ -635,12 +691,12 @@ class StoryState:
 
         if inner_str_end > inner_str_start:
             inner_str_text = str_val[inner_str_start:inner_str_end]
-            list_texts.append(StringValue(inner_str_text))
+            list_texts.append(StringValue.Of(inner_str_text))
 
         if tail_last_newline_idx != -1 and tail_first_newline_idx > head_last_newline_idx:
-            list_texts.append(StringValue("\n"))
+            list_texts.append(StringValue.Of("\n"))
             if tail_last_newline_idx < len(str_val) - 1:
-                trailing_spaces = StringValue(str_val[tail_last_newline_idx + 1 :])
+                trailing_spaces = StringValue.Of(str_val[tail_last_newline_idx + 1 :])
                 list_texts.append(trailing_spaces)
 
         return list_texts
@@ -660,17 +716,13 @@ class StoryState:
                 function_trim_index = curr_el.functionStartInOutputStream
 
             glue_trim_index = -1
-            for i in range(len(self.outputStream) - 1, -1, -1):
-                o = self.outputStream[i]
-                c = o if isinstance(o, ControlCommand) else None
-                g = o if isinstance(o, Glue) else None
-                if g is not None:
+            glue_or_begin_strings = self.outputStreamMarks.glueOrBeginStrings
+            if glue_or_begin_strings:
+                i = glue_or_begin_strings[-1]
+                if isinstance(self.outputStream[i], Glue):
                     glue_trim_index = i
-                    break
-                if c is not None and c.commandType == ControlCommand.CommandType.BeginString:
-                    if i >= function_trim_index:
-                        function_trim_index = -1
-                    break
+                elif i >= function_trim_index:
+                    function_trim_index = -1
 
             trim_index = -1
             if glue_trim_index != -1 and function_trim_index != -1:
@@ -687,11 +739,10 @@ class StoryState:
                     if glue_trim_index > -1:
                         self.RemoveExistingGlue()
                     if function_trim_index > -1:
-                        call_stack_elements = self.callStack.elements
-                        for i in range(len(call_stack_elements) - 1, -1, -1):
-                            el = call_stack_elements[i]
-                            if el.type == PushPopType.Function:
-                                el.functionStartInOutputStream = -1
+                        thread = self.callStack.currentThread
+                        for i in range(len(thread.callstack) - 1, -1, -1):
+                            if thread.callstack[i].type == PushPopType.Function:
+                                thread.ElementToModify(i).functionStartInOutputStream = -1
                             else:
                                 break
             elif text.isNewline:
@@ -701,8 +752,12 @@ class StoryState:
         if include_in_output:
             if obj is None:
                 return throw_null_exception("obj")
+            self.outputStreamMarks.Add(obj, len(self.outputStream))
             self.outputStream.append(obj)
-            self.OutputStreamDirty()
+            if self._outputStreamText.isValid:
+                self._outputStreamText.Add(obj)
+            self._outputStreamTextDirty = True
+            self._outputStreamTagsDirty = True
 
     def TrimNewlinesFromOutputStream(self):
         remove_whitespace_from = -1
@@ -718,6 +773,7 @@ class StoryState:
             i -= 1
 
         if remove_whitespace_from >= 0:
+            self.CopyOutputStreamIfShared()
             i = remove_whitespace_from
             while i < len(self.outputStream):
                 text = as_or_null(self.outputStream[i], StringValue)
@@ -725,42 +781,37 @@ class StoryState:
                     self.outputStream.pop(i)
                 else:
                     i += 1
+            self.outputStreamMarks.Update(self.outputStream, remove_whitespace_from)
         self.OutputStreamDirty()
 
     def RemoveExistingGlue(self):
+        first_removed = len(self.outputStream)
         for i in range(len(self.outputStream) - 1, -1, -1):
             c = self.outputStream[i]
             if isinstance(c, Glue):
+                self.CopyOutputStreamIfShared()
                 self.outputStream.pop(i)
+                first_removed = i
             elif isinstance(c, ControlCommand):
                 break
+        self.outputStreamMarks.Update(self.outputStream, first_removed)
         self.OutputStreamDirty()
 
     @property
     def outputStreamEndsInNewline(self):
-        if len(self.outputStream) > 0:
-            for i in range(len(self.outputStream) - 1, -1, -1):
-                obj = self.outputStream[i]
-                if isinstance(obj, ControlCommand):
-                    break
-                if isinstance(obj, StringValue):
-                    if obj.isNewline:
-                        return True
-                    if obj.isNonWhitespace:
-                        break
-        return False
+        line_ends = self._currentFlow.outputStreamMarks.lineEnds
+        if not line_ends:
+            return False
+        obj = self._currentFlow.outputStream[line_ends[-1]]
+        return isinstance(obj, StringValue) and obj.isNewline
 
     @property
     def outputStreamContainsContent(self):
-        return any(isinstance(content, StringValue) for content in self.outputStream)
+        return len(self._currentFlow.outputStreamMarks.texts) > 0
 
     @property
     def inStringEvaluation(self):
-        for i in range(len(self.outputStream) - 1, -1, -1):
-            cmd = as_or_null(self.outputStream[i], ControlCommand)
-            if cmd is not None and cmd.commandType == ControlCommand.CommandType.BeginString:
-                return True
-        return False
+        return len(self._currentFlow.outputStreamMarks.beginStrings) > 0
 
     def PushEvaluationStack(self, obj):
         list_value = as_or_null(obj, ListValue)
@@ -786,6 +837,13 @@ class StoryState:
         self.evaluationStack.append(obj)
 
     def PopEvaluationStack(self, number_of_objects: Optional[int] = None):
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and self._evaluationStack is snapshot.evaluationStack
+            and len(self._evaluationStack) - (number_of_objects or 1) < snapshot.evaluationStackHeight
+        ):
+            self._evaluationStack = list(self._evaluationStack)
         if number_of_objects is None:
             obj = self.evaluationStack.pop() if self.evaluationStack else None
             return null_if_undefined(obj)
@@ -800,7 +858,7 @@ class StoryState:
 
     def ForceEnd(self):
         self.callStack.Reset()
-        self._currentFlow.currentChoices.clear()
+        self._currentFlow.currentChoices = []
         self.currentPointer = Pointer.Null()
         self.previousPointer = Pointer.Null()
         self.didSafeExit = True
@@ -811,6 +869,7 @@ class StoryState:
         function_start_point = self.callStack.currentElement.functionStartInOutputStream
         if function_start_point == -1:
             function_start_point = 0
+        first_removed = len(self.outputStream)
         for i in range(len(self.outputStream) - 1, function_start_point - 1, -1):
             obj = self.outputStream[i]
             txt = as_or_null(obj, StringValue)
@@ -820,10 +879,13 @@ class StoryState:
             if cmd:
                 break
             if txt.isNewline or txt.isInlineWhitespace:
+                self.CopyOutputStreamIfShared()
                 self.outputStream.pop(i)
+                first_removed = i
                 self.OutputStreamDirty()
             else:
                 break
+        self.outputStreamMarks.Update(self.outputStream, first_removed)
 
     def PopCallStack(self, pop_type: Optional[PushPopType] = None):
         if self.callStack.currentElement.type == PushPopType.Function:
@@ -831,10 +893,10 @@ class StoryState:
         self.callStack.Pop(pop_type)
 
     def SetChosenPath(self, path: Path, incrementing_turn_index: bool):
-        self._currentFlow.currentChoices.clear()
+        self._currentFlow.currentChoices = []
         new_pointer = self.story.PointerAtPath(path)
         if not new_pointer.isNull and new_pointer.index == -1:
-            new_pointer.index = 0
+            new_pointer = Pointer(new_pointer.container, 0)
         self.currentPointer = new_pointer
         if incrementing_turn_index:
             self.currentTurnIndex += 1
@@ -896,6 +958,7 @@ class StoryState:
             self._currentWarnings.append(message)
 
     def OutputStreamDirty(self):
+        self._outputStreamText.Reset()
         self._outputStreamTextDirty = True
         self._outputStreamTagsDirty = True
 
@@ -1,19 +1,23 @@
 class StringBuilder:
+    # Appended pieces are joined once, when the string is asked for, rather
+    # than copying everything so far on every Append.
     def __init__(self, str_value: str | None = None):
-        self._string = str(str_value) if str_value is not None else ""
+        self._parts = [str(str_value)] if str_value is not None else []
+        self._length = len(self._parts[0]) if self._parts else 0
 
     @property
     def Length(self) -> int:
-        return len(self._string)
+        return self._length
 
     def Append(self, str_value: str | None):
         if str_value is not None:
-            self._string += str_value
+            self._parts.append(str_value)
+            self._length += len(str_value)
 
     def AppendLine(self, str_value: str | None = None):
         if str_value is not None:
             self.Append(str_value)
-        self._string += "\n"
+        self.Append("\n")
 
     def AppendFormat(self, format_str: str, *args):
         def repl(match):
@@ -22,10 +26,13 @@ class StringBuilder:
 
         import re
 
-        self._string += re.sub(r"{(\d+)}", repl, format_str)
+        self.Append(re.sub(r"{(\d+)}", repl, format_str))
 
     def __str__(self):
-        return self._string
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
 
     def Clear(self):
-        self._string = ""
+        self._parts = []
+        self._length = 0
@@ -2,6 +2,8 @@ from .object import InkObject
 
 
 class Tag(InkObject):
+    __slots__ = ("text",)
+
     def __init__(self, tag_text: str):
         super().__init__()
         self.text = str(tag_text) if tag_text is not None else ""
@@ -22,6 +22,8 @@ class ValueType:
 
 
 class AbstractValue(InkObject):
+    __slots__ = ()
+
     @property
     def valueType(self):
         raise NotImplementedError()
@@ -41,16 +43,16 @@ class AbstractValue(InkObject):
     def Create(val: Any, preferred_number_type: int | None = None):
         if preferred_number_type is not None:
             if preferred_number_type == ValueType.Int and isinstance(val, (int, float)) and float(val).is_integer():
-                return IntValue(int(val))
+                return IntValue.Of(int(val))
             if preferred_number_type == ValueType.Float and isinstance(val, (int, float)):
                 return FloatValue(float(val))
 
         if isinstance(val, bool):
-            return BoolValue(bool(val))
+            return BoolValue.Of(val)
         if isinstance(val, str):
-            return StringValue(str(val))
+            return StringValue.Of(str(val))
         if isinstance(val, (int, float)) and float(val).is_integer():
-            return IntValue(int(val))
+            return IntValue.Of(int(val))
         if isinstance(val, (int, float)):
             return FloatValue(float(val))
         if isinstance(val, Path):
@@ -69,6 +71,10 @@ class AbstractValue(InkObject):
 
 
 class Value(AbstractValue):
+    # Values made while the story runs may be shared (see IntValue.Of and co.),
+    # so a value is never changed once made; a new one is made instead.
+    __slots__ = ("value",)
+
     def __init__(self, val):
         super().__init__()
         self.value = val
@@ -77,6 +83,10 @@ class Value(AbstractValue):
     def valueObject(self):
         return self.value
 
+    @property
+    def internKey(self):
+        return (self.__class__, self.value)
+
     def __str__(self):
         if self.value is None:
             return throw_null_exception("Value.value")
@@ -87,9 +97,15 @@ class Value(AbstractValue):
 
 
 class BoolValue(Value):
+    __slots__ = ()
+
     def __init__(self, val: bool):
         super().__init__(val or False)
 
+    @staticmethod
+    def Of(val: bool) -> BoolValue:
+        return BoolValue._true if val else BoolValue._false
+
     @property
     def isTruthy(self):
         return bool(self.value)
@@ -104,11 +120,11 @@ class BoolValue(Value):
         if new_type == self.valueType:
             return self
         if new_type == ValueType.Int:
-            return IntValue(1 if self.value else 0)
+            return IntValue.Of(1 if self.value else 0)
         if new_type == ValueType.Float:
             return FloatValue(1.0 if self.value else 0.0)
         if new_type == ValueType.String:
-            return StringValue("true" if self.value else "false")
+            return StringValue.Of("true" if self.value else "false")
         raise self.BadCastException(new_type)
 
     def __str__(self):
@@ -116,9 +132,22 @@ class BoolValue(Value):
 
 
 class IntValue(Value):
+    __slots__ = ()
+
+    # The ints that have one shared value each, which counts, indices and most
+    # arithmetic in a story stay within.
+    kMinShared = -16
+    kMaxShared = 1024
+
     def __init__(self, val: int):
         super().__init__(val or 0)
 
+    @staticmethod
+    def Of(val: int) -> IntValue:
+        if IntValue.kMinShared <= val <= IntValue.kMaxShared:
+            return IntValue._shared[val - IntValue.kMinShared]
+        return IntValue(val)
+
     @property
     def isTruthy(self):
         return self.value != 0
@@ -133,15 +162,17 @@ class IntValue(Value):
         if new_type == self.valueType:
             return self
         if new_type == ValueType.Bool:
-            return BoolValue(False if self.value == 0 else True)
+            return BoolValue.Of(self.value != 0)
         if new_type == ValueType.Float:
             return FloatValue(self.value)
         if new_type == ValueType.String:
-            return StringValue(str(self.value))
+            return StringValue.Of(str(self.value))
         raise self.BadCastException(new_type)
 
 
 class FloatValue(Value):
+    __slots__ = ()
+
     def __init__(self, val: float):
         super().__init__(val or 0.0)
 
@@ -159,9 +190,9 @@ class FloatValue(Value):
         if new_type == self.valueType:
             return self
         if new_type == ValueType.Bool:
-            return BoolValue(False if self.value == 0.0 else True)
+            return BoolValue.Of(self.value != 0.0)
         if new_type == ValueType.Int:
-            return IntValue(int(self.value))
+            return IntValue.Of(int(self.value))
         if new_type == ValueType.String:
             return StringValue(str(self.value))
         raise self.BadCastException(new_type)
@@ -175,6 +206,8 @@ class FloatValue(Value):
 
 
 class StringValue(Value):
+    __slots__ = ("_isNewline", "_isInlineWhitespace")
+
     def __init__(self, val: str):
         super().__init__(val or "")
         self._isNewline = self.value == "\n"
@@ -187,6 +220,11 @@ class StringValue(Value):
                     self._isInlineWhitespace = False
                     break
 
+    @staticmethod
+    def Of(val: str) -> StringValue:
+        shared = StringValue._shared.get(val)
+        return shared if shared is not None else StringValue(val)
+
     @property
     def valueType(self):
         return ValueType.String
@@ -215,7 +253,7 @@ class StringValue(Value):
         if new_type == ValueType.Int:
             parsed_int = try_parse_int(self.value)
             if parsed_int.exists:
-                return IntValue(parsed_int.result)
+                return IntValue.Of(parsed_int.result)
             raise self.BadCastException(new_type)
         if new_type == ValueType.Float:
             parsed_float = try_parse_float(self.value)
@@ -225,7 +263,15 @@ class StringValue(Value):
         raise self.BadCastException(new_type)
 
 
+BoolValue._false = BoolValue(False)
+BoolValue._true = BoolValue(True)
+IntValue._shared = tuple(IntValue(i) for i in range(IntValue.kMinShared, IntValue.kMaxShared + 1))
+StringValue._shared = {text: StringValue(text) for text in ("", "\n", " ", "true", "false")}
+
+
 class DivertTargetValue(Value):
+    __slots__ = ()
+
     def __init__(self, target_path: Path | None = None):
         super().__init__(target_path)
 
@@ -233,6 +279,10 @@ class DivertTargetValue(Value):
     def valueType(self):
         return ValueType.DivertTarget
 
+    @property
+    def internKey(self):
+        return None
+
     @property
     def targetPath(self):
         if self.value is None:
@@ -257,6 +307,8 @@ class DivertTargetValue(Value):
 
 
 class VariablePointerValue(Value):
+    __slots__ = ("_contextIndex",)
+
     def __init__(self, variable_name: str, context_index: int = -1):
         super().__init__(variable_name)
         self._contextIndex = context_index
@@ -265,6 +317,10 @@ class VariablePointerValue(Value):
     def contextIndex(self):
         return self._contextIndex
 
+    @property
+    def internKey(self):
+        return None
+
     @contextIndex.setter
     def contextIndex(self, value: int):
         self._contextIndex = value
@@ -300,6 +356,8 @@ class VariablePointerValue(Value):
 
 
 class ListValue(Value):
+    __slots__ = ()
+
     @property
     def isTruthy(self):
         if self.value is None:
@@ -310,14 +368,18 @@ class ListValue(Value):
     def valueType(self):
         return ValueType.List
 
+    @property
+    def internKey(self):
+        return None
+
     def Cast(self, new_type: int):
         if self.value is None:
             return throw_null_exception("Value.value")
         if new_type == ValueType.Int:
             max_item = self.value.maxItem
             if max_item.Key.isNull:
-                return IntValue(0)
-            return IntValue(max_item.Value)
+                return IntValue.Of(0)
+            return IntValue.Of(max_item.Value)
         if new_type == ValueType.Float:
             max_item = self.value.maxItem
             if max_item.Key.isNull:
@@ -326,7 +388,7 @@ class ListValue(Value):
         if new_type == ValueType.String:
             max_item = self.value.maxItem
             if max_item.Key.isNull:
-                return StringValue("")
+                return StringValue.Of("")
             return StringValue(str(max_item.Key))
         if new_type == self.valueType:
             return self
@@ -2,6 +2,8 @@ from .object import InkObject
 
 
 class VariableAssignment(InkObject):
+    __slots__ = ("variableName", "isNewDeclaration", "isGlobal")
+
     def __init__(self, variable_name: str | None, is_new_declaration: bool):
         super().__init__()
         self.variableName = variable_name or None
@@ -7,16 +7,44 @@ from .path import Path
 
 
 class VariableReference(InkObject):
+    __slots__ = ("name", "_pathForCount", "_containerForCount")
+
     def __init__(self, name: Optional[str] = None):
         super().__init__()
         self.name = name
-        self.pathForCount: Optional[Path] = None
+        self._pathForCount: Optional[Path] = None
+        self._containerForCount = None
+
+    @property
+    def pathForCount(self):
+        return self._pathForCount
+
+    @pathForCount.setter
+    def pathForCount(self, value: Optional[Path]):
+        self._pathForCount = value
+        self._containerForCount = None
 
     @property
     def containerForCount(self):
-        if self.pathForCount is None:
+        if self._pathForCount is None:
             return None
-        return self.ResolvePath(self.pathForCount).container
+        if self._containerForCount is None:
+            self._containerForCount = self.ResolvePath(self._pathForCount).container
+        return self._containerForCount
+
+    def Link(self, dangling_targets: list):
+        if self._pathForCount is None:
+            return
+        result = self.ResolvePath(self._pathForCount)
+        if result.container is None or result.approximate:
+            dangling_targets.append(
+                "Read count at '"
+                + self.path.componentsString
+                + "' has missing target '"
+                + str(self._pathForCount)
+                + "'"
+            )
+        self._containerForCount = result.container
 
     @property
     def pathStringForCount(self):
@@ -104,8 +104,8 @@ class VariablesState:
     def ApplyPatch(self):
         if self.patch is None:
             return throw_null_exception("this.patch")
-        for named_var_key, named_var_value in self.patch.globals.items():
-            self._globalVariables[named_var_key] = named_var_value
+        for patch in self.patch.Layers():
+            self._globalVariables.update(patch.globals)
         if self._changedVariablesForBatchObs is not None:
             for name in self.patch.changedVariables:
                 self._changedVariablesForBatchObs.add(name)
@@ -2,5 +2,11 @@ from .object import InkObject
 
 
 class Void(InkObject):
+    __slots__ = ()
+
+    @property
+    def internKey(self):
+        return (Void,)
+
     def __str__(self):
         return "Void"
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import sys
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 
+import pytest
+
 from inkpython import Story
 from inkpython.engine.error import ErrorType
 
 ROOT = Path(__file__).resolve().parent
 INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+STORY_PATHS = sorted(INKFILES_DIR.rglob("*.ink.json"))
+
+# Runs a test once for each compiled story in the corpus, given as "path".
+over_corpus = pytest.mark.parametrize("path", STORY_PATHS, ids=[p.relative_to(INKFILES_DIR).as_posix() for p in STORY_PATHS])
 
 
 def load_json_file(filename: str, category: str | None):
@@ -46,3 +54,57 @@ def from_json_test_context(name: str, category: str | None, testing_errors: bool
         context.story.onError = context.on_error
     context.bytecode = context.story.ToJson()
     return context
+
+
+def play_first_choices(story, max_steps=2000):
+    output = []
+    steps = 0
+    while steps < max_steps:
+        while story.canContinue and steps < max_steps:
+            output.append(story.Continue())
+            output.append(list(story.currentTags))
+            steps += 1
+        if not story.currentChoices:
+            break
+        output.append([c.text for c in story.currentChoices])
+        story.ChooseChoiceIndex(0)
+    return output
+
+
+def play_checked(story, max_steps=200):
+    # Plays a story whose checks are assertions made as it goes. Stories that
+    # stop with an error still had everything up to there checked, so only
+    # the assertions are let through.
+    story.allowExternalFunctionFallbacks = True
+    story.onError = lambda message, error_type: None
+    story.state.storySeed = 7
+    try:
+        play_first_choices(story, max_steps)
+    except AssertionError:
+        raise
+    except Exception:
+        pass
+
+
+def play_in_threads(sessions):
+    # Plays each session in a thread of its own, all starting together and
+    # switching often, so that they meet in whatever they share. A session
+    # that raised, or is still playing after a minute, has None for its output.
+    start = threading.Barrier(len(sessions))
+    outputs = [None] * len(sessions)
+
+    def play(i):
+        start.wait()
+        outputs[i] = play_first_choices(sessions[i])
+
+    threads = [threading.Thread(target=play, args=(i,), daemon=True) for i in range(len(sessions))]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    return outputs
@@ -157,20 +157,27 @@ def test_writer_floats_convert_infinity_nan():
 
 def test_reader_parses_object():
     json_string = '{"key":"value", "array": [1, 2, null, 3.0, false]}'
-    obj = {"array": [1, 2, None, "3.0f", False], "key": "value"}
+    obj = {"array": [1, 2, None, 3.0, False], "key": "value"}
     reader = SimpleJson.Reader(json_string)
     assert reader.ToDictionary() == obj
+    assert isinstance(reader.ToDictionary()["array"][3], float)
     assert SimpleJson.TextToDictionary(json_string) == obj
 
 
 def test_reader_parses_array():
     json_string = "[1, 2, null, 3.0, false]"
-    obj = [1, 2, None, "3.0f", False]
+    obj = [1, 2, None, 3.0, False]
     reader = SimpleJson.Reader(json_string)
     assert reader.ToArray() == obj
+    assert isinstance(reader.ToArray()[3], float)
     assert SimpleJson.TextToArray(json_string) == obj
 
 
+def test_reader_leaves_float_lookalikes_inside_strings_alone():
+    json_string = '["^Costs 5.0 gold", 5.0]'
+    assert SimpleJson.TextToArray(json_string) == ["^Costs 5.0 gold", 5.0]
+
+
 def test_reader_throws_on_malformed():
     json_string = '{key: "value"]'
     with pytest.raises(Exception):
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from inkpython import Story
+from inkpython.engine.call_stack import CallStack
+from inkpython.engine.container import Container
+from inkpython.engine.pointer import Pointer
+from inkpython.engine.push_pop import PushPopType
+from inkpython.engine.simple_json import SimpleJson
+from inkpython.engine.value import IntValue
+from tests.common import STORY_PATHS, over_corpus, play_checked
+
+
+def thread_json(thread):
+    writer = SimpleJson.Writer()
+    thread.WriteJson(writer)
+    return writer.toString()
+
+
+def deep_call_stack(depth):
+    story = Story(next(p for p in STORY_PATHS if p.name == "hello_world.ink.json").read_text(encoding="utf-8-sig"))
+    call_stack = CallStack(story_context=story)
+    for i in range(depth):
+        call_stack.SetTemporaryVariable("depth", IntValue(i), True)
+        call_stack.Push(PushPopType.Tunnel)
+    return call_stack
+
+
+def test_fork_shares_elements():
+    call_stack = deep_call_stack(5)
+    forked = call_stack.ForkThread()
+    assert all(a is b for a, b in zip(forked.callstack, call_stack.currentThread.callstack))
+
+
+def test_changes_after_fork_stay_in_their_thread():
+    call_stack = deep_call_stack(5)
+    forked = call_stack.ForkThread()
+    before = thread_json(forked)
+
+    call_stack.currentElement.currentPointer = Pointer.Null()
+    call_stack.SetTemporaryVariable("depth", IntValue(10), False, 3)
+    call_stack.Pop()
+    call_stack.Pop()
+    call_stack.SetTemporaryVariable("changed", IntValue(1), True)
+    call_stack.Push(PushPopType.Function)
+
+    assert thread_json(forked) == before
+    assert call_stack.GetTemporaryVariableWithName("depth", 3).value == 10
+    assert forked.callstack[2].temporaryVariables["depth"].value == 2
+    assert "changed" not in forked.callstack[2].temporaryVariables
+
+
+def test_only_changed_elements_are_copied():
+    call_stack = deep_call_stack(5)
+    call_stack.ForkThread()
+    original = list(call_stack.currentThread.callstack)
+    call_stack.Pop()
+    call_stack.currentElement.currentPointer = Pointer.Null()
+    call_stack.currentElement.currentPointer = Pointer.Null()
+    elements = call_stack.currentThread.callstack
+    assert [a is b for a, b in zip(elements, original)] == [True, True, True, True, False]
+
+
+def test_lazy_forks_share_frames_until_they_change():
+    call_stack = deep_call_stack(3)
+    call_stack.currentElement.currentPointer = Pointer(Container(), 0)
+    first = call_stack.LazyForkThread()
+    call_stack.currentElement.currentPointer = Pointer.Null()
+    call_stack.SetTemporaryVariable("top", IntValue(1), True)
+    second = call_stack.LazyForkThread()
+    assert second.frames is first.frames
+    assert (first.threadIndex, second.threadIndex) == (1, 2)
+
+    call_stack.SetTemporaryVariable("changed", IntValue(1), True, 1)
+    third = call_stack.LazyForkThread()
+    assert third.frames is not first.frames
+
+    thread = first.Materialise()
+    assert thread.threadIndex == 1
+    assert not thread.callstack[-1].currentPointer.isNull
+    assert "top" not in thread.callstack[-1].temporaryVariables
+    assert "changed" not in thread.callstack[0].temporaryVariables
+    assert second.Materialise().callstack[-1].currentPointer.isNull
+
+
+class CheckingStory(Story):
+    # Keeps the JSON of the thread each choice would have forked when it was
+    # generated, and checks the choice's thread, made only when it's first
+    # asked for, is still the same when the choice is taken.
+    checked = 0
+
+    def ProcessChoice(self, choice_point):
+        choice = super().ProcessChoice(choice_point)
+        if choice is not None:
+            # Written straight from the current thread, as copying it would
+            # change how its elements are shared.
+            call_stack = self.state.callStack
+            thread = call_stack._threads[-1]
+            thread_index = thread.threadIndex
+            thread.threadIndex = call_stack._threadCounter
+            self._generated.append((choice, thread_json(thread), choice_point.path.toString()))
+            thread.threadIndex = thread_index
+        return choice
+
+    def ChooseChoiceIndex(self, choice_idx: int):
+        for choice, generated_json, source_path in self._generated:
+            assert thread_json(choice.threadAtGeneration) == generated_json
+            assert choice.sourcePath == source_path
+        CheckingStory.checked += len(self._generated)
+        self._generated = []
+        super().ChooseChoiceIndex(choice_idx)
+
+
+@over_corpus
+def test_choice_threads_keep_their_state(path):
+    story = CheckingStory(path.read_text(encoding="utf-8-sig"))
+    story._generated = []
+    play_checked(story)
+
+
+def test_corpus_checks_choice_threads():
+    CheckingStory.checked = 0
+    for path in STORY_PATHS[:40]:
+        test_choice_threads_keep_their_state(path)
+    assert CheckingStory.checked > 0
+
+
+def test_choice_threads_are_made_when_needed():
+    story = Story(next(p for p in STORY_PATHS if p.name == "sticky_choices_stay_sticky.ink.json").read_text(encoding="utf-8-sig"))
+    story.ContinueMaximally()
+    choices = story.currentChoices
+    assert len(choices) == 2
+    assert all(c._lazyThread is not None and c._sourcePath is None for c in choices)
+    assert choices[0]._lazyThread.frames is choices[1]._lazyThread.frames
+
+    saved = story.state.ToJson()
+    story.ChooseChoiceIndex(1)
+    assert choices[1]._lazyThread is None
+    story.ContinueMaximally()
+
+    loaded = Story(next(p for p in STORY_PATHS if p.name == "sticky_choices_stay_sticky.ink.json").read_text(encoding="utf-8-sig"))
+    loaded.state.LoadJson(saved)
+    loaded.ChooseChoiceIndex(1)
+    loaded.ContinueMaximally()
+    assert loaded.state.ToJson() == story.state.ToJson()
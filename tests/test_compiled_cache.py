@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.cli import precompile_story
+from inkpython.engine.compiled_story import CompiledStory
+from tests.common import play_first_choices
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+STORY_PATHS = sorted(INKFILES_DIR.rglob("*.ink.json"))
+
+
+def play(story):
+    messages = []
+    story.allowExternalFunctionFallbacks = True
+    story.onError = lambda message, error_type: messages.append((message, error_type))
+    story.state.storySeed = 7
+    try:
+        output = play_first_choices(story, max_steps=200)
+    except Exception as e:
+        output = [type(e).__name__, str(e)]
+    return output, messages, story.state.ToJson()
+
+
+@pytest.mark.parametrize(
+    "rel_path",
+    [
+        "inkjs/tests.ink.json",
+        "choices/conditional_choices.ink.json",
+        "diverts/tunnel_vs_thread_behaviour.ink.json",
+        "lists/list_basic_operations.ink.json",
+        "sequences/all_sequence_types.ink.json",
+    ],
+)
+def test_compiled_story_plays_like_json(tmp_path, rel_path):
+    text = (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+    cache_path = tmp_path / "story.inkc"
+    Story(text).save_compiled(cache_path)
+
+    from_json = Story(text)
+    from_cache = Story.from_compiled(cache_path)
+    from_json.allowExternalFunctionFallbacks = True
+    from_cache.allowExternalFunctionFallbacks = True
+    from_json.state.storySeed = from_cache.state.storySeed = 7
+
+    assert play_first_choices(from_cache) == play_first_choices(from_json)
+    assert from_cache.state.ToJson() == from_json.state.ToJson()
+    assert from_cache.ToJson() == from_json.ToJson()
+
+
+def test_compiled_story_rebuilds_when_source_changes(tmp_path):
+    source_path = tmp_path / "story.ink.json"
+    source_path.write_text((INKFILES_DIR / "misc" / "hello_world.ink.json").read_text(encoding="utf-8-sig"))
+    cache_path = precompile_story(source_path)
+    assert cache_path == tmp_path / "story.inkc"
+    assert Story.from_compiled(cache_path, source_path).Continue() == "Hello world\n"
+
+    source_path.write_text((INKFILES_DIR / "misc" / "end.ink.json").read_text(encoding="utf-8-sig"))
+    with pytest.raises(ValueError):
+        CompiledStory.Read(cache_path, CompiledStory.SourceHash(source_path.read_text()))
+
+    story = Story.from_compiled(cache_path, source_path)
+    assert story.Continue() == "hello\n"
+    CompiledStory.Read(cache_path, CompiledStory.SourceHash(source_path.read_text()))
+
+
+def test_compiled_story_rejects_corrupt_file(tmp_path):
+    text = (INKFILES_DIR / "misc" / "hello_world.ink.json").read_text(encoding="utf-8-sig")
+    cache_path = tmp_path / "story.inkc"
+    Story(text).save_compiled(cache_path)
+
+    data = bytearray(cache_path.read_bytes())
+    data[-1] ^= 0xFF
+    cache_path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Story.from_compiled(cache_path)
+
+    cache_path.write_bytes(b"not a cache")
+    with pytest.raises(ValueError):
+        Story.from_compiled(cache_path)
+
+
+def test_compiled_story_is_replaced_not_rewritten(tmp_path):
+    text = (INKFILES_DIR / "misc" / "hello_world.ink.json").read_text(encoding="utf-8-sig")
+    cache_path = tmp_path / "story.inkc"
+    Story(text).save_compiled(cache_path)
+    old_data = cache_path.read_bytes()
+
+    # A reader that opened the old cache keeps reading all of it.
+    with open(cache_path, "rb") as reader:
+        Story((INKFILES_DIR / "misc" / "end.ink.json").read_text(encoding="utf-8-sig")).save_compiled(cache_path)
+        assert reader.read() == old_data
+    assert Story.from_compiled(cache_path).Continue() == "hello\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["story.inkc"]
+
+
+@pytest.mark.parametrize("path", STORY_PATHS, ids=[p.relative_to(INKFILES_DIR).as_posix() for p in STORY_PATHS])
+def test_compiled_lazy_story_plays_like_json(tmp_path, path):
+    text = path.read_text(encoding="utf-8-sig")
+    try:
+        from_json = Story(text)
+    except Exception:
+        pytest.skip("story doesn't load")
+    cache_path = tmp_path / "story.inkc"
+    lazy = Story(text, lazy_knots=True)
+    lazy.save_compiled(cache_path)
+    from_cache = Story.from_compiled(cache_path)
+
+    assert from_cache.danglingTargets == from_json.danglingTargets
+    assert play(from_cache) == play(from_json)
+    assert play(lazy) == play(Story(text))
+
+
+@pytest.mark.parametrize("path", STORY_PATHS, ids=[p.relative_to(INKFILES_DIR).as_posix() for p in STORY_PATHS])
+def test_compiled_interned_story_plays_like_json(tmp_path, path):
+    text = path.read_text(encoding="utf-8-sig")
+    try:
+        from_json = Story(text)
+    except Exception:
+        pytest.skip("story doesn't load")
+    cache_path = tmp_path / "story.inkc"
+    Story(text, intern_leaves=True).save_compiled(cache_path)
+    from_cache = Story.from_compiled(cache_path)
+
+    assert from_cache.danglingTargets == from_json.danglingTargets
+    assert play(from_cache) == play(from_json)
+
+
+def test_interned_story_links_again_like_plain_story():
+    # Linking again, as for a tree built by hand, finds the containers of
+    # interned leaves without their parents.
+    text = (INKFILES_DIR / "conditions" / "conditionals.ink.json").read_text(encoding="utf-8-sig")
+    interned = Story(text, intern_leaves=True)
+    dangling_targets = []
+    interned.mainContentContainer.Link(dangling_targets)
+    assert dangling_targets == []
+    assert play(interned) == play(Story(text))
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+import sys
 from pathlib import Path
 
 import pytest
@@ -9,6 +11,7 @@ from inkpython.engine.container import Container
 from inkpython.engine.divert import Divert
 from inkpython.engine.error import ErrorType
 from inkpython.engine.object import InkObject
+from inkpython.engine.path import Path as InkPath
 
 
 ROOT = Path(__file__).resolve().parent
@@ -66,3 +69,98 @@ def test_compiled_story_runs_without_errors(rel_path):
         break
 
     assert not errors, f"{rel_path} errors: {errors}"
+
+
+@pytest.mark.parametrize("rel_path", list(iter_compiled_inkfiles()))
+def test_story_from_text_matches_story_from_parsed_json(rel_path):
+    text = (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+    json_obj = json.loads(text)
+
+    from_json = Story(json_obj)
+    assert Story(text).ToJson() == from_json.ToJson()
+    assert json_obj == json.loads(text)
+
+
+def test_story_from_text_keeps_knots_named_like_json_keys():
+    text = (
+        '{"inkVersion":21,"root":[[{"->":"list"},["done",{"#n":"g-0"}],null],"done",'
+        '{"list":["^in list","\\n","end",null],"originalChoicePath":["end",null]}],'
+        '"listDefs":{"list":{"a":1}}}'
+    )
+
+    story = Story(text)
+    assert story.ContinueMaximally() == "in list\n"
+    assert story.ToJson() == Story(json.loads(text)).ToJson()
+
+
+def test_story_links_static_targets_and_reports_dangling_ones():
+    text = (
+        '{"inkVersion":21,"root":[["^hi","\\n",{"->":"knot"},["done",{"#n":"g-0"}],null],"done",'
+        '{"knot":["ev",{"CNT?":"nowhere"},"pop","/ev",{"*":".^.c-9","flg":16},{"->":"missing"},null]}],'
+        '"listDefs":{}}'
+    )
+
+    story = Story(text)
+    assert story.danglingTargets == [
+        "Read count at 'knot.1' has missing target 'nowhere'",
+        "Choice at 'knot.4' has missing target '.^.c-9'",
+        "Divert at 'knot.5' has missing target 'missing'",
+    ]
+    assert not Story(
+        (INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig")
+    ).danglingTargets
+
+
+def test_container_path_strings_are_precomputed_and_interned():
+    story = Story((INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig"))
+
+    def check(container):
+        assert container._pathString is not None
+        assert container.pathString is sys.intern(container.path.componentsString)
+        for i, content in enumerate(container.content):
+            assert content.indexInParent == i
+            if isinstance(content, Container):
+                check(content)
+        for named in container.namedContent.values():
+            check(named)
+
+    check(story.mainContentContainer)
+
+
+def test_story_path_index_matches_content_walker():
+    text = (INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig")
+    story = Story(text)
+    root = story.mainContentContainer
+    assert len(story.pathIndex) > 100
+    for path_string, container in story.pathIndex.items():
+        path = InkPath(path_string)
+        assert root.ContentAtPath(path).obj is container
+        assert story.ContentAtPath(path).obj is container
+        pointer = story.PointerAtPath(InkPath(path_string + ".0" if path_string else "0"))
+        assert pointer.container is container and pointer.index == 0
+
+    lazy = Story(text, lazy_knots=True)
+    assert "content.simple" not in lazy.pathIndex
+    assert lazy.ContentAtPath(InkPath("content.simple")).obj.path.componentsString == "content.simple"
+    assert "content.simple" in lazy.pathIndex
+    assert lazy.ContentAtPath(InkPath("content.nowhere")).approximate
+
+
+def test_runtime_objects_have_no_instance_dict():
+    story = Story((INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig"))
+    story.allowExternalFunctionFallbacks = True
+    story.ContinueMaximally()
+
+    def check(obj):
+        assert not hasattr(obj, "__dict__"), type(obj).__name__
+        if isinstance(obj, Container):
+            for content in obj.content:
+                check(content)
+            for named in obj.namedContent.values():
+                check(named)
+
+    check(story.mainContentContainer)
+    check(story.state.currentPointer)
+    check(story.state.callStack.currentElement)
+    for choice in story.currentChoices:
+        check(choice)
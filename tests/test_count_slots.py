@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.container import Container
+from tests.common import play_first_choices
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+# Says how often the knot has been visited, and then how many turns since.
+KNOT_STORY = json.dumps(
+    {
+        "inkVersion": 21,
+        "root": [
+            ["done", None],
+            "done",
+            {
+                "knot": [
+                    "ev",
+                    {"CNT?": ".^"},
+                    "out",
+                    "/ev",
+                    "^ ",
+                    "ev",
+                    {"^->": "knot"},
+                    "turns",
+                    "out",
+                    "/ev",
+                    "\n",
+                    "done",
+                    {"#f": 3},
+                ]
+            },
+        ],
+        "listDefs": {},
+    }
+)
+
+
+def read_story_text(rel_path):
+    return (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+
+
+def counted_containers(story):
+    found = {}
+    containers = [story.mainContentContainer]
+    while containers:
+        container = containers.pop()
+        if container.visitsShouldBeCounted or container.turnIndexShouldBeCounted:
+            found[id(container)] = container
+        containers.extend(c for c in container.content if isinstance(c, Container))
+        containers.extend(c for c in container.loadedNamedContent.values() if isinstance(c, Container))
+    return list(found.values())
+
+
+def visit_knot(story):
+    story.ChoosePathString("knot")
+    return story.ContinueMaximally()
+
+
+def test_counted_containers_get_dense_slots_at_load():
+    story = Story(read_story_text("inkjs/tests.ink.json"))
+    slots = story.countSlots
+    containers = {c.countIndex: c for c in counted_containers(story)}
+    assert sorted(containers) == list(range(len(slots.paths)))
+    assert all(slots.paths[slot] == c.pathString for slot, c in containers.items())
+
+
+def test_lazy_knots_get_slots_when_first_counted():
+    story = Story(KNOT_STORY, lazy_knots=True)
+    assert story.countSlots.paths == []
+    assert visit_knot(story) == "1 0\n"
+    assert story.KnotContainerWithName("knot").countIndex == 0
+    assert visit_knot(story) == "2 0\n"
+
+
+@pytest.mark.parametrize("lazy_knots", [False, True])
+def test_saved_counts_load_by_path(lazy_knots):
+    eager = Story(KNOT_STORY)
+    visit_knot(eager)
+    eager.state.currentTurnIndex = 3
+    saved = eager.state.ToJson()
+    assert json.loads(saved)["visitCounts"] == {"knot": 1}
+    assert json.loads(saved)["turnIndices"] == {"knot": 0}
+
+    story = Story(KNOT_STORY, lazy_knots=lazy_knots)
+    story.state.LoadJson(saved)
+    assert story.state.VisitCountAtPathString("knot") == 1
+    assert story.state.ToJson() == saved
+    assert story.state.TurnsSinceForContainer(story.KnotContainerWithName("knot")) == 3
+    assert visit_knot(story) == "2 0\n"
+
+
+def test_saved_paths_the_story_lacks_are_kept():
+    story = Story(KNOT_STORY)
+    saved = json.loads(story.state.ToJson())
+    saved["visitCounts"] = {"gone": 4, "knot": 0}
+    saved["turnIndices"] = {"gone": 2}
+    story.state.LoadJson(json.dumps(saved))
+    visit_knot(story)
+
+    resaved = json.loads(story.state.ToJson())
+    assert resaved["visitCounts"] == {"gone": 4, "knot": 1}
+    assert resaved["turnIndices"] == {"gone": 2, "knot": 0}
+    assert story.state.VisitCountAtPathString("gone") == 4
+
+
+def test_counts_made_while_patching_are_applied():
+    story = Story(KNOT_STORY)
+    story.ChoosePathString("knot")
+    assert story.Continue() == "1 0\n"
+    assert story.state.VisitCountAtPathString("knot") == 1
+
+
+def test_spawned_sessions_share_slots_but_not_counts():
+    template = Story(KNOT_STORY, lazy_knots=True)
+    first = template.spawn()
+    second = template.spawn()
+    assert first.countSlots is template.countSlots
+
+    assert visit_knot(first) == "1 0\n"
+    assert visit_knot(first) == "2 0\n"
+    assert visit_knot(second) == "1 0\n"
+    assert template.state.VisitCountAtPathString("knot") == 0
+
+
+def test_slots_given_out_from_many_threads_are_unique():
+    slots = Story(KNOT_STORY).countSlots
+    loaded_count = len(slots.paths)
+    path_strings = ["saved.path" + str(i) for i in range(2000)]
+    start = threading.Barrier(8)
+    given = [None] * 8
+
+    def allocate(i):
+        start.wait()
+        given[i] = [slots.SlotForPath(p) for p in path_strings]
+
+    threads = [threading.Thread(target=allocate, args=(i,)) for i in range(8)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert given == [given[0]] * 8
+    assert sorted(given[0]) == list(range(loaded_count, loaded_count + len(path_strings)))
+    assert [slots.paths[slot] for slot in given[0]] == path_strings
+
+
+def test_compiled_cache_gives_containers_slots_of_their_own(tmp_path):
+    text = read_story_text("inkjs/tests.ink.json")
+    story = Story(text)
+    story.allowExternalFunctionFallbacks = True
+    play_first_choices(story)
+    for container in counted_containers(story):
+        container.countIndex += 1000
+    cache = tmp_path / "tests.inkc"
+    story.save_compiled(cache)
+
+    cached = Story.from_compiled(cache)
+    containers = counted_containers(cached)
+    assert sorted(c.countIndex for c in containers) == list(range(len(cached.countSlots.paths)))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from tests.common import play_first_choices, play_in_threads
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+STORY_PATHS = sorted(INKFILES_DIR.rglob("*.ink.json"))
+
+
+def play(story):
+    messages = []
+    story.allowExternalFunctionFallbacks = True
+    story.onError = lambda message, error_type: messages.append((message, error_type))
+    story.state.storySeed = 7
+    try:
+        output = play_first_choices(story, max_steps=200)
+    except Exception as e:
+        output = [type(e).__name__, str(e)]
+    return output, messages, story.state.ToJson()
+
+
+@pytest.mark.parametrize("path", STORY_PATHS, ids=[p.relative_to(INKFILES_DIR).as_posix() for p in STORY_PATHS])
+def test_flattened_story_plays_like_tree_story(path):
+    text = path.read_text(encoding="utf-8-sig")
+    try:
+        tree = Story(text)
+    except Exception:
+        pytest.skip("story doesn't load")
+    flat = Story(text, flatten_knots=True)
+
+    assert play(flat) == play(tree)
+
+
+def test_flattened_save_loads_into_tree_story():
+    text = (INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig")
+    flat = Story(text, flatten_knots=True)
+    flat.allowExternalFunctionFallbacks = True
+    flat.state.storySeed = 7
+    flat.ChoosePathString("content.simple")
+    flat.Continue()
+    saved = flat.state.ToJson()
+
+    tree = Story(text)
+    tree.allowExternalFunctionFallbacks = True
+    tree.state.storySeed = 7
+    tree.ChoosePathString("content.simple")
+    tree.Continue()
+    assert saved == tree.state.ToJson()
+
+    restored = Story(text, flatten_knots=True)
+    restored.state.LoadJson(saved)
+    assert restored.state.ToJson() == saved
+
+
+def test_spawned_sessions_share_flat_code():
+    text = (INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig")
+    template = Story(text, flatten_knots=True)
+    session = template.spawn()
+    assert session._flatCode is template._flatCode
+    assert template._flatCode.instructions
+
+
+@pytest.mark.parametrize("rel_path", ["inkjs/tests.ink.json", "diverts/tunnel_vs_thread_behaviour.ink.json"])
+def test_flattened_story_sessions_compile_knots_from_many_threads(rel_path):
+    text = (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+    tree = Story(text)
+    tree.allowExternalFunctionFallbacks = True
+    expected = play_first_choices(tree)
+
+    for _ in range(4):
+        story = Story(text, flatten_knots=True)
+        story.allowExternalFunctionFallbacks = True
+        sessions = [story.spawn() for _ in range(16)]
+        assert play_in_threads(sessions) == [expected] * len(sessions)
+        # Each position was compiled once.
+        flat_code = story._flatCode
+        assert len(flat_code.instructions) == sum(len(c.content) for c in flat_code.bases)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.container import Container
+from inkpython.engine.control_command import ControlCommand
+from tests.common import play_first_choices
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+
+def read_story_text(rel_path):
+    return (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+
+
+@pytest.mark.parametrize(
+    "rel_path",
+    [
+        "inkjs/tests.ink.json",
+        "bindings/variable_observer.ink.json",
+        "builtins/turns_since_nested.ink.json",
+        "diverts/tunnel_vs_thread_behaviour.ink.json",
+        "weaves/weave_gathers.ink.json",
+    ],
+)
+def test_interned_story_plays_like_plain_story(rel_path):
+    text = read_story_text(rel_path)
+    plain = Story(text)
+    interned = Story(text, intern_leaves=True)
+    for story in (plain, interned):
+        story.allowExternalFunctionFallbacks = True
+        story.state.storySeed = 7
+
+    assert play_first_choices(interned) == play_first_choices(plain)
+    assert interned.state.ToJson() == plain.state.ToJson()
+    assert interned.ToJson() == plain.ToJson()
+
+
+def test_interned_story_shares_equal_leaves():
+    story = Story(read_story_text("inkjs/tests.ink.json"), intern_leaves=True)
+    eval_starts = set()
+
+    def collect(container):
+        for obj in container.content:
+            if isinstance(obj, Container):
+                collect(obj)
+            elif isinstance(obj, ControlCommand) and obj.commandType == ControlCommand.CommandType.EvalStart:
+                eval_starts.add(id(obj))
+                assert obj.parent is None
+
+    collect(story.mainContentContainer)
+    for named in story.mainContentContainer.namedContent.values():
+        collect(named)
+    assert len(eval_starts) == 1
+
+    story.allowExternalFunctionFallbacks = True
+    story.ChoosePathString("content.simple")
+    story.Continue()
+    saved = story.state.ToJson()
+    restored = Story(read_story_text("inkjs/tests.ink.json"), intern_leaves=True)
+    restored.allowExternalFunctionFallbacks = True
+    restored.state.LoadJson(saved)
+    assert restored.state.ToJson() == saved
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.story_exception import StoryException
+from tests.common import play_first_choices, play_in_threads
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+
+def read_story_text(rel_path):
+    return (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+
+
+def loaded_knot_names(story):
+    root = story.mainContentContainer
+    return sorted(name for name, value in root.lazyNamedContent.items() if not isinstance(value, str))
+
+
+@pytest.mark.parametrize(
+    "rel_path",
+    [
+        "inkjs/tests.ink.json",
+        "choices/conditional_choices.ink.json",
+        "diverts/tunnel_vs_thread_behaviour.ink.json",
+        "lists/list_basic_operations.ink.json",
+        "sequences/all_sequence_types.ink.json",
+    ],
+)
+def test_lazy_story_plays_like_eager_story(rel_path):
+    text = read_story_text(rel_path)
+    eager = Story(text)
+    lazy = Story(text, lazy_knots=True)
+    for story in (eager, lazy):
+        story.allowExternalFunctionFallbacks = True
+        story.state.storySeed = 7
+
+    assert play_first_choices(lazy) == play_first_choices(eager)
+    assert lazy.state.ToJson() == eager.state.ToJson()
+    assert lazy.ToJson() == eager.ToJson()
+
+
+def test_lazy_story_only_loads_knots_it_reaches():
+    story = Story(read_story_text("inkjs/tests.ink.json"), lazy_knots=True)
+    story.BindExternalFunction("fn_ext", lambda *args: None)
+    story.BindExternalFunction("gameInc", lambda x: x)
+    assert loaded_knot_names(story) == ["global decl"]
+
+    story.ChoosePathString("content.variable_text")
+    story.ContinueMaximally()
+    assert loaded_knot_names(story) == ["content", "global decl"]
+    assert story.KnotContainerWithName("content").path.componentsString == "content"
+
+
+def test_lazy_story_validates_externals_without_loading_knots():
+    story = Story(read_story_text("inkjs/tests.ink.json"), lazy_knots=True)
+    with pytest.raises(StoryException, match="'fn_ext', 'gameInc'"):
+        story.ContinueMaximally()
+    assert loaded_knot_names(story) == ["global decl"]
+
+    story = Story(read_story_text("inkjs/tests.ink.json"), lazy_knots=True)
+    story.allowExternalFunctionFallbacks = True
+    story.ChoosePathString("content")
+    story.ContinueMaximally()
+    assert loaded_knot_names(story) == ["content", "fn_ext", "gameInc", "global decl"]
+
+
+def test_lazy_story_restores_saved_state():
+    text = read_story_text("inkjs/tests.ink.json")
+    eager = Story(text)
+    eager.allowExternalFunctionFallbacks = True
+    eager.ChoosePathString("saveload")
+    eager.Continue()
+    saved = eager.state.ToJson()
+    expected = eager.ContinueMaximally()
+
+    lazy = Story(text, lazy_knots=True)
+    lazy.allowExternalFunctionFallbacks = True
+    lazy.state.LoadJson(saved)
+    assert lazy.ContinueMaximally() == expected
+
+
+@pytest.mark.parametrize("rel_path", ["inkjs/tests.ink.json", "diverts/tunnel_vs_thread_behaviour.ink.json"])
+def test_lazy_story_sessions_load_knots_from_many_threads(rel_path):
+    text = read_story_text(rel_path)
+    eager = Story(text)
+    eager.allowExternalFunctionFallbacks = True
+    expected = play_first_choices(eager)
+
+    for _ in range(4):
+        story = Story(text, lazy_knots=True)
+        story.allowExternalFunctionFallbacks = True
+        sessions = [story.spawn() for _ in range(16)]
+        assert play_in_threads(sessions) == [expected] * len(sessions)
+        # Each knot was loaded once, and is the one the tree holds.
+        root = story.mainContentContainer
+        for name, knot in root.lazyNamedContent.items():
+            if not isinstance(knot, str):
+                assert root.loadedNamedContent[name] is knot
+                assert knot.parent is root
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.control_command import ControlCommand
+from inkpython.engine.story_exception import StoryException
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+
+def test_every_control_command_has_a_handler():
+    Story.GenerateLogicHandlersIfNecessary()
+    command_types = [
+        cmd
+        for cmd in ControlCommand.CommandType
+        if cmd not in (ControlCommand.CommandType.NotSet, ControlCommand.CommandType.TOTAL_VALUES)
+    ]
+    assert sorted(Story._controlCommandHandlers) == sorted(command_types)
+
+
+def test_unhandled_control_command_is_an_error():
+    story = Story((INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig"))
+    with pytest.raises(StoryException, match="unhandled ControlCommand"):
+        story.PerformLogicAndFlowControl(ControlCommand())
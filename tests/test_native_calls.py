@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import itertools
+import pickle
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.container import Container
+from inkpython.engine.native_function_call import NativeFunctionCall
+from inkpython.engine.value import BoolValue, FloatValue, IntValue, StringValue
+
+INKFILES_DIR = Path(__file__).resolve().parent / "inkfiles" / "compiled"
+
+OPERANDS = [
+    IntValue(0),
+    IntValue(3),
+    IntValue(-7),
+    FloatValue(0.0),
+    FloatValue(2.5),
+    FloatValue(4.0),
+    BoolValue(True),
+    BoolValue(False),
+    StringValue(""),
+    StringValue("ab"),
+    StringValue("b"),
+]
+
+
+def binary_names():
+    NativeFunctionCall.GenerateNativeFunctionsIfNecessary()
+    return sorted(name for name, f in NativeFunctionCall._nativeFunctions.items() if f.numberOfParameters == 2)
+
+
+def outcome(call, parameters):
+    try:
+        result = call(parameters)
+    except Exception as e:
+        return e.__class__
+    # None for results no value can hold, e.g. a negative number to a fractional power.
+    if result is None:
+        return None
+    return result.__class__, result.value
+
+
+@pytest.mark.parametrize("name", binary_names())
+def test_cached_calls_give_what_full_calls_do(name):
+    call_site = NativeFunctionCall.CallWithName(name)
+    prototype = NativeFunctionCall.CallExistsWithName(name)
+    for left, right in itertools.product(OPERANDS, repeat=2):
+        expected = outcome(prototype.Call, [left, right])
+        # Twice, the second time from the call site's cache.
+        assert outcome(call_site.Call, [left, right]) == expected, (left, right)
+        assert outcome(call_site.Call, [left, right]) == expected, (left, right)
+
+
+def test_call_site_caches_last_operand_types():
+    call_site = NativeFunctionCall.CallWithName(NativeFunctionCall.Add)
+    assert call_site.Call([IntValue(1), IntValue(2)]).value == 3
+    cached_call = call_site._cachedCall
+    assert cached_call[:2] == (IntValue, IntValue)
+    assert call_site.Call([IntValue(5), IntValue(6)]).value == 11
+    assert call_site._cachedCall is cached_call
+
+    assert call_site.Call([StringValue("a"), StringValue("b")]).value == "ab"
+    assert call_site._cachedCall[:2] == (StringValue, StringValue)
+    assert call_site.Call([IntValue(1), FloatValue(0.5)]).value == 1.5
+    assert call_site._cachedCall[:2] == (IntValue, FloatValue)
+
+
+def test_call_sites_pickle_without_their_cache():
+    call_site = NativeFunctionCall.CallWithName(NativeFunctionCall.Multiply)
+    call_site.Call([IntValue(2), IntValue(3)])
+    loaded = pickle.loads(pickle.dumps(call_site))
+    assert loaded._cachedCall is NativeFunctionCall.kNoCachedCall
+    assert loaded.Call([IntValue(4), IntValue(3)]).value == 12
+
+
+def test_interning_keeps_call_sites_apart():
+    story = Story((INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig"), intern_leaves=True)
+    additions = []
+    containers = [story.mainContentContainer]
+    seen = set()
+    while containers:
+        container = containers.pop()
+        for obj in list(container.content) + list(container.namedContent.values()):
+            if isinstance(obj, Container):
+                # Named containers in the content are in the named content too.
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    containers.append(obj)
+            elif isinstance(obj, NativeFunctionCall) and obj.name == NativeFunctionCall.Add:
+                additions.append(obj)
+    assert len(additions) > 1
+    assert len({id(call_site) for call_site in additions}) == len(additions)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.output_stream_marks import OutputStreamMarks
+from tests.common import INKFILES_DIR, over_corpus, play_checked
+
+
+class CheckingStory(Story):
+    def Step(self):
+        super().Step()
+        marks = self.state.outputStreamMarks
+        rebuilt = OutputStreamMarks()
+        rebuilt.Update(self.state.outputStream)
+        for name in OutputStreamMarks.__slots__:
+            assert getattr(marks, name) == getattr(rebuilt, name), name
+
+
+@over_corpus
+def test_marks_follow_output_stream(path):
+    play_checked(CheckingStory(path.read_text(encoding="utf-8-sig")))
+
+
+def test_marks_survive_save_and_load():
+    text = (INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig")
+    story = Story(text)
+    story.allowExternalFunctionFallbacks = True
+    story.ChoosePathString("content.simple")
+    story.Continue()
+    saved = story.state.ToJson()
+
+    restored = Story(text)
+    restored.allowExternalFunctionFallbacks = True
+    restored.state.LoadJson(saved)
+    assert story.state.outputStreamMarks.texts
+    assert restored.state.outputStreamMarks.texts == story.state.outputStreamMarks.texts
+    assert restored.state.outputStreamEndsInNewline == story.state.outputStreamEndsInNewline
+
+
+def legacy_save(saved):
+    # As saved before flows (save versions 8 and 9): the one flow's state at the top level.
+    j_object = json.loads(saved)
+    flow = j_object.pop("flows")[j_object.pop("currentFlowName")]
+    j_object["callstackThreads"] = flow["callstack"]
+    j_object["outputStream"] = flow["outputStream"]
+    j_object["currentChoices"] = flow["currentChoices"]
+    if "choiceThreads" in flow:
+        j_object["choiceThreads"] = flow["choiceThreads"]
+    j_object["inkSaveVersion"] = 9
+    return json.dumps(j_object)
+
+
+@pytest.mark.parametrize("had_output", [False, True])
+def test_marks_survive_loading_a_save_from_before_flows(had_output):
+    text = (INKFILES_DIR / "inkjs" / "tests.ink.json").read_text(encoding="utf-8-sig")
+    story = Story(text)
+    story.allowExternalFunctionFallbacks = True
+    story.ChoosePathString("content.simple")
+    story.Continue()
+    saved = legacy_save(story.state.ToJson())
+
+    restored = Story(text)
+    restored.allowExternalFunctionFallbacks = True
+    if had_output:
+        # Marks for a longer stream than the one loaded.
+        restored.ChoosePathString("glue")
+        restored.Continue()
+        assert len(restored.state.outputStream) > 2
+    restored.state.LoadJson(saved)
+    rebuilt = OutputStreamMarks()
+    rebuilt.Update(restored.state.outputStream)
+    for name in OutputStreamMarks.__slots__:
+        assert getattr(restored.state.outputStreamMarks, name) == getattr(rebuilt, name), name
+    assert restored.state.outputStreamMarks.texts
+    assert restored.state.outputStreamEndsInNewline == story.state.outputStreamEndsInNewline
+    assert restored.state.outputStreamContainsContent == story.state.outputStreamContainsContent
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import random
+
+from inkpython import Story
+from inkpython.engine.output_stream_text import OutputStreamText
+from tests.common import over_corpus, play_checked
+
+
+def clean_one_char_at_a_time(text):
+    out = []
+    current_whitespace_start = -1
+    start_of_line = 0
+    for i, char in enumerate(text):
+        is_inline_whitespace = char in (" ", "\t")
+        if is_inline_whitespace and current_whitespace_start == -1:
+            current_whitespace_start = i
+        if not is_inline_whitespace:
+            if char != "\n" and current_whitespace_start > 0 and current_whitespace_start != start_of_line:
+                out.append(" ")
+            current_whitespace_start = -1
+        if char == "\n":
+            start_of_line = i + 1
+        if not is_inline_whitespace:
+            out.append(char)
+    return "".join(out)
+
+
+def test_clean_text_in_pieces_matches_whole_text():
+    rng = random.Random(7)
+    for _ in range(500):
+        text = "".join(rng.choice(["a", "b", " ", "\t", "\n"]) for _ in range(rng.randrange(30)))
+        assert OutputStreamText.CleanText(text) == clean_one_char_at_a_time(text)
+
+        parts = []
+        state = (-1, 0)
+        cut = rng.randrange(len(text) + 1)
+        for offset, piece in ((0, text[:cut]), (cut, text[cut:])):
+            state = OutputStreamText.CleanWhitespace(piece, parts, offset, *state)
+        assert "".join(parts) == clean_one_char_at_a_time(text)
+
+
+class CheckingStory(Story):
+    def Step(self):
+        super().Step()
+        rebuilt = OutputStreamText()
+        rebuilt.Rebuild(self.state.outputStream)
+        assert self.state.currentText == rebuilt.text
+        assert self.state.currentTags == rebuilt.tags
+
+
+@over_corpus
+def test_text_follows_output_stream(path):
+    play_checked(CheckingStory(path.read_text(encoding="utf-8-sig")))
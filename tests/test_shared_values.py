@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.engine.native_function_call import NativeFunctionCall
+from inkpython.engine.value import BoolValue, FloatValue, IntValue, ListValue, StringValue, Value, ValueType
+from tests.common import play_first_choices
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+
+def shared_values():
+    return [
+        BoolValue.Of(False),
+        BoolValue.Of(True),
+        *(IntValue.Of(i) for i in range(IntValue.kMinShared, IntValue.kMaxShared + 1)),
+        *StringValue._shared.values(),
+    ]
+
+
+def test_small_ints_are_shared():
+    assert IntValue.Of(IntValue.kMinShared) is IntValue.Of(IntValue.kMinShared)
+    assert IntValue.Of(IntValue.kMaxShared) is IntValue.Of(IntValue.kMaxShared)
+    assert IntValue.Of(7).value == 7
+    assert IntValue.Of(IntValue.kMaxShared + 1) is not IntValue.Of(IntValue.kMaxShared + 1)
+    assert IntValue.Of(IntValue.kMinShared - 1).value == IntValue.kMinShared - 1
+
+
+def test_booleans_and_common_strings_are_shared():
+    assert BoolValue.Of(True) is BoolValue.Of(1 == 1)
+    assert BoolValue.Of(False).value is False
+    assert StringValue.Of("") is StringValue.Of("")
+    assert StringValue.Of("\n").isNewline
+    assert StringValue.Of("text") is not StringValue.Of("text")
+
+
+def test_made_values_are_shared():
+    assert Value.Create(3) is IntValue.Of(3)
+    assert Value.Create(3.0, ValueType.Int) is IntValue.Of(3)
+    assert Value.Create(True) is BoolValue.Of(True)
+    assert Value.Create("") is StringValue.Of("")
+    assert IntValue.Of(0).Cast(ValueType.Bool) is BoolValue.Of(False)
+    assert ListValue().Cast(ValueType.Int) is IntValue.Of(0)
+    add = NativeFunctionCall.CallWithName(NativeFunctionCall.Add)
+    assert add.Call([IntValue(2), IntValue(3)]) is IntValue.Of(5)
+    assert add.Call([FloatValue(0.25), FloatValue(0.5)]).value == 0.75
+
+
+@pytest.mark.parametrize(
+    "rel_path",
+    [
+        "inkjs/tests.ink.json",
+        "lists/list_basic_operations.ink.json",
+        "lists/more_list_operations.ink.json",
+        "logic/print_num.ink.json",
+        "logic/nested_pass_by_reference.ink.json",
+        "variables/variable_pointer_ref_from_knot.ink.json",
+    ],
+)
+def test_playing_leaves_shared_values_as_they_were(rel_path):
+    values = shared_values()
+    before = [(v.__class__, v.value) for v in values]
+    story = Story((INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig"))
+    story.allowExternalFunctionFallbacks = True
+    story.state.storySeed = 7
+    play_first_choices(story)
+    story.ResetState()
+    assert [(v.__class__, v.value) for v in values] == before
+    assert all(v.parent is None for v in values)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+from inkpython import Story
+from inkpython.engine.value import IntValue, StringValue
+from tests.common import STORY_PATHS, over_corpus, play_checked
+
+
+class CheckingStory(Story):
+    # Saves the state at each newline snapshot, and checks that going back to
+    # the snapshot gives exactly that state again.
+    restores = 0
+
+    def StateSnapshot(self):
+        self._savedAtSnapshot = (self.state.ToJson(), self.state.currentText, self.state.currentTags)
+        super().StateSnapshot()
+
+    def RestoreStateSnapshot(self):
+        super().RestoreStateSnapshot()
+        CheckingStory.restores += 1
+        assert (self.state.ToJson(), self.state.currentText, self.state.currentTags) == self._savedAtSnapshot
+
+
+@over_corpus
+def test_restoring_snapshot_gives_state_at_newline(path):
+    play_checked(CheckingStory(path.read_text(encoding="utf-8-sig")))
+
+
+def test_corpus_restores_snapshots():
+    CheckingStory.restores = 0
+    for path in STORY_PATHS[:40]:
+        play_checked(CheckingStory(path.read_text(encoding="utf-8-sig")))
+    assert CheckingStory.restores > 0
+
+
+def test_state_is_kept_across_lookahead():
+    story = Story(next(p for p in STORY_PATHS if p.name == "hello_world.ink.json").read_text(encoding="utf-8-sig"))
+    state = story.state
+    story.ContinueMaximally()
+    assert story.state is state
+
+
+def test_restore_after_removing_what_snapshot_shares():
+    story = Story(next(p for p in STORY_PATHS if p.name == "hello_world.ink.json").read_text(encoding="utf-8-sig"))
+    story.Continue()
+    state = story.state
+    state.PushEvaluationStack(IntValue(1))
+    state.PushEvaluationStack(IntValue(2))
+    saved = (state.ToJson(), state.currentText, state.currentTags)
+
+    snapshot = state.SnapshotAndStartPatching()
+    state.PopEvaluationStack(2)
+    state.PushEvaluationStack(IntValue(3))
+    state.PopFromOutputStream(1)
+    state.PushToOutputStream(StringValue("changed"))
+    state.ForceEnd()
+    assert state.currentText == "Hello worldchanged"
+
+    state.RestoreSnapshot(snapshot)
+    assert (state.ToJson(), state.currentText, state.currentTags) == saved
+
+
+def test_lookahead_during_background_save():
+    # Sets x to 1, says a line, then sets x to 2 and says another.
+    story = Story(
+        json.dumps(
+            {
+                "inkVersion": 21,
+                "root": [
+                    [
+                        *("ev", 1, {"VAR=": "x", "re": True}, "/ev", "^one", "\n"),
+                        *("ev", 2, {"VAR=": "x", "re": True}, "/ev", "^two", "\n"),
+                        "done",
+                        None,
+                    ],
+                    "done",
+                    {"global decl": ["ev", 0, {"VAR=": "x"}, "/ev", "end", None]},
+                ],
+                "listDefs": {},
+            }
+        )
+    )
+    saving = story.CopyStateForBackgroundThreadSave()
+
+    assert story.Continue() == "one\n"
+    assert story.variablesState["x"] == 1
+    assert story.Continue() == "two\n"
+    assert story.variablesState["x"] == 2
+    # The lookahead's changes joined those made since the save started.
+    assert story.state._patch.parent is None
+    assert json.loads(saving.ToJson())["variablesState"] == {}
+
+    story.BackgroundSaveComplete()
+    assert story.state._patch is None
+    assert story.variablesState["x"] == 2
+    assert json.loads(story.state.ToJson())["variablesState"] == {"x": 2}
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from inkpython import Story
+from inkpython.cli import precompile_story
+from inkpython.engine.story_exception import StoryException
+from inkpython.engine.story_map import MappedContainer, StoryMap
+from tests.common import play_first_choices
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+
+def read_story_text(rel_path):
+    return (INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig")
+
+
+def loaded_knot_names(story):
+    root = story.mainContentContainer
+    return sorted(name for name, value in root.lazyNamedContent.items() if not isinstance(value, MappedContainer))
+
+
+@pytest.mark.parametrize(
+    "rel_path",
+    [
+        "inkjs/tests.ink.json",
+        "choices/conditional_choices.ink.json",
+        "diverts/tunnel_vs_thread_behaviour.ink.json",
+        "lists/list_basic_operations.ink.json",
+        "sequences/all_sequence_types.ink.json",
+    ],
+)
+@pytest.mark.parametrize("lazy_knots", [False, True])
+def test_mapped_story_plays_like_json(tmp_path, rel_path, lazy_knots):
+    text = read_story_text(rel_path)
+    map_path = tmp_path / "story.inkm"
+    StoryMap.Write(map_path, text)
+
+    from_json = Story(text)
+    from_map = Story.from_mapped(map_path, lazy_knots=lazy_knots)
+    for story in (from_json, from_map):
+        story.allowExternalFunctionFallbacks = True
+        story.state.storySeed = 7
+
+    assert play_first_choices(from_map) == play_first_choices(from_json)
+    assert from_map.state.ToJson() == from_json.state.ToJson()
+    assert from_map.ToJson() == from_json.ToJson()
+
+
+def test_mapped_story_inflates_knots_on_first_use(tmp_path):
+    map_path = tmp_path / "story.inkm"
+    StoryMap.Write(map_path, read_story_text("inkjs/tests.ink.json"))
+
+    story = Story.from_mapped(map_path)
+    with pytest.raises(StoryException, match="'fn_ext', 'gameInc'"):
+        story.ContinueMaximally()
+    assert loaded_knot_names(story) == ["global decl"]
+
+    story = Story.from_mapped(map_path)
+    story.BindExternalFunction("fn_ext", lambda *args: None)
+    story.BindExternalFunction("gameInc", lambda x: x)
+    story.ChoosePathString("content.variable_text")
+    story.ContinueMaximally()
+    assert loaded_knot_names(story) == ["content", "global decl"]
+
+
+def test_mapped_story_rebuilds_when_source_changes(tmp_path):
+    source_path = tmp_path / "story.ink.json"
+    source_path.write_text(read_story_text("misc/hello_world.ink.json"))
+    map_path = precompile_story(source_path, mapped=True)
+    assert map_path == tmp_path / "story.inkm"
+    assert Story.from_mapped(map_path, source_path).Continue() == "Hello world\n"
+
+    source_path.write_text(read_story_text("misc/end.ink.json"))
+    assert Story.from_mapped(map_path, source_path).Continue() == "hello\n"
+    assert Story.from_mapped(map_path).Continue() == "hello\n"
+
+    map_path.write_bytes(map_path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="corrupt"):
+        Story.from_mapped(map_path)
+    map_path.write_bytes(b"not a story map")
+    with pytest.raises(ValueError):
+        Story.from_mapped(map_path)
+
+
+def test_mapped_story_keeps_ints_too_big_for_a_node(tmp_path):
+    text = json.dumps(
+        {
+            "inkVersion": 21,
+            "root": [["ev", 5000000000, "out", -5000000000, "out", 7, "out", "/ev", "\n", "done", None], "done", None],
+            "listDefs": {},
+        }
+    )
+    map_path = tmp_path / "story.inkm"
+    StoryMap.Write(map_path, text)
+    assert Story.from_mapped(map_path).Continue() == Story(text).Continue() == "5000000000-50000000007\n"
+
+
+def test_story_maps_written_at_once_replace_each_other_whole(tmp_path):
+    text = read_story_text("inkjs/tests.ink.json")
+    map_path = tmp_path / "story.inkm"
+    start = threading.Barrier(8)
+    errors = []
+
+    def write():
+        start.wait()
+        try:
+            StoryMap.Write(map_path, text)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [p.name for p in tmp_path.iterdir()] == ["story.inkm"]
+    mapped = Story.from_mapped(map_path, lazy_knots=False)
+    from_json = Story(text)
+    mapped.allowExternalFunctionFallbacks = from_json.allowExternalFunctionFallbacks = True
+    assert play_first_choices(mapped) == play_first_choices(from_json)
+
+
+def test_failed_story_map_write_leaves_no_temporary_file(tmp_path):
+    map_path = tmp_path / "story.inkm"
+    map_path.mkdir()
+    with pytest.raises(OSError):
+        StoryMap.Write(map_path, read_story_text("misc/hello_world.ink.json"))
+    assert [p.name for p in tmp_path.iterdir()] == ["story.inkm"]
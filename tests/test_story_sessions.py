@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from inkpython import Story
+
+
+ROOT = Path(__file__).resolve().parent
+INKFILES_DIR = ROOT / "inkfiles" / "compiled"
+
+
+def load_template(rel_path):
+    return Story((INKFILES_DIR / rel_path).read_text(encoding="utf-8-sig"))
+
+
+def test_spawned_sessions_share_content_but_not_state():
+    template = load_template("variables/variable_get_set_api.ink.json")
+    first = template.spawn()
+    second = template.spawn()
+
+    assert first.mainContentContainer is template.mainContentContainer
+    assert second.mainContentContainer is template.mainContentContainer
+    assert first.listDefinitions is template.listDefinitions
+    assert first.state is not second.state
+
+    assert first.ContinueMaximally() == "5\n"
+    first.variablesState["x"] = 10
+    first.ChooseChoiceIndex(0)
+    assert first.ContinueMaximally() == "10\n"
+
+    assert second.ContinueMaximally() == "5\n"
+    second.ChooseChoiceIndex(0)
+    assert second.ContinueMaximally() == "5\n"
+    assert template.variablesState["x"] == 5
+
+
+def test_spawned_session_plays_like_a_fresh_story():
+    rel_path = "inkjs/tests.ink.json"
+    template = load_template(rel_path)
+    template.allowExternalFunctionFallbacks = True
+    template.ContinueMaximally()
+
+    session = template.spawn()
+    fresh = load_template(rel_path)
+    fresh.allowExternalFunctionFallbacks = True
+    session.state.storySeed = fresh.state.storySeed = 7
+
+    assert session.ContinueMaximally() == fresh.ContinueMaximally()
+    assert session.state.ToJson() == fresh.state.ToJson()
+
+
+def test_spawned_sessions_share_externals_and_keep_own_observers():
+    template = load_template("bindings/variable_observer.ink.json")
+    observed = []
+    first = template.spawn()
+    second = template.spawn()
+    first.ObserveVariable("testVar", lambda name, value: observed.append(("first", value)))
+    second.ObserveVariable("testVar", lambda name, value: observed.append(("second", value)))
+
+    first.ContinueMaximally()
+    assert observed == [("first", 15)]
+
+    template.BindExternalFunction("message", lambda arg: None)
+    assert "message" in template.spawn()._externals